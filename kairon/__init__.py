@@ -39,11 +39,16 @@ Usage:
     Delete audit logs:
         kairon delete-logs
 
+    Backfill session heads of conversations:
+        kairon backfill-session-heads
+        kairon backfill-session-heads <botid> <botid>
+
 """
 
 
 def create_argument_parser():
-    from kairon.cli import importer, training, testing, conversations_deletion, translator, data_generator, delete_logs, message_broadcast
+    from kairon.cli import importer, training, testing, conversations_deletion, translator, data_generator, delete_logs, message_broadcast, \
+        tracker_migration
 
     parser = ArgumentParser(
         prog="kairon",
@@ -61,6 +66,7 @@ def create_argument_parser():
     data_generator.add_subparser(subparsers, parents=parent_parsers)
     delete_logs.add_subparser(subparsers, parents=parent_parsers)
     message_broadcast.add_subparser(subparsers, parents=parent_parsers)
+    tracker_migration.add_subparser(subparsers, parents=parent_parsers)
     return parser
 
 
@@ -0,0 +1,175 @@
+import hashlib
+import json
+import time
+from copy import deepcopy
+from threading import Lock
+from typing import Text, Tuple, Callable, Any
+
+from cachetools import LRUCache
+
+from kairon.shared.actions.data_objects import ActionsFingerprint
+from kairon.shared.utils import Utility
+
+
+class ActionConfigCache:
+    """
+    Caches action types and configurations per bot in the action server.
+
+    Fingerprint of the bot's actions, which is updated whenever an action
+    configuration or bot settings is saved, is checked once per request and the
+    cache of the bot is discarded if it has changed. As the fingerprint is kept in
+    the database, changes made by any process are picked up by every action server.
+    Entries are also discarded after ttl for changes which bypass the fingerprint.
+    """
+
+    __bots = None
+    __lock = Lock()
+
+    @staticmethod
+    def is_enabled():
+        return Utility.environment['action'].get('cache', {}).get('enable', False)
+
+    @staticmethod
+    def __get_bots() -> LRUCache:
+        if ActionConfigCache.__bots is None:
+            ActionConfigCache.__bots = LRUCache(Utility.environment['action']['cache']['max_bots'])
+        return ActionConfigCache.__bots
+
+    @staticmethod
+    def get_fingerprint(bot: Text):
+        """
+        fetches version of the bot's actions
+
+        :param bot: bot id
+        :return: version, 0 if actions were never modified
+        """
+        fingerprint = ActionsFingerprint.objects(bot=bot).only("version").first()
+        return fingerprint.version if fingerprint else 0
+
+    @staticmethod
+    def validate(bot: Text):
+        """
+        Discards cache of the bot if its actions were modified or the cache has expired.
+        To be called once at the start of every request.
+
+        :param bot: bot id
+        :return: None
+        """
+        if not ActionConfigCache.is_enabled():
+            return
+        fingerprint = ActionConfigCache.get_fingerprint(bot)
+        with ActionConfigCache.__lock:
+            bots = ActionConfigCache.__get_bots()
+            cache = bots.get(bot)
+            if not cache or cache["fingerprint"] != fingerprint or cache["expire_at"] <= time.time():
+                bots[bot] = {
+                    "fingerprint": fingerprint, "entries": {},
+                    "expire_at": time.time() + Utility.environment['action']['cache']['ttl']
+                }
+
+    @staticmethod
+    def get(bot: Text, key: Tuple, loader: Callable[[], Any]):
+        """
+        Fetches value from the cache of the bot, loading and caching it on a miss.
+        Value is loaded from the database every time if the cache of the bot
+        is not validated in this process. Errors raised by the loader are not cached.
+
+        :param bot: bot id
+        :param key: cache key, eg: ("type", action name)
+        :param loader: fetches value from the database
+        :return: value
+        """
+        if not ActionConfigCache.is_enabled():
+            return loader()
+        with ActionConfigCache.__lock:
+            cache = ActionConfigCache.__get_bots().get(bot)
+            if not cache or cache["expire_at"] <= time.time():
+                cache = None
+            elif key in cache["entries"]:
+                return deepcopy(cache["entries"][key])
+        value = loader()
+        if cache:
+            with ActionConfigCache.__lock:
+                cache["entries"][key] = deepcopy(value)
+        return value
+
+    @staticmethod
+    def clear():
+        with ActionConfigCache.__lock:
+            ActionConfigCache.__bots = None
+
+
+class ActionResponseCache:
+    """
+    Caches responses of HTTP actions which have enabled caching.
+
+    Responses are cached per bot, keyed by the action and the rendered request,
+    ie: method, url, headers and body, and expire after the ttl of the action.
+    Every bot has its own bounded cache so that a busy bot cannot evict the responses of other bots.
+    """
+
+    __bots = None
+    __lock = Lock()
+
+    @staticmethod
+    def __get_bots() -> LRUCache:
+        if ActionResponseCache.__bots is None:
+            ActionResponseCache.__bots = LRUCache(Utility.environment['action']['response_cache']['max_bots'])
+        return ActionResponseCache.__bots
+
+    @staticmethod
+    def get_key(action: Text, request_method: Text, http_url: Text, headers: Any, body: Any) -> Text:
+        """
+        Builds cache key from the rendered request.
+
+        :param action: action name
+        :param request_method: HTTP method
+        :param http_url: rendered url
+        :param headers: rendered headers
+        :param body: rendered request body
+        :return: cache key
+        """
+        request = json.dumps([action, request_method.upper(), http_url, headers, body], sort_keys=True, default=str)
+        return hashlib.sha256(request.encode()).hexdigest()
+
+    @staticmethod
+    def get(bot: Text, key: Text) -> Tuple[bool, Any]:
+        """
+        Fetches cached response.
+
+        :param bot: bot id
+        :param key: cache key
+        :return: whether the response is cached, response
+        """
+        with ActionResponseCache.__lock:
+            responses = ActionResponseCache.__get_bots().get(bot)
+            entry = responses.get(key) if responses is not None else None
+            if not entry:
+                return False, None
+            if entry[0] <= time.time():
+                del responses[key]
+                return False, None
+            return True, deepcopy(entry[1])
+
+    @staticmethod
+    def set(bot: Text, key: Text, response: Any, ttl: int):
+        """
+        Caches response.
+
+        :param bot: bot id
+        :param key: cache key
+        :param response: HTTP response
+        :param ttl: seconds after which the response expires
+        :return: None
+        """
+        with ActionResponseCache.__lock:
+            bots = ActionResponseCache.__get_bots()
+            responses = bots.get(bot)
+            if responses is None:
+                responses = bots[bot] = LRUCache(Utility.environment['action']['response_cache']['max_entries'])
+            responses[key] = (time.time() + ttl, deepcopy(response))
+
+    @staticmethod
+    def clear():
+        with ActionResponseCache.__lock:
+            ActionResponseCache.__bots = None
@@ -4,6 +4,8 @@ from typing import Any, Text, Dict
 from rasa_sdk import Tracker
 from rasa_sdk.executor import CollectingDispatcher
 
+from kairon.actions.cache import ActionConfigCache
+
 
 class ActionsBase(ABC):
 
@@ -14,6 +16,10 @@ class ActionsBase(ABC):
         """Fetch action configuration parameters from the database."""
         raise NotImplementedError("Provider not implemented")
 
+    def get_config(self):
+        """Fetch action configuration from the action config cache, retrieving it from the database on a miss."""
+        return ActionConfigCache.get(self.bot, ("config", self.name), self.retrieve_config)
+
     @abstractmethod
     def execute(self, dispatcher: CollectingDispatcher, tracker: Tracker, domain: Dict[Text, Any]):
         """Execute the action."""
@@ -59,7 +59,7 @@ class ActionKaironBotResponse(ActionsBase):
         exception = None
         is_rephrased = False
         raw_resp = None
-        bot_settings = self.retrieve_config()
+        bot_settings = self.get_config()
         static_response = domain[DOMAIN.RESPONSES.value].get(self.name, [])
         bot_response = {"response": self.name}
         try:
@@ -52,7 +52,7 @@ class ActionEmail(ActionsBase):
         """
         status = "SUCCESS"
         exception = None
-        action_config = self.retrieve_config()
+        action_config = self.get_config()
         bot_response = action_config.get("response")
         to_email = action_config['to_email']
         smtp_password = action_config.get('smtp_password')
@@ -1,5 +1,6 @@
 from typing import Text
 
+from kairon.actions.cache import ActionConfigCache
 from kairon.actions.definitions.bot_response import ActionKaironBotResponse
 from kairon.actions.definitions.email import ActionEmail
 from kairon.actions.definitions.form_validation import ActionFormValidation
@@ -40,7 +41,10 @@ class ActionFactory:
 
     @staticmethod
     def get_instance(bot_id: Text, action_name: Text):
-        action_type = ActionUtility.get_action_type(bot=bot_id, name=action_name)
+        ActionConfigCache.validate(bot_id)
+        action_type = ActionConfigCache.get(
+            bot_id, ("type", action_name), lambda: ActionUtility.get_action_type(bot=bot_id, name=action_name)
+        )
         if not ActionFactory.__implementations.get(action_type):
             raise ActionFailure(f'{action_type} type action is not supported with action server')
         return ActionFactory.__implementations[action_type](bot_id, action_name)
@@ -63,7 +63,9 @@ class ActionFormValidation(ActionsBase):
             utter_msg_on_invalid = validation.invalid_response
 
             if not ActionUtility.is_empty(validation.validation_semantic):
-                is_valid, log = ActionUtility.evaluate_script(script=validation.validation_semantic, data=tracker_data)
+                is_valid, log = await ActionUtility.run_in_executor(
+                    ActionUtility.evaluate_script, script=validation.validation_semantic, data=tracker_data
+                )
                 msg.append(f'Expression evaluation log: {log}')
                 msg.append(f'Expression evaluation result: {is_valid}')
             elif (is_required_slot and tracker.get_slot(slot) is not None) or not is_required_slot:
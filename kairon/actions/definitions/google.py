@@ -56,7 +56,7 @@ class ActionGoogleSearch(ActionsBase):
         exception = None
         status = "SUCCESS"
         latest_msg = tracker.latest_message.get('text')
-        action_config = self.retrieve_config()
+        action_config = self.get_config()
         bot_response = action_config.get("failure_response")
         api_key = action_config.get('api_key')
         try:
@@ -67,8 +67,9 @@ class ActionGoogleSearch(ActionsBase):
             tracker_data = ActionUtility.build_context(tracker)
             api_key = ActionUtility.retrieve_value_for_custom_action_parameter(tracker_data, api_key, self.bot)
             if not ActionUtility.is_empty(latest_msg):
-                results = ActionUtility.perform_google_search(
-                    api_key, action_config['search_engine_id'], latest_msg, num=action_config.get("num_results")
+                results = await ActionUtility.run_in_executor(
+                    ActionUtility.perform_google_search, api_key, action_config['search_engine_id'], latest_msg,
+                    num=action_config.get("num_results")
                 )
                 if results:
                     bot_response = ActionUtility.format_search_result(results)
@@ -7,6 +7,7 @@ from mongoengine import DoesNotExist
 from rasa_sdk import Tracker
 from rasa_sdk.executor import CollectingDispatcher
 
+from kairon.actions.cache import ActionResponseCache
 from kairon.actions.definitions.base import ActionsBase
 from kairon.shared.actions.data_objects import ActionServerLogs, HttpActionConfig
 from kairon.shared.actions.exception import ActionFailure
@@ -63,11 +64,12 @@ class ActionHTTP(ActionsBase):
         request_method = None
         header_log = None
         filled_slots = {}
+        cache_hit = None
         dispatch_bot_response = True
         dispatch_type = DispatchType.text.value
         msg_logger = []
         try:
-            http_action_config = self.retrieve_config()
+            http_action_config = self.get_config()
             dispatch_bot_response = http_action_config['response']['dispatch']
             dispatch_type = http_action_config['response']['dispatch_type']
             tracker_data = ActionUtility.build_context(tracker, True)
@@ -76,7 +78,9 @@ class ActionHTTP(ActionsBase):
             logger.info("headers: " + str(header_log))
             dynamic_params = http_action_config.get('dynamic_params')
             if not ActionUtility.is_empty(dynamic_params):
-                body, body_log = ActionUtility.evaluate_script(dynamic_params, tracker_data)
+                body, body_log = await ActionUtility.run_in_executor(
+                    ActionUtility.evaluate_script, dynamic_params, tracker_data
+                )
                 msg_logger.extend(body_log)
                 body_log = ActionUtility.encrypt_secrets(body, tracker_data)
             else:
@@ -84,18 +88,22 @@ class ActionHTTP(ActionsBase):
             logger.info("request_body: " + str(body_log))
             request_method = http_action_config['request_method']
             http_url = ActionUtility.prepare_url(http_url=http_action_config['http_url'], tracker_data=tracker_data)
-            http_response = ActionUtility.execute_http_request(headers=headers, http_url=http_url,
-                                                               request_method=request_method, request_body=body,
-                                                               content_type=http_action_config['content_type'])
+            http_response, cache_hit = await self.__execute_http_request(
+                http_action_config, tracker, headers, http_url, request_method, body
+            )
+            if cache_hit:
+                msg_logger.append("Response fetched from cache")
             logger.info("http response: " + str(http_response))
             response_context = self.__add_user_context_to_http_response(http_response, tracker_data)
-            bot_response, bot_resp_log = ActionUtility.compose_response(http_action_config['response'],
-                                                                        response_context)
+            bot_response, bot_resp_log = await ActionUtility.run_in_executor(
+                ActionUtility.compose_response, http_action_config['response'], response_context
+            )
             msg_logger.extend(bot_resp_log)
             self.__response = bot_response
             self.__is_success = True
-            slot_values, slot_eval_log = ActionUtility.fill_slots_from_response(http_action_config.get('set_slots', []),
-                                                                                response_context)
+            slot_values, slot_eval_log = await ActionUtility.run_in_executor(
+                ActionUtility.fill_slots_from_response, http_action_config.get('set_slots', []), response_context
+            )
             msg_logger.extend(slot_eval_log)
             filled_slots.update(slot_values)
             logger.info("response: " + str(bot_response))
@@ -132,11 +140,37 @@ class ActionHTTP(ActionsBase):
                 exception=exception,
                 bot=self.bot,
                 status=status,
+                cache_hit=cache_hit,
                 user_msg=tracker.latest_message.get('text')
             ).save()
         filled_slots.update({KaironSystemSlots.kairon_action_response.value: bot_response})
         return filled_slots
 
+    async def __execute_http_request(self, http_action_config: dict, tracker: Tracker, headers: dict,
+                                     http_url: Text, request_method: Text, body: Any):
+        """
+        Executes the request, serving the response from cache if caching is enabled for the action.
+        Cache lookup is skipped when the bypass slot of the action is set, though the response is still cached.
+
+        :return: http response, whether it was fetched from cache or None if caching is disabled
+        """
+        cache_config = http_action_config.get('cache') or {}
+        if cache_config.get('enable'):
+            key = ActionResponseCache.get_key(self.name, request_method, http_url, headers, body)
+            bypass_slot = cache_config.get('bypass_slot')
+            if ActionUtility.is_empty(bypass_slot) or not tracker.get_slot(bypass_slot):
+                is_cached, http_response = ActionResponseCache.get(self.bot, key)
+                if is_cached:
+                    return http_response, True
+        http_response = await ActionUtility.execute_http_request_async(
+            headers=headers, http_url=http_url, request_method=request_method, request_body=body,
+            content_type=http_action_config['content_type'], hedge=True
+        )
+        if not cache_config.get('enable'):
+            return http_response, None
+        ActionResponseCache.set(self.bot, key, http_response, cache_config['ttl'])
+        return http_response, False
+
     @staticmethod
     def __add_user_context_to_http_response(http_response, tracker_data):
         response_context = {"data": http_response, 'context': tracker_data}
@@ -53,7 +53,7 @@ class ActionHubspotForms(ActionsBase):
         exception = None
         http_response = None
         request_body = None
-        action_config = self.retrieve_config()
+        action_config = self.get_config()
         portal_id = action_config.get('portal_id')
         form_guid = action_config.get('form_guid')
         bot_response = action_config.get("response")
@@ -61,7 +61,7 @@ class ActionHubspotForms(ActionsBase):
             http_url = f"https://api.hsforms.com/submissions/v3/integration/submit/{portal_id}/{form_guid}"
             tracker_data = ActionUtility.build_context(tracker)
             request_body = ActionUtility.prepare_hubspot_form_request(tracker_data, action_config.get("fields"), self.bot)
-            http_response = ActionUtility.execute_http_request(
+            http_response = await ActionUtility.execute_http_request_async(
                 http_url=http_url, request_method="POST", request_body=request_body
             )
         except Exception as e:
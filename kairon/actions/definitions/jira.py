@@ -51,7 +51,7 @@ class ActionJiraTicket(ActionsBase):
         """
         status = "SUCCESS"
         exception = None
-        action_config = self.retrieve_config()
+        action_config = self.get_config()
         bot_response = action_config.get("response")
         summary = f"{tracker.sender_id} {action_config['summary']}"
         api_token = action_config.get("api_token")
@@ -59,7 +59,8 @@ class ActionJiraTicket(ActionsBase):
             tracker_data = ActionUtility.build_context(tracker)
             api_token = ActionUtility.retrieve_value_for_custom_action_parameter(tracker_data, api_token, self.bot)
             _, msgtrail = ActionUtility.prepare_message_trail_as_str(tracker.events)
-            ActionUtility.create_jira_issue(
+            await ActionUtility.run_in_executor(
+                ActionUtility.create_jira_issue,
                 url=action_config['url'],
                 username=action_config['user_name'],
                 api_token=api_token,
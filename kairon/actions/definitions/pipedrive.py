@@ -51,7 +51,7 @@ class ActionPipedriveLeads(ActionsBase):
         """
         status = "SUCCESS"
         exception = None
-        action_config = self.retrieve_config()
+        action_config = self.get_config()
         bot_response = action_config.get("response")
         title = f"{tracker.sender_id} {action_config['title']}"
         api_token = action_config.get('api_token')
@@ -60,7 +60,8 @@ class ActionPipedriveLeads(ActionsBase):
             api_token = ActionUtility.retrieve_value_for_custom_action_parameter(tracker_data, api_token, self.bot)
             _, conversation_as_str = ActionUtility.prepare_message_trail_as_str(tracker.events)
             metadata = ActionUtility.prepare_pipedrive_metadata(tracker, action_config)
-            ActionUtility.create_pipedrive_lead(
+            await ActionUtility.run_in_executor(
+                ActionUtility.create_pipedrive_lead,
                 domain=action_config['domain'],
                 api_token=api_token,
                 title=title,
@@ -60,10 +60,10 @@ class ActionPrompt(ActionsBase):
 
         try:
             user_msg = self.__get_user_msg(tracker)
-            k_faq_action_config, bot_settings = self.retrieve_config()
+            k_faq_action_config, bot_settings = self.get_config()
             llm_params = await self.__get_llm_params(k_faq_action_config, dispatcher, tracker, domain)
             llm = LLMFactory.get_instance("faq")(self.bot, bot_settings["llm_settings"])
-            llm_response = llm.predict(user_msg, **llm_params)
+            llm_response = await ActionUtility.run_in_executor(llm.predict, user_msg, **llm_params)
             status = "FAILURE" if llm_response.get("is_failure", False) is True else status
             exception = llm_response.get("exception")
             is_from_cache = llm_response['is_from_cache']
@@ -73,8 +73,9 @@ class ActionPrompt(ActionsBase):
                 bot_response = llm_response['content']
             tracker_data = ActionUtility.build_context(tracker, True)
             response_context = self.__add_user_context_to_http_response(bot_response, tracker_data)
-            slot_values, slot_eval_log = ActionUtility.fill_slots_from_response(k_faq_action_config.get('set_slots', []),
-                                                                                response_context)
+            slot_values, slot_eval_log = await ActionUtility.run_in_executor(
+                ActionUtility.fill_slots_from_response, k_faq_action_config.get('set_slots', []), response_context
+            )
             if slot_values:
                 slots_to_fill.update(slot_values)
         except Exception as e:
@@ -52,7 +52,7 @@ class ActionRazorpay(ActionsBase):
         """
         status = "SUCCESS"
         exception, http_response, bot_response = None, None, None
-        action_config = self.retrieve_config()
+        action_config = self.get_config()
         api_key = action_config.get('api_key')
         api_secret = action_config.get('api_secret')
         amount = action_config.get('amount')
@@ -74,7 +74,7 @@ class ActionRazorpay(ActionsBase):
                 "amount": amount, "currency": currency,
                 "customer": {"username": username, "email": email, "contact": contact}
             }
-            http_response = ActionUtility.execute_http_request(
+            http_response = await ActionUtility.execute_http_request_async(
                 headers=headers, http_url=ActionRazorpay.__URL, request_method="POST", request_body=body
             )
             bot_response = http_response["short_url"]
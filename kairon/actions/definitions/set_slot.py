@@ -51,7 +51,7 @@ class ActionSetSlot(ActionsBase):
         message = []
         reset_slots = {}
         status = 'SUCCESS'
-        action_config = self.retrieve_config()
+        action_config = self.get_config()
         for slots_to_reset in action_config['set_slots']:
             if slots_to_reset['type'] == SLOT_SET_TYPE.FROM_VALUE.value:
                 reset_slots[slots_to_reset['name']] = slots_to_reset['value']
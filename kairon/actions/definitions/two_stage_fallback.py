@@ -53,7 +53,7 @@ class ActionTwoStageFallback(ActionsBase):
         """
         status = "SUCCESS"
         exception = None
-        action_config = self.retrieve_config()
+        action_config = self.get_config()
         intent_ranking = tracker.latest_message.get("intent_ranking")
         text_recommendations = action_config['text_recommendations']
         trigger_rules = action_config.get('trigger_rules')
@@ -65,7 +65,7 @@ class VectorEmbeddingsDbAction(ActionsBase):
         msg_logger = []
 
         try:
-            vector_action_config = self.retrieve_config()
+            vector_action_config = self.get_config()
             dispatch_bot_response = vector_action_config['response']['dispatch']
             failure_response = vector_action_config['failure_response']
             collection_name = vector_action_config['collection']
@@ -77,13 +77,18 @@ class VectorEmbeddingsDbAction(ActionsBase):
                 else payload_type.get('value')
             msg_logger.append(request_body)
             tracker_data = ActionUtility.build_context(tracker, True)
-            response = vector_db.perform_operation(operation_type.get('value'), request_body)
+            response = await ActionUtility.run_in_executor(
+                vector_db.perform_operation, operation_type.get('value'), request_body
+            )
             logger.info("response: " + str(response))
             response_context = self.__add_user_context_to_http_response(response, tracker_data)
-            bot_response, bot_resp_log = ActionUtility.compose_response(vector_action_config['response'], response_context)
+            bot_response, bot_resp_log = await ActionUtility.run_in_executor(
+                ActionUtility.compose_response, vector_action_config['response'], response_context
+            )
             msg_logger.append(bot_resp_log)
-            slot_values, slot_eval_log = ActionUtility.fill_slots_from_response(vector_action_config.get('set_slots', []),
-                                                                                response_context)
+            slot_values, slot_eval_log = await ActionUtility.run_in_executor(
+                ActionUtility.fill_slots_from_response, vector_action_config.get('set_slots', []), response_context
+            )
             msg_logger.extend(slot_eval_log)
             filled_slots.update(slot_values)
             logger.info("response: " + str(bot_response))
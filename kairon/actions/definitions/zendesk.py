@@ -51,7 +51,7 @@ class ActionZendeskTicket(ActionsBase):
         """
         status = "SUCCESS"
         exception = None
-        action_config = self.retrieve_config()
+        action_config = self.get_config()
         bot_response = action_config.get("response")
         subject = f"{tracker.sender_id} {action_config['subject']}"
         api_token = action_config.get('api_token')
@@ -59,7 +59,8 @@ class ActionZendeskTicket(ActionsBase):
             tracker_data = ActionUtility.build_context(tracker)
             api_token = ActionUtility.retrieve_value_for_custom_action_parameter(tracker_data, api_token, self.bot)
             comment = ActionUtility.prepare_email_body(tracker.events, action_config['subject'])
-            ActionUtility.create_zendesk_ticket(
+            await ActionUtility.run_in_executor(
+                ActionUtility.create_zendesk_ticket,
                 subdomain=action_config['subdomain'],
                 user_name=action_config['user_name'],
                 api_token=api_token,
@@ -4,6 +4,7 @@ from abc import ABC
 from rasa_sdk import utils
 from rasa_sdk.interfaces import ActionExecutionRejection, ActionNotFoundException
 from tornado.escape import json_decode, json_encode
+from kairon.shared.actions.circuit_breaker import CircuitBreaker
 from kairon.shared.tornado.handlers.base import BaseHandler
 from rasa_sdk.executor import CollectingDispatcher, ActionExecutor
 from .processor import ActionProcessor
@@ -54,3 +55,10 @@ class ActionHandler(BaseHandler, ABC):
             body = {"error": e.message, "action_name": e.action_name}
             self.set_status(400)
             self.write(json_encode(body))
+
+
+class CircuitBreakerHandler(BaseHandler, ABC):
+
+    async def get(self):
+        self.set_status(200)
+        self.write(json_encode({"data": CircuitBreaker.get_state(), "success": True, "error_code": 0, "message": None}))
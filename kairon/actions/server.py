@@ -1,3 +1,4 @@
+import signal
 from os import getenv
 
 from loguru import logger
@@ -8,7 +9,7 @@ from tornado.options import parse_command_line
 from tornado.web import Application
 
 from kairon.shared.tornado.handlers.index import IndexHandler
-from .handlers.action import ActionHandler
+from .handlers.action import ActionHandler, CircuitBreakerHandler
 from ..shared.account.processor import AccountProcessor
 from ..shared.utils import Utility
 
@@ -20,6 +21,7 @@ def make_app():
     return Application([
         (r"/", IndexHandler),
         (r"/webhook", ActionHandler),
+        (r"/metrics/circuit_breaker", CircuitBreakerHandler),
     ], compress_response=True, debug=False)
 
 
@@ -32,5 +34,6 @@ if __name__ == "__main__":
     server = HTTPServer(app)
     server.bind(5055)
     server.start(num_processes=int(getenv("WEB_CONCURRENCY", "1")))
+    signal.signal(signal.SIGTERM, lambda *args: IOLoop.current().add_callback_from_signal(IOLoop.current().stop))
     IOLoop.current().start()
     logger.info("Server Started")
@@ -321,6 +321,21 @@ class ActionResponseEvaluation(BaseModel):
         return values
 
 
+class HttpActionCacheConfig(BaseModel):
+    enable: bool = False
+    ttl: int = 300
+    bypass_slot: str = None
+
+    @validator("ttl")
+    def validate_ttl(cls, v, values, **kwargs):
+        from kairon.shared.utils import Utility
+
+        max_ttl = Utility.environment['action']['response_cache']['max_ttl']
+        if not 0 < v <= max_ttl:
+            raise ValueError(f"ttl must be between 1 and {max_ttl} seconds")
+        return v
+
+
 class HttpActionConfigRequest(BaseModel):
     action_name: constr(to_lower=True, strip_whitespace=True)
     content_type: HttpContentType = HttpContentType.application_json
@@ -331,6 +346,7 @@ class HttpActionConfigRequest(BaseModel):
     dynamic_params: str = None
     headers: List[HttpActionParameters] = []
     set_slots: List[SetSlotsUsingActionResponse] = []
+    cache: HttpActionCacheConfig = None
 
     @validator("action_name")
     def validate_action_name(cls, v, values, **kwargs):
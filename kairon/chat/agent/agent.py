@@ -1,13 +1,30 @@
+from threading import Lock
 from typing import Optional, Callable, Text
 
+from loguru import logger
 from rasa.core.agent import Agent
+from rasa.core.channels import UserMessage
 from rasa.core.exceptions import AgentNotReady
+from rasa.shared.core.constants import ACTION_LISTEN_NAME
+from rasa.shared.core.events import ActionExecuted, UserUttered
+from rasa.shared.core.trackers import DialogueStateTracker
 
 from kairon.chat.agent.message_processor import KaironMessageProcessor
+from kairon.chat.cache import ParseCache
+from kairon.shared.trackers import KMongoTrackerStore
+from kairon.shared.utils import Utility
 
 
 class KaironAgent(Agent):
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.in_flight = 0
+        self.retired = False
+        self.__lock = Lock()
+        self.__parse_cache = None
+        self.__parse_cache_initialized = False
+
     def create_processor(
         self, preprocessor: Optional[Callable[[Text], Text]] = None
     ):
@@ -29,4 +46,95 @@ class KaironAgent(Agent):
             self.nlg,
             action_endpoint=self.action_endpoint,
             message_preprocessor=preprocessor,
+            parse_cache=self.parse_cache,
+            fingerprint=self.fingerprint,
+        )
+
+    @property
+    def parse_cache(self) -> Optional[ParseCache]:
+        """
+        Cache of NLU parse results of the model.
+        Created only if enabled and the NLU pipeline is deterministic.
+        Cache belongs to the agent, hence it is discarded when the model is reloaded.
+        """
+        if not self.__parse_cache_initialized:
+            config = Utility.environment['chat'].get('parse_cache', {})
+            pipeline = getattr(getattr(self.interpreter, "interpreter", None), "pipeline", None)
+            if config.get('enable') and ParseCache.is_cacheable(pipeline):
+                self.__parse_cache = ParseCache(config['max_size'])
+            self.__parse_cache_initialized = True
+        return self.__parse_cache
+
+    async def handle_message(
+        self,
+        message: UserMessage,
+        message_preprocessor: Optional[Callable[[Text], Text]] = None,
+        **kwargs,
+    ):
+        """Handles message while keeping track of requests in flight so that
+        a retired agent is closed only after they complete."""
+        with self.__lock:
+            self.in_flight += 1
+        try:
+            return await super().handle_message(message, message_preprocessor, **kwargs)
+        finally:
+            self.release()
+
+    async def warm_up(self, text: Text = "hello"):
+        """
+        Runs a synthetic parse and prediction so that lazily initialised
+        components are ready before the agent serves traffic.
+        Nothing is persisted in the tracker store.
+
+        :param text: message to parse
+        """
+        parse_data = await self.parse_message_using_nlu_interpreter(text)
+        if not self.policy_ensemble:
+            return
+        tracker = DialogueStateTracker.from_events(
+            "kairon_warm_up",
+            [ActionExecuted(ACTION_LISTEN_NAME), UserUttered(text, parse_data["intent"], parse_data["entities"], parse_data)],
+            slots=self.domain.slots
         )
+        self.create_processor()._get_next_action_probabilities(tracker)
+
+    def acquire(self) -> bool:
+        """
+        Registers a request in flight unless the agent is retired.
+        Checked under the same lock as retire, so an acquired agent is never closed before it is released.
+
+        :return: whether the agent is acquired
+        """
+        with self.__lock:
+            if self.retired:
+                return False
+            self.in_flight += 1
+            return True
+
+    def release(self):
+        """
+        Completes a request in flight.
+        Agent is closed if it is retired and this was its last request.
+        """
+        with self.__lock:
+            self.in_flight -= 1
+            should_close = self.retired and self.in_flight == 0
+        if should_close:
+            self.close()
+
+    def retire(self):
+        """
+        Marks the agent as replaced by a newer one.
+        Agent is closed once requests in flight complete.
+        """
+        with self.__lock:
+            self.retired = True
+            should_close = self.in_flight == 0
+        if should_close:
+            self.close()
+
+    def close(self):
+        """Closes connections held by the agent."""
+        if isinstance(self.tracker_store, KMongoTrackerStore):
+            self.tracker_store.client.close()
+        logger.debug("Closed retired agent")
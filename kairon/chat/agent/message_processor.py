@@ -1,25 +1,53 @@
-from typing import Tuple, Optional, Text
+from typing import Tuple, Optional, Text, Dict
 import rasa
 from rasa.core.actions.action import Action, ActionRetrieveResponse, ActionEndToEndResponse, RemoteAction, default_actions
 from rasa.core.channels import UserMessage, OutputChannel, CollectingOutputChannel
 from rasa.core.policies.policy import PolicyPrediction
 from rasa.core.processor import MessageProcessor, logger
-from rasa.shared.constants import DOCS_URL_POLICIES, UTTER_PREFIX
+from rasa.shared.constants import DOCS_URL_POLICIES, UTTER_PREFIX, DEFAULT_SENDER_ID
 from rasa.shared.core.domain import Domain
 from rasa.shared.core.events import UserUttered
 from rasa.shared.core.trackers import DialogueStateTracker
 from rasa.utils.endpoints import EndpointConfig
 
+from kairon.chat.cache import ParseCache
+from kairon.chat.latency import TurnLatency
 from kairon.shared.metering.constants import MetricType
 from kairon.shared.metering.metering_processor import MeteringProcessor
+from kairon.shared.trackers import AsyncKMongoTrackerStore
 
 
 class KaironMessageProcessor(MessageProcessor):
     """
     Class overriding MessageProcessor implementation from rasa.
     This is done to also retrieve model predictions along with the message response.
+    Time spent in every stage of the turn is recorded as well.
     """
 
+    def __init__(self, *args, parse_cache: Optional[ParseCache] = None, fingerprint: Optional[Text] = None, **kwargs):
+        """
+        :param parse_cache: cache of NLU parse results, messages are always parsed if not set
+        :param fingerprint: fingerprint of the model, parse results are cached against it
+        """
+        super().__init__(*args, **kwargs)
+        self.latency = TurnLatency()
+        self.parse_cache = parse_cache
+        self.fingerprint = fingerprint
+
+    async def parse_message(
+        self, message: UserMessage, tracker: Optional[DialogueStateTracker] = None
+    ) -> Dict:
+        """Parses message, serving parse results of messages with the same text from cache if enabled."""
+        if self.parse_cache is None:
+            return await super().parse_message(message, tracker)
+
+        text = self.message_preprocessor(message.text) if self.message_preprocessor else message.text
+        parse_data = self.parse_cache.get(self.fingerprint, text)
+        if parse_data is None:
+            parse_data = await super().parse_message(message, tracker)
+            self.parse_cache.set(self.fingerprint, text, parse_data)
+        return parse_data
+
     async def _handle_message_with_tracker(
         self, message: UserMessage, tracker: DialogueStateTracker
     ):
@@ -27,7 +55,8 @@ class KaironMessageProcessor(MessageProcessor):
         if message.parse_data:
             parse_data = message.parse_data
         else:
-            parse_data = await self.parse_message(message, tracker)
+            with self.latency.span("parse_message"):
+                parse_data = await self.parse_message(message, tracker)
 
         # don't ever directly mutate the tracker
         # - instead pass its events to log
@@ -84,6 +113,39 @@ class KaironMessageProcessor(MessageProcessor):
 
         return actions_predicted
 
+    async def _run_action(
+        self, action: Action, tracker: DialogueStateTracker, output_channel: OutputChannel, nlg, prediction: PolicyPrediction
+    ) -> bool:
+        with self.latency.span("action", action=action.name()):
+            return await super()._run_action(action, tracker, output_channel, nlg, prediction)
+
+    async def fetch_tracker_and_update_session(
+        self,
+        sender_id: Text,
+        output_channel: Optional[OutputChannel] = None,
+        metadata: Optional[Dict] = None,
+    ) -> DialogueStateTracker:
+        """
+        Fetches tracker for `sender_id` and updates its conversation session.
+        Tracker is fetched without blocking the event loop if the tracker store supports it.
+        """
+        if not isinstance(self.tracker_store, AsyncKMongoTrackerStore):
+            return await super().fetch_tracker_and_update_session(sender_id, output_channel, metadata)
+
+        tracker = await self.tracker_store.get_or_create_tracker_async(
+            sender_id or DEFAULT_SENDER_ID, append_action_listen=False
+        )
+        await self._update_tracker_session(tracker, output_channel, metadata)
+        return tracker
+
+    async def _save_tracker_async(self, tracker: DialogueStateTracker):
+        """Saves tracker without blocking the event loop if the tracker store supports it."""
+        with self.latency.span("save_tracker"):
+            if isinstance(self.tracker_store, AsyncKMongoTrackerStore):
+                await self.tracker_store.save_async(tracker)
+            else:
+                self._save_tracker(tracker)
+
     async def log_message(
         self, message: UserMessage, should_save_tracker: bool = True
     ):
@@ -96,23 +158,26 @@ class KaironMessageProcessor(MessageProcessor):
         """
         # we have a Tracker instance for each user
         # which maintains conversation state
-        tracker = await self.fetch_tracker_and_update_session(
-            message.sender_id, message.output_channel, message.metadata
-        )
+        with self.latency.span("tracker_fetch"):
+            tracker = await self.fetch_tracker_and_update_session(
+                message.sender_id, message.output_channel, message.metadata
+            )
 
         predictions = await self._handle_message_with_tracker(message, tracker)
 
         if should_save_tracker:
             # save tracker state to continue conversation from this state
-            self._save_tracker(tracker)
+            await self._save_tracker_async(tracker)
 
         return tracker, predictions
 
     async def handle_message(
         self, message: UserMessage
     ):
-        """Handle a single message with this processor."""
+        """Handle a single message with this processor.
+        Time spent in each stage is added to the response if debug is requested in message metadata."""
         response = {"nlu": None, "action": None, "response": None, "slots": None, "events": None}
+        metadata = message.metadata or {}
 
         # preprocess message if necessary
         tracker, intent_predictions = await self.log_message(message, should_save_tracker=False)
@@ -120,12 +185,13 @@ class KaironMessageProcessor(MessageProcessor):
 
         if not self.policy_ensemble or not self.domain:
             # save tracker state to continue conversation from this state
-            self._save_tracker(tracker)
+            await self._save_tracker_async(tracker)
             rasa.shared.utils.io.raise_warning(
                 "No policy ensemble or domain set. Skipping action prediction "
                 "and execution.",
                 docs=DOCS_URL_POLICIES,
             )
+            self.__record_latency(response, metadata)
             return response
 
         actions_predictions = await self._predict_and_execute_next_action(message.output_channel, tracker)
@@ -133,19 +199,25 @@ class KaironMessageProcessor(MessageProcessor):
         response["slots"] = [f"{s.name}: {s.value}" for s in tracker.slots.values()]
 
         # save tracker state to continue conversation from this state
-        self._save_tracker(tracker)
-        metadata = message.metadata
+        await self._save_tracker_async(tracker)
         metric_type = MetricType.prod_chat if metadata.get('is_integration_user') else MetricType.test_chat
-        MeteringProcessor.add_metrics(
-            metadata.get('bot'), metadata.get('account'), metric_type, user_id=message.sender_id,
-            channel_type=metadata.get('channel_type'), bsp_type=metadata.get('bsp_type')
-        )
+        with self.latency.span("metering"):
+            MeteringProcessor.add_metrics(
+                metadata.get('bot'), metadata.get('account'), metric_type, user_id=message.sender_id,
+                channel_type=metadata.get('channel_type'), bsp_type=metadata.get('bsp_type')
+            )
+        self.__record_latency(response, metadata)
         if isinstance(message.output_channel, CollectingOutputChannel):
             response["response"] = message.output_channel.messages
             return response
 
         return response
 
+    def __record_latency(self, response: Dict, metadata: Dict):
+        spans = self.latency.finish(metadata.get('bot'))
+        if metadata.get('debug'):
+            response["latency"] = spans
+
     def predict_next_action(
         self, tracker: DialogueStateTracker
     ) -> Tuple[rasa.core.actions.action.Action, PolicyPrediction]:
@@ -154,7 +226,8 @@ class KaironMessageProcessor(MessageProcessor):
         This should be overwritten by more advanced policies to use
         ML to predict the action. Returns the index of the next action.
         """
-        prediction = self._get_next_action_probabilities(tracker)
+        with self.latency.span("policy_prediction"):
+            prediction = self._get_next_action_probabilities(tracker)
 
         action = KaironMessageProcessor.__action_for_index(
             prediction.max_confidence_index, self.domain, self.action_endpoint
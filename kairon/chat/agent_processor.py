@@ -1,13 +1,20 @@
-from typing import Text
+import asyncio
+import os
+import time
+from concurrent.futures import Future, TimeoutError, ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from threading import Lock, BoundedSemaphore
+from typing import Text, Dict, List
 
 from loguru import logger as logging
 from rasa.core.agent import Agent
 
-from kairon.chat.cache import AgentCache
+from kairon.chat.cache import AgentCache, MemoryAwareAgentCache
 from kairon.exceptions import AppException
 from kairon.shared.data.processor import MongoProcessor
 from .agent.agent import KaironAgent
 from .cache import InMemoryAgentCache
+from .model_store import SharedModelStore
 from ..shared.utils import Utility
 
 
@@ -18,38 +25,246 @@ class AgentProcessor:
 
     mongo_processor = MongoProcessor()
     cache_provider: AgentCache = InMemoryAgentCache()
+    cache_metrics = {"hits": 0, "misses": 0, "loads": 0, "load_failures": 0, "load_time": 0.0}
+    reload_stats = {}
+    warm_up_status = {"ready": True, "bots": [], "loaded": [], "failed": []}
+    __loading = {}
+    __loading_lock = Lock()
+    __metrics_lock = Lock()
+    __reload_semaphore = None
 
     @staticmethod
-    def get_agent(bot: Text) -> Agent:
+    def get_agent(bot: Text, timeout: float = None) -> Agent:
+        """
+        fetch the bot agent from cache if exist otherwise load it into the cache.
+        Concurrent requests for a bot which is being loaded wait for the same load.
+
+        :param bot: bot id
+        :param timeout: maximum seconds to wait for the bot to load, waits indefinitely if None
+        :return: Agent Object
+        """
+        agent = AgentProcessor.cache_provider.get(bot)
+        if agent is not None:
+            AgentProcessor.__count("hits")
+        else:
+            AgentProcessor.__count("misses")
+            future, is_loader = AgentProcessor.__get_or_create_load(bot)
+            if is_loader:
+                AgentProcessor.__load(bot, future)
+            try:
+                agent = future.result(timeout)
+            except TimeoutError:
+                raise AppException("Timed out waiting for bot to load!")
+        Utility.record_custom_metric_apm(num_models=AgentProcessor.cache_provider.len())
+        return agent
+
+    @staticmethod
+    async def get_agent_async(bot: Text, timeout: float = None) -> Agent:
         """
         fetch the bot agent from cache if exist otherwise load it into the cache
+        without blocking the event loop.
+        Concurrent requests for a bot which is being loaded wait for the same load.
 
         :param bot: bot id
+        :param timeout: maximum seconds to wait for the bot to load, waits indefinitely if None
         :return: Agent Object
         """
-        if not AgentProcessor.cache_provider.is_exists(bot):
-            AgentProcessor.reload(bot)
+        agent = AgentProcessor.cache_provider.get(bot)
+        if agent is not None:
+            AgentProcessor.__count("hits")
+        else:
+            AgentProcessor.__count("misses")
+            future, is_loader = AgentProcessor.__get_or_create_load(bot)
+            if is_loader:
+                asyncio.get_event_loop().run_in_executor(None, AgentProcessor.__load, bot, future)
+            try:
+                agent = await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), timeout)
+            except asyncio.TimeoutError:
+                raise AppException("Timed out waiting for bot to load!")
         Utility.record_custom_metric_apm(num_models=AgentProcessor.cache_provider.len())
-        return AgentProcessor.cache_provider.get(bot)
+        return agent
 
     @staticmethod
-    def reload(bot: Text):
+    @asynccontextmanager
+    async def acquire_agent(bot: Text, timeout: float = None):
         """
-        reload bot agent
+        fetches the bot agent and holds it for the duration of the context,
+        so that it is not closed if it is swapped by a reload while in use.
+        Agent which is retired before it could be acquired is fetched again from cache,
+        where its replacement is set before it is retired.
 
         :param bot: bot id
-        :return: None
+        :param timeout: maximum seconds to wait for the bot to load, waits indefinitely if None
+        :return: Agent Object
         """
+        agent = await AgentProcessor.get_agent_async(bot, timeout)
+        while isinstance(agent, KaironAgent) and not agent.acquire():
+            agent = await AgentProcessor.get_agent_async(bot, timeout)
         try:
-            endpoint = AgentProcessor.mongo_processor.get_endpoints(
-                bot, raise_exception=False
-            )
-            action_endpoint = Utility.get_action_url(endpoint)
-            model_path = Utility.get_latest_model(bot)
-            domain = AgentProcessor.mongo_processor.load_domain(bot)
-            mongo_store = Utility.get_local_mongo_store(bot, domain)
-            agent = KaironAgent.load(model_path, action_endpoint=action_endpoint, tracker_store=mongo_store)
-            AgentProcessor.cache_provider.set(bot, agent)
+            yield agent
+        finally:
+            if isinstance(agent, KaironAgent):
+                agent.release()
+
+    @staticmethod
+    def __count(metric: Text, value: float = 1):
+        with AgentProcessor.__metrics_lock:
+            AgentProcessor.cache_metrics[metric] += value
+
+    @staticmethod
+    def __get_or_create_load(bot: Text):
+        """
+        fetches the in-flight load for the bot or registers a new one.
+        Cache is checked again under the lock, as a load may have completed
+        since the caller found the bot missing from cache.
+        Future resolves to the loaded agent, so that waiters get it even if
+        it is evicted from cache before they are woken up.
+
+        :param bot: bot id
+        :return: load future and whether the caller should perform the load
+        """
+        with AgentProcessor.__loading_lock:
+            future = AgentProcessor.__loading.get(bot)
+            if future:
+                return future, False
+            future = Future()
+            future.set_running_or_notify_cancel()
+            agent = AgentProcessor.cache_provider.get(bot)
+            if agent is not None:
+                future.set_result(agent)
+                return future, False
+            AgentProcessor.__loading[bot] = future
+            return future, True
+
+    @staticmethod
+    def __load(bot: Text, future: Future):
+        try:
+            future.set_result(AgentProcessor.reload(bot))
         except Exception as e:
-            logging.exception(e)
-            raise AppException("Bot has not been trained yet!")
+            future.set_exception(e)
+        finally:
+            with AgentProcessor.__loading_lock:
+                AgentProcessor.__loading.pop(bot, None)
+
+    @staticmethod
+    def reload(bot: Text):
+        """
+        loads the latest model of the bot, warms it up and then swaps it
+        with the agent in cache. Agent in cache is retained if the new model
+        fails to load or warm up and is closed once its requests in flight complete.
+
+        :param bot: bot id
+        :return: loaded agent
+        """
+        with AgentProcessor.__get_reload_semaphore():
+            try:
+                start_time = time.time()
+                start_memory = MemoryAwareAgentCache.resident_memory()
+                endpoint = AgentProcessor.mongo_processor.get_endpoints(
+                    bot, raise_exception=False
+                )
+                action_endpoint = Utility.get_action_url(endpoint)
+                model_path = Utility.get_latest_model(bot)
+                domain = AgentProcessor.mongo_processor.load_domain(bot)
+                mongo_store = Utility.get_local_mongo_store(bot, domain)
+                model_dir = model_path
+                if SharedModelStore.is_enabled():
+                    model_dir = SharedModelStore.get_model_directory(bot, model_path)
+                agent = KaironAgent.load(
+                    model_dir, action_endpoint=action_endpoint, tracker_store=mongo_store,
+                    path_to_model_archive=model_path
+                )
+                load_time = time.time() - start_time
+                # approximate, growth of process memory includes allocations of other loads running concurrently
+                footprint = max(MemoryAwareAgentCache.resident_memory() - start_memory, os.path.getsize(model_path))
+                warm_up_start_time = time.time()
+                AgentProcessor.__warm_up(agent)
+                warm_up_time = time.time() - warm_up_start_time
+            except Exception as e:
+                logging.exception(e)
+                if SharedModelStore.is_enabled():
+                    SharedModelStore.release_models(bot)
+                AgentProcessor.__count("load_failures")
+                AgentProcessor.reload_stats[bot] = {"status": "failed", "error": str(e), "timestamp": time.time()}
+                raise AppException("Bot has not been trained yet!")
+
+        old_agent = AgentProcessor.cache_provider.get(bot)
+        AgentProcessor.cache_provider.set(bot, agent, footprint=footprint)
+        if isinstance(old_agent, KaironAgent):
+            old_agent.retire()
+        if SharedModelStore.is_enabled():
+            SharedModelStore.release_models(bot, model_dir)
+        AgentProcessor.__count("loads")
+        AgentProcessor.__count("load_time", load_time + warm_up_time)
+        AgentProcessor.reload_stats[bot] = {
+            "status": "success", "load_time": load_time, "warm_up_time": warm_up_time, "timestamp": time.time()
+        }
+        logging.info(f"Agent swapped for bot {bot}: load_time={load_time:.3f}s, warm_up_time={warm_up_time:.3f}s")
+        return agent
+
+    @staticmethod
+    def __warm_up(agent: KaironAgent):
+        """
+        runs warm up of the agent on its own event loop in a separate thread,
+        as reload may be called from a thread which is already running an event loop.
+
+        :param agent: agent to warm up
+        :return: None
+        """
+        with ThreadPoolExecutor(1, thread_name_prefix="agent_warm_up") as executor:
+            executor.submit(asyncio.run, agent.warm_up()).result()
+
+    @staticmethod
+    def __get_reload_semaphore():
+        """
+        fetches semaphore limiting the number of models loaded concurrently.
+
+        :return: BoundedSemaphore
+        """
+        with AgentProcessor.__loading_lock:
+            if not AgentProcessor.__reload_semaphore:
+                max_concurrent = Utility.environment['chat']['reload'].get('max_concurrent') or 2
+                AgentProcessor.__reload_semaphore = BoundedSemaphore(max_concurrent)
+        return AgentProcessor.__reload_semaphore
+
+    @staticmethod
+    def get_reload_stats(bot: Text) -> Dict:
+        """
+        fetches status and timings of last model reload of the bot
+
+        :param bot: bot id
+        :return: dict
+        """
+        return AgentProcessor.reload_stats.get(bot)
+
+    @staticmethod
+    def warm_up_cache(bots: List[Text]):
+        """
+        loads agents of the bots into cache.
+        Readiness is reported once every bot has been attempted.
+
+        :param bots: bot ids
+        :return: None
+        """
+        AgentProcessor.warm_up_status = {"ready": False, "bots": bots, "loaded": [], "failed": []}
+        for bot in bots:
+            try:
+                AgentProcessor.get_agent(bot)
+                AgentProcessor.warm_up_status["loaded"].append(bot)
+            except Exception as e:
+                logging.error(f"Failed to warm up agent for bot {bot}: {e}")
+                AgentProcessor.warm_up_status["failed"].append(bot)
+        AgentProcessor.warm_up_status["ready"] = True
+        logging.info(f"Agent cache warmed up: {AgentProcessor.warm_up_status}")
+
+    @staticmethod
+    def get_cache_stats() -> Dict:
+        """
+        fetches agent cache hits, misses, evictions, approximate footprints and time spent in loading agents
+
+        :return: dict
+        """
+        with AgentProcessor.__metrics_lock:
+            stats = AgentProcessor.cache_metrics.copy()
+        stats.update(AgentProcessor.cache_provider.stats() or {})
+        return stats
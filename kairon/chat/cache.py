@@ -1,16 +1,26 @@
-from typing import Text
+import os
+import resource
+from collections import OrderedDict
+from copy import deepcopy
+from threading import RLock, Lock
+from typing import Text, List, Dict, Any, Optional
 
 from cachetools import LRUCache
+from loguru import logger
 from rasa.core.agent import Agent
 
+from kairon.exceptions import AppException
+from kairon.shared.utils import Utility
+
 
 class AgentCache:
-    def set(self, bot: Text, agent: Agent):
+    def set(self, bot: Text, agent: Agent, **kwargs):
         """
         loads the bot agent into cache
 
         :param bot: bot id
         :param agent: bot agent
+        :param kwargs: additional properties of the agent, eg: footprint
         :return: pass
         """
         pass
@@ -41,13 +51,22 @@ class AgentCache:
         """
         pass
 
+    def stats(self) -> Dict:
+        """
+        fetches cache usage statistics
+
+        :return: pass
+        """
+        pass
+
 
 class InMemoryAgentCache(AgentCache):
 
-    def __init__(self):
-        self.cache = LRUCache(maxsize=100)
+    def __init__(self, max_size: int = 100):
+        self.cache = LRUCache(maxsize=max_size)
+        self.evictions = 0
 
-    def set(self, bot: Text, agent: Agent):
+    def set(self, bot: Text, agent: Agent, **kwargs):
         """
         loads bot agent in LRU cache
 
@@ -57,6 +76,8 @@ class InMemoryAgentCache(AgentCache):
         """
         if bot in self.cache.keys():
             self.cache.pop(bot)
+        elif len(self.cache) >= self.cache.maxsize:
+            self.evictions += 1
         self.cache.__setitem__(bot, agent)
 
     def get(self, bot: Text) -> Agent:
@@ -83,3 +104,213 @@ class InMemoryAgentCache(AgentCache):
         :return: integer
         """
         return len(self.cache)
+
+    def stats(self) -> Dict:
+        """
+        fetches number of models loaded and evicted from LRU cache
+
+        :return: dict
+        """
+        return {"type": "lru", "size": len(self.cache), "max_size": self.cache.maxsize, "evictions": self.evictions}
+
+
+class MemoryAwareAgentCache(AgentCache):
+    """
+    LRU cache which evicts bot agents based on the memory occupied
+    by them instead of the number of agents loaded.
+    Footprints are approximate, measured by the caller as the growth of
+    resident memory of the process while the agent loads.
+    Agents of pinned bots are never evicted.
+    """
+
+    def __init__(self, memory_budget: int, pinned_bots: List[Text] = None):
+        """
+        :param memory_budget: maximum memory in bytes that loaded agents can occupy
+        :param pinned_bots: bots which should never be evicted from cache
+        """
+        self.memory_budget = memory_budget
+        self.pinned_bots = set(pinned_bots or [])
+        self.cache = OrderedDict()
+        self.footprints = {}
+        self.evictions = 0
+        self.__lock = RLock()
+
+    @staticmethod
+    def resident_memory() -> int:
+        """
+        fetches resident memory of the current process.
+        Falls back to peak resident memory where /proc is not available.
+
+        :return: memory in bytes
+        """
+        try:
+            with open("/proc/self/statm") as statm:
+                return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        except (OSError, ValueError, IndexError):
+            return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+    @property
+    def memory_used(self) -> int:
+        return sum(self.footprints.values())
+
+    def set(self, bot: Text, agent: Agent, footprint: int = 0, **kwargs):
+        """
+        loads bot agent in cache and evicts least recently used
+        agents till the memory occupied is within budget.
+
+        :param bot: bot id
+        :param agent: bot agent
+        :param footprint: approximate memory in bytes occupied by the agent
+        :return: None
+        """
+        with self.__lock:
+            self.cache.pop(bot, None)
+            self.cache[bot] = agent
+            self.footprints[bot] = footprint
+            self.__evict(protect=bot)
+
+    def __evict(self, protect: Text):
+        for bot in list(self.cache.keys()):
+            if self.memory_used <= self.memory_budget:
+                break
+            if bot == protect or bot in self.pinned_bots:
+                continue
+            self.cache.pop(bot)
+            footprint = self.footprints.pop(bot)
+            self.evictions += 1
+            logger.info(f"Evicted agent for bot {bot} occupying {footprint} bytes")
+        if self.memory_used > self.memory_budget:
+            logger.warning(f"Agent cache exceeds memory budget: {self.memory_used}/{self.memory_budget} bytes")
+
+    def get(self, bot: Text) -> Agent:
+        """
+        fetches bot agent from cache and marks it as recently used
+
+        :param bot: bot id
+        :return: Agent object
+        """
+        with self.__lock:
+            agent = self.cache.get(bot)
+            if agent is not None:
+                self.cache.move_to_end(bot)
+            return agent
+
+    def is_exists(self, bot: Text) -> bool:
+        """
+        checks if bot agent exist in cache
+
+        :param bot: bot id
+        :return: True/False
+        """
+        return bot in self.cache
+
+    def len(self):
+        """
+        fetches number of models loaded in cache
+
+        :return: integer
+        """
+        return len(self.cache)
+
+    def stats(self) -> Dict:
+        """
+        fetches memory occupied by each agent along with evictions
+
+        :return: dict
+        """
+        with self.__lock:
+            return {
+                "type": "memory", "size": len(self.cache), "memory_used": self.memory_used,
+                "memory_budget": self.memory_budget, "evictions": self.evictions,
+                "pinned_bots": list(self.pinned_bots), "footprints": dict(self.footprints)
+            }
+
+
+class AgentCacheFactory:
+
+    """
+    Factory to get agent cache implementation.
+    """
+
+    @staticmethod
+    def get_instance():
+        """
+        Fetches agent cache configured in system.yaml.
+
+        :return: AgentCache
+        """
+        config = Utility.environment.get('chat', {}).get('cache', {})
+        cache_type = config.get('type') or "lru"
+        if cache_type == "lru":
+            return InMemoryAgentCache(config.get('max_size') or 100)
+        elif cache_type == "memory":
+            memory_budget = config['memory_budget'] * 1024 * 1024
+            return MemoryAwareAgentCache(memory_budget, config.get('pinned_bots'))
+        raise AppException(f'{cache_type} type agent cache is not supported')
+
+
+class ParseCache:
+    """
+    LRU cache of NLU parse results keyed by model fingerprint and message text.
+    Results are copied on the way in and out so that callers can mutate them.
+    """
+
+    non_deterministic_components = {
+        "DucklingEntityExtractor", "DucklingHTTPExtractor", "OpenAIClassifier", "OpenAIFeaturizer"
+    }
+
+    def __init__(self, max_size: int = 1000):
+        self.cache = LRUCache(maxsize=max_size)
+        self.hits = 0
+        self.misses = 0
+        self.__lock = Lock()
+
+    @staticmethod
+    def is_cacheable(pipeline: Optional[List[Any]]) -> bool:
+        """
+        checks whether parse results of the NLU pipeline depend only on the message text,
+        ie, the pipeline has no component depending on time, external services or conversation context.
+
+        :param pipeline: components of the NLU pipeline
+        :return: True/False
+        """
+        if not pipeline:
+            return False
+        return not any(type(component).__name__ in ParseCache.non_deterministic_components for component in pipeline)
+
+    def get(self, fingerprint: Text, text: Text) -> Optional[Dict[Text, Any]]:
+        """
+        fetches parse result of the text
+
+        :param fingerprint: model fingerprint
+        :param text: message text
+        :return: parse result, None if not cached
+        """
+        with self.__lock:
+            parse_data = self.cache.get((fingerprint, text))
+            if parse_data is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return deepcopy(parse_data)
+
+    def set(self, fingerprint: Text, text: Text, parse_data: Dict[Text, Any]):
+        """
+        caches parse result of the text
+
+        :param fingerprint: model fingerprint
+        :param text: message text
+        :param parse_data: parse result
+        :return: None
+        """
+        parse_data = deepcopy(parse_data)
+        with self.__lock:
+            self.cache[(fingerprint, text)] = parse_data
+
+    def stats(self) -> Dict:
+        """
+        fetches cache hits and misses
+
+        :return: dict
+        """
+        return {"size": len(self.cache), "max_size": self.cache.maxsize, "hits": self.hits, "misses": self.misses}
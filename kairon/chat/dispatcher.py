@@ -0,0 +1,219 @@
+import asyncio
+import bisect
+import hashlib
+import re
+from abc import ABC
+from typing import List, Text, Optional, Dict
+
+from loguru import logger
+from tornado.escape import json_decode, json_encode
+from tornado.httpclient import AsyncHTTPClient, HTTPRequest
+from tornado.httputil import HTTPHeaders
+from tornado.web import RequestHandler, Application
+
+
+class ConsistentHashRing:
+    """
+    Maps keys to nodes such that adding or removing a node
+    only remaps the keys of that node.
+    """
+
+    def __init__(self, nodes: List, replicas: int = 100):
+        """
+        :param nodes: nodes to which keys are mapped
+        :param replicas: number of points of each node on the ring
+        """
+        self.ring = {}
+        for node in nodes:
+            for replica in range(replicas):
+                self.ring[self.__hash(f"{node}-{replica}")] = node
+        self.points = sorted(self.ring.keys())
+
+    @staticmethod
+    def __hash(key: Text) -> int:
+        return int(hashlib.md5(key.encode()).hexdigest(), 16)
+
+    def get_node(self, key: Text):
+        """
+        fetches node to which the key is mapped
+
+        :param key: key, eg: bot id
+        :return: node
+        """
+        index = bisect.bisect(self.points, self.__hash(key)) % len(self.points)
+        return self.ring[self.points[index]]
+
+
+class BotAffinityDispatcher:
+    """
+    Routes chat requests to worker processes such that
+    all requests of a bot are served by the same worker.
+    """
+
+    channel_url = re.compile(r"^/api/bot/(?:slack|telegram|hangouts|messenger|instagram|whatsapp|msteams)/([^/]+)/")
+    bot_url = re.compile(r"^/api/bot/([^/]+)/")
+    hop_by_hop_headers = {
+        "Connection", "Keep-Alive", "Proxy-Authenticate", "Proxy-Authorization", "Te", "Trailer",
+        "Transfer-Encoding", "Upgrade", "Content-Length", "Host", "Accept-Encoding", "Content-Encoding"
+    }
+
+    def __init__(self, worker_ports: List[int], host: Text = "127.0.0.1", max_clients: int = 1000):
+        """
+        :param worker_ports: ports on which worker processes listen
+        :param host: host on which worker processes listen
+        :param max_clients: maximum number of requests proxied concurrently
+        """
+        self.host = host
+        self.worker_ports = worker_ports
+        self.max_clients = max_clients
+        self.ring = ConsistentHashRing(worker_ports)
+
+    @staticmethod
+    def get_bot(path: Text) -> Optional[Text]:
+        """
+        extracts bot id from request path
+
+        :param path: request path
+        :return: bot id, None for requests which are not specific to a bot
+        """
+        match = BotAffinityDispatcher.channel_url.match(path) or BotAffinityDispatcher.bot_url.match(path + "/")
+        return match.group(1) if match else None
+
+    def get_worker_url(self, path: Text) -> Text:
+        """
+        fetches url of the worker serving the bot of the request.
+        Requests which are not specific to a bot are served by the first worker.
+
+        :param path: request uri
+        :return: worker url
+        """
+        bot = BotAffinityDispatcher.get_bot(path.split("?")[0])
+        port = self.ring.get_node(bot) if bot else self.worker_ports[0]
+        return f"http://{self.host}:{port}{path}"
+
+    async def fetch_from_workers(self, path: Text) -> Dict[int, Optional[Dict]]:
+        """
+        sends GET request to every worker.
+
+        :param path: request uri
+        :return: dict of worker port and its JSON response, None if the worker could not be reached
+        """
+        client = AsyncHTTPClient()
+        responses = await asyncio.gather(*[
+            client.fetch(f"http://{self.host}:{port}{path}", raise_error=False) for port in self.worker_ports
+        ])
+        results = {}
+        for port, response in zip(self.worker_ports, responses):
+            if response.code == 599:
+                logger.error(f"Failed to reach worker on port {port} for {path}: {response.error}")
+                results[port] = None
+            else:
+                results[port] = json_decode(response.body)
+        return results
+
+    def make_app(self) -> Application:
+        AsyncHTTPClient.configure(None, max_clients=self.max_clients)
+        return Application([
+            (r"/readiness", WorkersReadinessHandler, dict(dispatcher=self)),
+            (r"/metrics/latency", WorkersLatencyMetricsHandler, dict(dispatcher=self)),
+            (r".*", DispatchHandler, dict(dispatcher=self)),
+        ], compress_response=True, debug=False)
+
+
+class WorkersReadinessHandler(RequestHandler, ABC):
+    """
+    Reports readiness of all workers, which is ready
+    only once every worker has warmed up its agents.
+    """
+
+    def initialize(self, dispatcher: BotAffinityDispatcher):
+        self.dispatcher = dispatcher
+
+    async def get(self):
+        workers = await self.dispatcher.fetch_from_workers("/readiness")
+        data = {"loaded": 0, "failed": 0, "total": 0, "workers": {}}
+        for port, response in workers.items():
+            data["workers"][port] = bool(response and response["success"])
+            for key in ("loaded", "failed", "total"):
+                data[key] += (response or {}).get("data", {}).get(key, 0)
+        ready = all(data["workers"].values())
+        self.set_status(200 if ready else 503)
+        self.write(json_encode({
+            "data": data, "success": ready, "error_code": 0 if ready else 503,
+            "message": "Ready" if ready else "Warming up agents"
+        }))
+
+
+class WorkersLatencyMetricsHandler(RequestHandler, ABC):
+    """
+    Reports latency of all workers. As every bot is served by one worker,
+    stats of the workers are merged per bot.
+    """
+
+    def initialize(self, dispatcher: BotAffinityDispatcher):
+        self.dispatcher = dispatcher
+
+    async def get(self):
+        workers = await self.dispatcher.fetch_from_workers(self.request.uri)
+        data = {}
+        for response in workers.values():
+            data.update((response or {}).get("data") or {})
+        unreachable = [port for port, response in workers.items() if response is None]
+        self.set_status(200)
+        self.write(json_encode({
+            "data": data, "success": not unreachable, "error_code": 0 if not unreachable else 502,
+            "message": f"Workers on ports {unreachable} could not be reached" if unreachable else None
+        }))
+
+
+class DispatchHandler(RequestHandler, ABC):
+    """
+    Proxies request to the worker serving the bot,
+    streaming the response back as it is received.
+    """
+
+    SUPPORTED_METHODS = ("GET", "HEAD", "POST", "DELETE", "PATCH", "PUT", "OPTIONS")
+
+    def initialize(self, dispatcher: BotAffinityDispatcher):
+        self.dispatcher = dispatcher
+        self.response_headers = HTTPHeaders()
+
+    def set_default_headers(self):
+        self.clear_header("Content-Type")
+        self.clear_header("Server")
+
+    def __on_header(self, line: Text):
+        if line.startswith("HTTP/"):
+            self.set_status(int(line.split(" ")[1]))
+        elif line.strip():
+            self.response_headers.parse_line(line)
+        else:
+            for name, value in self.response_headers.get_all():
+                if name == "Set-Cookie":
+                    self.add_header(name, value)
+                elif name not in BotAffinityDispatcher.hop_by_hop_headers:
+                    self.set_header(name, value)
+
+    def __on_chunk(self, chunk: bytes):
+        self.write(chunk)
+        self.flush()
+
+    async def __proxy(self, *args):
+        headers = HTTPHeaders()
+        for name, value in self.request.headers.get_all():
+            if name not in BotAffinityDispatcher.hop_by_hop_headers and name != "X-Forwarded-For":
+                headers.add(name, value)
+        headers["X-Forwarded-For"] = self.request.headers.get("X-Forwarded-For", self.request.remote_ip)
+        request = HTTPRequest(
+            self.dispatcher.get_worker_url(self.request.uri), method=self.request.method, headers=headers,
+            body=self.request.body if self.request.method in {"POST", "PUT", "PATCH"} else None,
+            allow_nonstandard_methods=True, follow_redirects=False, decompress_response=False,
+            header_callback=self.__on_header, streaming_callback=self.__on_chunk, request_timeout=0
+        )
+        response = await AsyncHTTPClient().fetch(request, raise_error=False)
+        if response.code == 599:
+            logger.error(f"Failed to reach worker for {self.request.uri}: {response.error}")
+            self.set_status(502)
+        self.finish()
+
+    get = head = post = delete = patch = put = options = __proxy
@@ -1,12 +1,17 @@
+import asyncio
 import logging
 from abc import ABC
 
 from tornado import concurrent
 from tornado.escape import json_decode, json_encode
+from tornado.iostream import StreamClosedError
 from tornado.web import HTTPError
 
 from kairon.shared.models import User
 from kairon.shared.tornado.handlers.base import BaseHandler
+from ..agent_processor import AgentProcessor
+from .channels.stream import StreamingOutputChannel
+from ..latency import LatencyRecorder
 from ..utils import ChatUtils
 from ...live_agent.live_agent import LiveAgent
 
@@ -26,7 +31,7 @@ class ChatHandler(BaseHandler, ABC):
             user: User = super().authenticate(self.request, bot=bot)
             body = ChatUtils.decode_request(self.request)
             response = await ChatUtils.chat(body.get("data"), user.bot_account, bot, user.get_user(),
-                                            user.is_integration_user)
+                                            user.is_integration_user, body.get("debug", False))
             logger.info(f"text={body.get('data')} response={response}")
         except HTTPError as ex:
             logger.exception(ex)
@@ -42,6 +47,101 @@ class ChatHandler(BaseHandler, ABC):
         self.write(json_encode({"data": response, "success": success, "error_code": error_code, "message": message}))
 
 
+class StreamingChatHandler(BaseHandler, ABC):
+    """
+    Streams bot utterances as server sent events as soon as each action produces them.
+    Each utterance is sent as a message event and the complete response as a response event,
+    or an error event if the message could not be processed.
+    """
+
+    async def post(self, bot: str):
+        try:
+            user: User = super().authenticate(self.request, bot=bot)
+            body = ChatUtils.decode_request(self.request)
+        except HTTPError as ex:
+            logger.exception(ex)
+            self.set_status(200)
+            self.write(json_encode({"data": None, "success": False, "error_code": ex.status_code, "message": str(ex.reason)}))
+            return
+        except Exception as e:
+            logger.exception(e)
+            self.set_status(200)
+            self.write(json_encode({"data": None, "success": False, "error_code": 422, "message": str(e)}))
+            return
+
+        output_channel = StreamingOutputChannel()
+        chat = asyncio.ensure_future(ChatUtils.chat(
+            body.get("data"), user.bot_account, bot, user.get_user(), user.is_integration_user,
+            body.get("debug", False), output_channel
+        ))
+        chat.add_done_callback(lambda _: output_channel.close())
+        self.set_status(200)
+        self.set_header("Content-Type", "text/event-stream")
+        try:
+            async for utterance in output_channel.utterances():
+                await self.__send_event("message", utterance)
+            response = await chat
+            await self.__send_event(
+                "response", {"data": response, "success": True, "error_code": 0, "message": None}
+            )
+        except StreamClosedError:
+            chat.cancel()
+            return
+        except Exception as e:
+            logger.exception(e)
+            await self.__send_event("error", {"data": None, "success": False, "error_code": 422, "message": str(e)})
+        self.finish()
+
+    async def __send_event(self, event: str, data):
+        super(BaseHandler, self).write(f"event: {event}\ndata: {json_encode(data)}\n\n")
+        await self.flush()
+
+
+class BatchChatHandler(BaseHandler, ABC):
+    """
+    Processes a batch of messages and streams the result of each message,
+    as a json document per line, as soon as it is processed.
+    """
+
+    async def post(self, bot: str):
+        try:
+            user: User = super().authenticate(self.request, bot=bot)
+            body = ChatUtils.decode_batch_request(self.request, user.get_user(), user.is_integration_user)
+            results = ChatUtils.chat_batch(body["messages"], user.bot_account, bot, user.is_integration_user,
+                                           body.get("debug", False))
+            result = await results.__anext__()
+        except HTTPError as ex:
+            logger.exception(ex)
+            self.set_status(200)
+            self.write(json_encode({"data": None, "success": False, "error_code": ex.status_code, "message": str(ex.reason)}))
+            return
+        except Exception as e:
+            logger.exception(e)
+            self.set_status(200)
+            self.write(json_encode({"data": None, "success": False, "error_code": 422, "message": str(e)}))
+            return
+
+        self.set_status(200)
+        self.set_header("Content-Type", "application/x-ndjson")
+        try:
+            while True:
+                await self.__write_result(result)
+                result = await results.__anext__()
+        except StopAsyncIteration:
+            pass
+        finally:
+            await results.aclose()
+        self.finish()
+
+    async def __write_result(self, result: dict):
+        error = result.pop("error", None)
+        response = {
+            "data": result, "success": error is None, "error_code": 0 if error is None else 422, "message": error
+        }
+        super(BaseHandler, self).write(json_encode(response) + "\n")
+        await self.flush()
+
+
 class ReloadHandler(BaseHandler, ABC):
 
     async def get(self, bot: str):
@@ -113,3 +213,25 @@ class SessionConversationHandler(BaseHandler, ABC):
             success = False
         self.set_status(200)
         self.write(json_encode({"data": response, "success": success, "error_code": error_code, "message": message}))
+
+
+class ReadinessHandler(BaseHandler, ABC):
+
+    async def get(self):
+        status = AgentProcessor.warm_up_status
+        self.set_status(200 if status["ready"] else 503)
+        self.write(json_encode({
+            "data": {"loaded": len(status["loaded"]), "failed": len(status["failed"]), "total": len(status["bots"])},
+            "success": status["ready"], "error_code": 0 if status["ready"] else 503,
+            "message": "Ready" if status["ready"] else "Warming up agents"
+        }))
+
+
+class LatencyMetricsHandler(BaseHandler, ABC):
+
+    async def get(self):
+        bot = self.get_query_argument("bot", None)
+        self.set_status(200)
+        self.write(json_encode({
+            "data": LatencyRecorder.get_stats(bot), "success": True, "error_code": 0, "message": None
+        }))
@@ -294,13 +294,14 @@ class HangoutHandler(InputChannel, BaseHandler):
         try:
             metadata = {"is_integration_user": True, "bot": bot, "account": user.account, "room": room_name,
                         "out_channel": collector.name(), "channel_type": "hangouts"}
-            await AgentProcessor.get_agent(bot).handle_message(UserMessage(
-                    text,
-                    collector,
-                    sender_id,
-                    input_channel=input_channel,
-                    metadata=metadata,
-                ))
+            async with AgentProcessor.acquire_agent(bot) as model:
+                await model.handle_message(UserMessage(
+                        text,
+                        collector,
+                        sender_id,
+                        input_channel=input_channel,
+                        metadata=metadata,
+                    ))
         except CancelledError:
             logger.error(
                 "Message handling timed out for " "user message '{}'.".format(text)
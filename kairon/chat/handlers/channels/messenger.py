@@ -169,7 +169,8 @@ class Messenger:
 
     @staticmethod
     async def process_message(bot: str, user_message: UserMessage):
-        await AgentProcessor.get_agent(bot).handle_message(user_message)
+        async with AgentProcessor.acquire_agent(bot) as model:
+            await model.handle_message(user_message)
 
 
 class MessengerBot(OutputChannel):
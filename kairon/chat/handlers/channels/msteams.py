@@ -319,7 +319,8 @@ class MSTeamsHandler(InputChannel, BaseHandler):
 
                 user_msg = UserMessage(text=postdata.get("text", ""), output_channel=out_channel, sender_id=postdata["from"]["id"],
                     input_channel=self.name(), metadata=metadata_with_attachments,)
-                await AgentProcessor.get_agent(bot).handle_message(user_msg)
+                async with AgentProcessor.acquire_agent(bot) as model:
+                    await model.handle_message(user_msg)
             else:
                 logger.info("Not received message type")
         except Exception as ex:
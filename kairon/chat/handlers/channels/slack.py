@@ -305,7 +305,8 @@ class SlackHandler(InputChannel, BaseHandler, ABC):
                 input_channel=self.name(),
                 metadata=metadata,
             )
-            await AgentProcessor.get_agent(bot).handle_message(user_msg)
+            async with AgentProcessor.acquire_agent(bot) as model:
+                await model.handle_message(user_msg)
         except Exception as e:
             logger.error(f"Exception when trying to handle message.{e}")
             logger.error(str(e), exc_info=True)
@@ -0,0 +1,43 @@
+import asyncio
+from typing import Dict, Text, Any
+
+from rasa.core.channels import CollectingOutputChannel
+
+
+class StreamingOutputChannel(CollectingOutputChannel):
+    """
+    Output channel which, apart from collecting bot utterances,
+    publishes each of them as soon as it is produced by an action.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.queue = asyncio.Queue()
+
+    @classmethod
+    def name(cls) -> Text:
+        return "stream"
+
+    async def _persist_message(self, message: Dict[Text, Any]) -> None:
+        await super()._persist_message(message)
+        await self.queue.put(message)
+
+    def close(self):
+        """
+        Marks the end of the utterances, is published as None.
+
+        :return: None
+        """
+        self.queue.put_nowait(None)
+
+    async def utterances(self):
+        """
+        Yields bot utterances as they are produced till the channel is closed.
+
+        :return: async generator of utterances
+        """
+        while True:
+            message = await self.queue.get()
+            if message is None:
+                break
+            yield message
@@ -249,7 +249,8 @@ class TelegramHandler(InputChannel, BaseHandler):
 
     @staticmethod
     async def process_message(bot: str, user_message: UserMessage):
-        await AgentProcessor.get_agent(bot).handle_message(user_message)
+        async with AgentProcessor.acquire_agent(bot) as model:
+            await model.handle_message(user_message)
 
     @staticmethod
     def get_output_channel(access_token, webhook_url) -> TelegramOutput:
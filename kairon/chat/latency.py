@@ -0,0 +1,140 @@
+import time
+from collections import deque
+from contextlib import contextmanager
+from threading import Lock
+from typing import Text, Dict, List, Optional
+
+
+class LatencyHistogram:
+    """
+    Keeps durations of the most recent observations
+    to compute latency percentiles over a sliding window.
+    """
+
+    percentiles = (50, 90, 95, 99)
+
+    def __init__(self, window: int = 1000):
+        """
+        :param window: number of most recent observations used to compute percentiles
+        """
+        self.samples = deque(maxlen=window)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, duration: float):
+        self.samples.append(duration)
+        self.count += 1
+        self.total += duration
+
+    def stats(self) -> Dict:
+        """
+        fetches number of observations, mean and percentiles of latency in seconds
+
+        :return: dict
+        """
+        samples = sorted(self.samples)
+        stats = {"count": self.count, "mean": self.total / self.count if self.count else 0.0}
+        for percentile in LatencyHistogram.percentiles:
+            index = max(0, -(-len(samples) * percentile // 100) - 1)
+            stats[f"p{percentile}"] = samples[index] if samples else 0.0
+        stats["max"] = samples[-1] if samples else 0.0
+        return stats
+
+
+class LatencyRecorder:
+    """
+    Aggregates latency of every stage of a chat turn per bot and per action.
+    """
+
+    window = 1000
+    __stages = {}
+    __actions = {}
+    __lock = Lock()
+
+    @staticmethod
+    def __get_histogram(histograms: Dict, bot: Text, name: Text) -> LatencyHistogram:
+        with LatencyRecorder.__lock:
+            if (bot, name) not in histograms:
+                histograms[(bot, name)] = LatencyHistogram(LatencyRecorder.window)
+            return histograms[(bot, name)]
+
+    @staticmethod
+    def record(bot: Text, stage: Text, duration: float, action: Text = None):
+        """
+        records time spent by the bot in a stage of the chat turn
+
+        :param bot: bot id
+        :param stage: stage of the chat turn, eg: parse_message
+        :param duration: time spent in seconds
+        :param action: name of the action executed, if the stage is an action
+        :return: None
+        """
+        LatencyRecorder.__get_histogram(LatencyRecorder.__stages, bot, stage).observe(duration)
+        if action:
+            LatencyRecorder.__get_histogram(LatencyRecorder.__actions, bot, action).observe(duration)
+
+    @staticmethod
+    def get_stats(bot: Text = None) -> Dict:
+        """
+        fetches latency percentiles of every stage and action per bot
+
+        :param bot: bot id, stats of all bots are returned if not set
+        :return: dict
+        """
+        stats = {}
+        with LatencyRecorder.__lock:
+            stages = list(LatencyRecorder.__stages.items())
+            actions = list(LatencyRecorder.__actions.items())
+        for key, histograms in (("stages", stages), ("actions", actions)):
+            for (histogram_bot, name), histogram in histograms:
+                if bot and bot != histogram_bot:
+                    continue
+                bot_stats = stats.setdefault(histogram_bot, {"stages": {}, "actions": {}})
+                bot_stats[key][name] = histogram.stats()
+        return stats
+
+    @staticmethod
+    def reset():
+        with LatencyRecorder.__lock:
+            LatencyRecorder.__stages.clear()
+            LatencyRecorder.__actions.clear()
+
+
+class TurnLatency:
+    """
+    Collects time spent in each stage of a single chat turn.
+    """
+
+    def __init__(self):
+        self.spans = []
+        self.start_time = time.perf_counter()
+
+    @contextmanager
+    def span(self, stage: Text, action: Text = None):
+        """
+        measures time spent in the enclosed block
+
+        :param stage: stage of the chat turn
+        :param action: name of the action executed, if the stage is an action
+        """
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            span = {"stage": stage, "duration": time.perf_counter() - start_time}
+            if action:
+                span["action"] = action
+            self.spans.append(span)
+
+    def finish(self, bot: Optional[Text]) -> List[Dict]:
+        """
+        records the spans of the turn along with its total duration against the bot
+
+        :param bot: bot id
+        :return: spans of the turn
+        """
+        self.spans.append({"stage": "total", "duration": time.perf_counter() - self.start_time})
+        if bot:
+            for span in self.spans:
+                LatencyRecorder.record(bot, span["stage"], span["duration"], span.get("action"))
+        return self.spans
@@ -0,0 +1,168 @@
+import fcntl
+import hashlib
+import os
+import posixpath
+import shutil
+import tarfile
+import tempfile
+from contextlib import contextmanager
+from glob import glob
+from typing import Text, Set
+
+from loguru import logger
+
+from kairon.exceptions import AppException
+from kairon.shared.utils import Utility
+
+
+class SharedModelStore:
+    """
+    Extracts model archives once into a local directory keyed by the archive hash,
+    so that every chat worker process on a node loads the model from the same files
+    instead of unpacking a private copy of the archive.
+    Every process keeps a reference file for the models its agents are loaded from,
+    so that models in use by any running process are never deleted.
+    """
+
+    __live_models = {}
+
+    @staticmethod
+    def is_enabled():
+        return Utility.environment['chat']['model_store']['enable']
+
+    @staticmethod
+    def get_model_hash(model_path: Text):
+        """
+        computes sha256 hash of the model archive
+
+        :param model_path: path to model archive
+        :return: hex digest
+        """
+        digest = hashlib.sha256()
+        with open(model_path, "rb") as model:
+            for chunk in iter(lambda: model.read(1024 * 1024), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    @staticmethod
+    def get_model_directory(bot: Text, model_path: Text):
+        """
+        fetches directory containing the unpacked model, extracting the archive
+        if no worker has extracted it yet.
+        Extraction happens in a temporary directory which is atomically renamed,
+        hence concurrent workers never load a partially extracted model.
+
+        :param bot: bot id
+        :param model_path: path to model archive
+        :return: path to unpacked model
+        """
+        bot_dir = os.path.join(Utility.environment['chat']['model_store']['path'], bot)
+        model_hash = SharedModelStore.get_model_hash(model_path)
+        model_dir = os.path.join(bot_dir, model_hash)
+        os.makedirs(bot_dir, exist_ok=True)
+        with SharedModelStore.__lock(bot_dir):
+            SharedModelStore.__add_reference(bot_dir, model_hash)
+            if os.path.isdir(model_dir):
+                return model_dir
+
+        temp_dir = tempfile.mkdtemp(dir=bot_dir, prefix=".")
+        try:
+            with tarfile.open(model_path, mode="r:gz") as archive:
+                archive.extractall(temp_dir, members=SharedModelStore.__safe_members(archive))
+            os.rename(temp_dir, model_dir)
+            logger.info(f"Unpacked model {model_path} into {model_dir}")
+        except OSError:
+            if not os.path.isdir(model_dir):
+                raise
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+        SharedModelStore.delete_old_models(bot_dir)
+        return model_dir
+
+    @staticmethod
+    def __safe_members(archive: tarfile.TarFile):
+        """
+        validates that every member of the archive is extracted within the target directory.
+
+        :param archive: model archive
+        :return: archive members
+        """
+        for member in archive.getmembers():
+            paths = [member.name]
+            if member.issym():
+                paths.append(posixpath.join(posixpath.dirname(member.name), member.linkname))
+            elif member.islnk():
+                paths.append(member.linkname)
+            for path in paths:
+                if posixpath.isabs(path) or posixpath.normpath(path).split("/")[0] == "..":
+                    raise AppException(f"Model archive contains unsafe path: {path}")
+            if member.isdev():
+                raise AppException(f"Model archive contains device file: {member.name}")
+            yield member
+
+    @staticmethod
+    @contextmanager
+    def __lock(bot_dir: Text):
+        with open(os.path.join(bot_dir, ".lock"), "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    @staticmethod
+    def __add_reference(bot_dir: Text, model_hash: Text):
+        open(os.path.join(bot_dir, f".{model_hash}.{os.getpid()}.ref"), "a").close()
+
+    @staticmethod
+    def __get_referenced_models(bot_dir: Text) -> Set[Text]:
+        """
+        fetches models referenced by running processes and removes references of stopped processes.
+
+        :param bot_dir: directory containing unpacked models of the bot
+        :return: model hashes
+        """
+        referenced = set()
+        for reference in glob(os.path.join(bot_dir, ".*.ref")):
+            model_hash, pid, _ = os.path.basename(reference)[1:].rsplit(".", 2)
+            if Utility.is_process_running(int(pid)):
+                referenced.add(model_hash)
+            else:
+                os.remove(reference)
+        return referenced
+
+    @staticmethod
+    def release_models(bot: Text, model_dir: Text = None):
+        """
+        removes references of this process to unpacked models of the bot
+        except the model the live agent of the bot is loaded from.
+
+        :param bot: bot id
+        :param model_dir: model the agent of the bot is now loaded from, retains the earlier one if not set
+        :return: None
+        """
+        if model_dir:
+            SharedModelStore.__live_models[bot] = os.path.basename(model_dir)
+        live_model = SharedModelStore.__live_models.get(bot)
+        bot_dir = os.path.join(Utility.environment['chat']['model_store']['path'], bot)
+        for reference in glob(os.path.join(bot_dir, f".*.{os.getpid()}.ref")):
+            if os.path.basename(reference)[1:].rsplit(".", 2)[0] != live_model:
+                os.remove(reference)
+
+    @staticmethod
+    def delete_old_models(bot_dir: Text, retain: int = 2):
+        """
+        deletes unpacked models of the bot except the most recently extracted ones
+        and the ones referenced by agents of running processes
+
+        :param bot_dir: directory containing unpacked models of the bot
+        :param retain: number of models to retain
+        :return: None
+        """
+        with SharedModelStore.__lock(bot_dir):
+            referenced = SharedModelStore.__get_referenced_models(bot_dir)
+            model_dirs = [path for path in glob(os.path.join(bot_dir, "*")) if os.path.isdir(path)]
+            model_dirs.sort(key=os.path.getmtime, reverse=True)
+            for model_dir in model_dirs[retain:]:
+                if os.path.basename(model_dir) not in referenced:
+                    shutil.rmtree(model_dir, ignore_errors=True)
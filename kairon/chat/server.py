@@ -1,15 +1,26 @@
+import signal
+from datetime import datetime, timedelta
+from threading import Thread
+
 from tornado.ioloop import IOLoop
 from tornado.web import Application
 from tornado.options import parse_command_line
+from tornado.process import fork_processes
 
 from kairon.chat.handlers.channels.whatsapp import WhatsappHandler
 from kairon.chat.handlers.channels.msteams import MSTeamsHandler
 from kairon.shared.tornado.handlers.index import IndexHandler
-from .handlers.action import ChatHandler, ReloadHandler, LiveAgentHandler, SessionConversationHandler
+from .handlers.action import ChatHandler, ReloadHandler, LiveAgentHandler, SessionConversationHandler, ReadinessHandler, \
+    LatencyMetricsHandler, BatchChatHandler, StreamingChatHandler
 from .handlers.channels.slack import SlackHandler
 from .handlers.channels.telegram import TelegramHandler
 from .handlers.channels.hangouts import HangoutHandler
 from .handlers.channels.messenger import MessengerHandler, InstagramHandler
+from .agent_processor import AgentProcessor
+from .cache import AgentCacheFactory
+from .dispatcher import BotAffinityDispatcher, ConsistentHashRing
+from ..shared.metering.constants import MetricType
+from ..shared.metering.metering_processor import MeteringProcessor
 from ..shared.utils import Utility
 from loguru import logger
 from mongoengine import connect
@@ -20,7 +31,11 @@ Utility.load_system_metadata()
 def make_app():
     return Application([
         (r"/", IndexHandler),
+        (r"/readiness", ReadinessHandler),
+        (r"/metrics/latency", LatencyMetricsHandler),
         (r"/api/bot/([^/]+)/chat", ChatHandler),
+        (r"/api/bot/([^/]+)/chat/batch", BatchChatHandler),
+        (r"/api/bot/([^/]+)/chat/stream", StreamingChatHandler),
         (r"/api/bot/([^/]+)/conversation", SessionConversationHandler),
         (r"/api/bot/([^/]+)/agent/live/([^/]+)", LiveAgentHandler),
         (r"/api/bot/slack/([^/]+)/([^/]+)", SlackHandler),
@@ -34,11 +49,57 @@ def make_app():
     ], compress_response=True, debug=False)
 
 
-if __name__ == "__main__":
+def warm_up_agents(port: int = None, ring: ConsistentHashRing = None):
+    """
+    Loads agents of the most active bots in the background.
+    Behind the dispatcher, a worker loads only the bots it serves.
+
+    :param port: port of the worker
+    :param ring: ring of the dispatcher mapping bots to worker ports
+    """
+    config = Utility.environment['chat']['warm_up']
+    if not config['enable']:
+        return
+    start_date = datetime.utcnow() - timedelta(days=config['lookback_days'])
+    bots = MeteringProcessor.get_most_active_bots(MetricType.prod_chat, start_date, config['bots_count'])
+    if ring:
+        bots = [bot for bot in bots if ring.get_node(bot) == port]
+    AgentProcessor.warm_up_status["ready"] = False
+    Thread(target=AgentProcessor.warm_up_cache, args=(bots,), daemon=True).start()
+
+
+def start_worker(port: int, ring: ConsistentHashRing = None):
     connect(**Utility.mongoengine_connection())
+    AgentProcessor.cache_provider = AgentCacheFactory.get_instance()
+    warm_up_agents(port, ring)
     app = make_app()
     Utility.initiate_tornado_apm_client(app)
-    app.listen(5000)
+    app.listen(port)
+    logger.info(f"Server Started on port {port}")
+
+
+def start_dispatcher(port: int):
+    """
+    Forks worker processes along with a dispatcher which routes
+    requests of each bot to the same worker, so that a bot is loaded by one worker only.
+    """
+    config = Utility.environment['chat']['dispatcher']
+    worker_ports = [config['worker_base_port'] + worker for worker in range(config['workers'])]
+    dispatcher = BotAffinityDispatcher(worker_ports)
+    task_id = fork_processes(len(worker_ports) + 1)
+    if task_id < len(worker_ports):
+        start_worker(worker_ports[task_id], dispatcher.ring)
+    else:
+        dispatcher.make_app().listen(port)
+        logger.info(f"Dispatcher Started on port {port} for workers on ports {worker_ports}")
+
+
+if __name__ == "__main__":
     parse_command_line()
-    logger.info("Server Started")
+    if Utility.environment['chat']['dispatcher']['enable']:
+        start_dispatcher(5000)
+    else:
+        start_worker(5000)
+    # stop gracefully on SIGTERM so that buffered conversations are flushed at exit
+    signal.signal(signal.SIGTERM, lambda *args: IOLoop.current().add_callback_from_signal(IOLoop.current().stop))
     IOLoop.current().start()
@@ -1,11 +1,14 @@
+import asyncio
 import datetime
 import json
-from typing import Text
+from collections import OrderedDict
+from typing import Text, List, Dict
 
+from cachetools import TTLCache
 from loguru import logger
 from pymongo.collection import Collection
 from pymongo.errors import ServerSelectionTimeoutError
-from rasa.core.channels import UserMessage
+from rasa.core.channels import UserMessage, OutputChannel
 from rasa.core.tracker_store import TrackerStore
 from tornado.escape import json_decode
 from tornado.httputil import HTTPServerRequest
@@ -21,16 +24,104 @@ from ..shared.metering.metering_processor import MeteringProcessor
 
 
 class ChatUtils:
+    business_hours_cache = None
 
     @staticmethod
-    async def chat(data: Text, account: int, bot: Text, user: Text, is_integration_user: bool = False):
-        model = AgentProcessor.get_agent(bot)
-        msg = UserMessage(data, sender_id=user, metadata={"is_integration_user": is_integration_user, "bot": bot,
-                                                          "account": account, "channel_type": "chat_client"})
-        chat_response = await model.handle_message(msg)
-        ChatUtils.__attach_agent_handoff_metadata(account, bot, user, chat_response, model.tracker_store)
+    async def chat(data: Text, account: int, bot: Text, user: Text, is_integration_user: bool = False,
+                   debug: bool = False, output_channel: OutputChannel = None):
+        msg = UserMessage(data, output_channel, sender_id=user,
+                          metadata={"is_integration_user": is_integration_user, "bot": bot,
+                                    "account": account, "channel_type": "chat_client", "debug": debug})
+        async with AgentProcessor.acquire_agent(bot) as model:
+            chat_response = await model.handle_message(msg)
+            ChatUtils.__attach_agent_handoff_metadata(account, bot, user, chat_response, model.tracker_store)
         return chat_response
 
+    @staticmethod
+    async def chat_batch(messages: List[Dict], account: int, bot: Text, is_integration_user: bool = False,
+                         debug: bool = False):
+        """
+        Processes a batch of messages and yields the result of each message as soon as it is processed.
+        Messages of different senders are processed concurrently while
+        messages of the same sender are processed in the order they were received.
+
+        :param messages: list of dict with index, sender_id and data of each message
+        :param account: account id
+        :param bot: bot id
+        :param is_integration_user: whether messages are sent by an integration user
+        :param debug: whether time spent in each stage of the message is to be returned
+        :return: async generator of dict with index, sender_id and either response or error of each message
+        """
+        await AgentProcessor.get_agent_async(bot)
+        max_concurrency = Utility.environment['chat']['batch']['max_concurrency']
+        semaphore = asyncio.Semaphore(max_concurrency)
+        results = asyncio.Queue()
+        conversations = OrderedDict()
+        for message in messages:
+            conversations.setdefault(message["sender_id"], []).append(message)
+
+        async def process_conversation(sender_id: Text, conversation: List[Dict]):
+            async with semaphore:
+                for message in conversation:
+                    result = {"index": message["index"], "sender_id": sender_id}
+                    try:
+                        result["response"] = await ChatUtils.chat(
+                            message["data"], account, bot, sender_id, is_integration_user, debug
+                        )
+                    except Exception as e:
+                        logger.exception(e)
+                        result["error"] = str(e)
+                    await results.put(result)
+
+        tasks = [
+            asyncio.ensure_future(process_conversation(sender_id, conversation))
+            for sender_id, conversation in conversations.items()
+        ]
+        try:
+            for _ in range(len(messages)):
+                yield await results.get()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    @staticmethod
+    def decode_batch_request(request: HTTPServerRequest, user: Text, is_integration_user: bool = False):
+        """
+        Validates batch chat request and assigns each message its position in the batch.
+        Only integration users can send messages on behalf of other senders.
+
+        :param request: http request
+        :param user: authenticated user
+        :param is_integration_user: whether the authenticated user is an integration user
+        :return: request body
+        """
+        try:
+            request_body = json_decode(request.body.decode("utf8"))
+        except Exception as e:
+            raise AppException("Invalid JSON request: " + str(e))
+
+        messages = request_body.get('messages')
+        if not messages or not isinstance(messages, list):
+            raise AppException("messages are required!")
+        max_messages = Utility.environment['chat']['batch']['max_messages']
+        if len(messages) > max_messages:
+            raise AppException(f"Only {max_messages} messages can be sent in a batch!")
+
+        for index, message in enumerate(messages):
+            if not isinstance(message, dict):
+                raise AppException(f"Invalid message at index {index}!")
+            data = message.get('data')
+            if not isinstance(data, str) or Utility.check_empty_string(data):
+                raise AppException(f"data is required for message at index {index}!")
+            sender_id = message.get('sender_id') or user
+            if not isinstance(sender_id, str):
+                raise AppException(f"Invalid sender_id for message at index {index}!")
+            if sender_id != user and not is_integration_user:
+                raise AppException("Only integration user can send messages on behalf of other senders!")
+            message["index"] = index
+            message["sender_id"] = sender_id
+        return request_body
+
     @staticmethod
     def reload(bot: Text):
         AgentProcessor.reload(bot)
@@ -41,15 +132,17 @@ class ChatUtils:
         exception = None
         should_initiate_handoff = False
         try:
-            config = LiveAgentsProcessor.get_config(bot, mask_characters=False, raise_error=False)
+            config = LiveAgentsProcessor.get_cached_config(bot)
             if config:
                 metadata["type"] = config["agent_type"]
                 should_initiate_handoff = ChatUtils.__should_initiate_handoff(bot_predictions, config)
                 if should_initiate_handoff:
                     metadata["initiate"] = True
-                    live_agent = LiveAgentFactory.get_agent(config["agent_type"], config["config"])
+                    live_agent = LiveAgentFactory.get_cached_agent(bot, config)
                     metadata["additional_properties"] = live_agent.initiate_handoff(bot, sender_id)
-                    businessdata = live_agent.getBusinesshours(config, metadata["additional_properties"]["inbox_id"])
+                    businessdata = ChatUtils.__get_business_hours(
+                        bot, live_agent, config, metadata["additional_properties"]["inbox_id"]
+                    )
                     if businessdata is not None and businessdata.get("working_hours_enabled"):
                         is_business_hours_enabled = businessdata.get("working_hours_enabled")
                         if is_business_hours_enabled:
@@ -77,6 +170,24 @@ class ChatUtils:
         bot_predictions["agent_handoff"] = metadata
         return metadata
 
+    @staticmethod
+    def __get_business_hours(bot: Text, live_agent, config: dict, inbox_id):
+        """
+        Fetches business hours of the live agent inbox.
+        Business hours are cached along with live agent config if live agent cache is enabled.
+        """
+        cache_config = Utility.environment['chat'].get('live_agent_cache', {})
+        if not cache_config.get('enable'):
+            return live_agent.getBusinesshours(config, inbox_id)
+        if ChatUtils.business_hours_cache is None:
+            ChatUtils.business_hours_cache = TTLCache(cache_config['max_size'], cache_config['ttl'])
+        key = (bot, inbox_id, config.get("timestamp"))
+        businessdata = ChatUtils.business_hours_cache.get(key)
+        if businessdata is None:
+            businessdata = live_agent.getBusinesshours(config, inbox_id)
+            ChatUtils.business_hours_cache[key] = businessdata
+        return businessdata
+
     @staticmethod
     def __retrieve_conversation(tracker, sender_id: Text):
         events = TrackerStore.serialise_tracker(tracker.retrieve(sender_id))
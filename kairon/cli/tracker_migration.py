@@ -0,0 +1,35 @@
+from argparse import ArgumentParser, ArgumentDefaultsHelpFormatter
+from typing import List
+
+from loguru import logger
+from rasa.cli import SubParsersAction
+from rasa.shared.core.domain import Domain
+
+from kairon.shared.account.data_objects import Bot
+from kairon.shared.utils import Utility
+
+
+def backfill_session_heads(args):
+    logger.info("bots: {}", args.bots)
+    bots = args.bots or [str(bot.id) for bot in Bot.objects().only("id")]
+    for bot in bots:
+        tracker_store = Utility.get_local_mongo_store(bot, Domain.empty())
+        senders = tracker_store.backfill_session_heads()
+        logger.info("Backfilled session heads of {} senders for bot {}", senders, bot)
+
+
+def add_subparser(subparsers: SubParsersAction, parents: List[ArgumentParser]):
+    migration_parser = subparsers.add_parser(
+        "backfill-session-heads",
+        conflict_handler="resolve",
+        formatter_class=ArgumentDefaultsHelpFormatter,
+        parents=parents,
+        help="Builds session heads of existing conversations"
+    )
+    migration_parser.add_argument('bots',
+                                  type=str,
+                                  nargs='*',
+                                  default=[],
+                                  help="Bot ids to migrate, all bots are migrated if none specified",
+                                  action='store')
+    migration_parser.set_defaults(func=backfill_session_heads)
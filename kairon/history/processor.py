@@ -1549,6 +1549,11 @@ class HistoryProcessor:
                 # Remove Archived Events
                 conversations.delete_many(filter={'sender_id': sender_id,
                                                   "event.timestamp": {'$lte': till_date_timestamp}})
+
+                # Reset session head so that tracker stores rebuild it and drop their cached session
+                session_heads = db.get_collection(f"{collection}_session_heads")
+                session_heads.update_one({"_id": sender_id},
+                                         {"$unset": {"session_start": "", "event_count": ""}, "$inc": {"version": 1}})
         except Exception as e:
             logger.error(e)
             raise AppException(e)
@@ -1,5 +1,8 @@
+from threading import Lock
 from typing import Dict, Text
 
+from cachetools import LRUCache
+
 from kairon.exceptions import AppException
 from kairon.live_agent.chatwoot import ChatwootLiveAgent
 
@@ -13,6 +16,8 @@ class LiveAgentFactory:
     agent_systems = {
         "chatwoot": ChatwootLiveAgent
     }
+    __agents = LRUCache(maxsize=1000)
+    __lock = Lock()
 
     @staticmethod
     def get_agent(agent_type: Text, config: Dict):
@@ -25,3 +30,22 @@ class LiveAgentFactory:
         if not LiveAgentFactory.agent_systems.get(agent_type):
             raise AppException('Agent system not supported')
         return LiveAgentFactory.agent_systems[agent_type].from_config(config)
+
+    @staticmethod
+    def get_cached_agent(bot: Text, config: Dict):
+        """
+        Fetches live agent implementation for bot, reusing the one created
+        earlier unless the live agent config was modified since.
+
+        :param bot: bot id
+        :param config: live agent config of the bot as returned by LiveAgentsProcessor.
+        """
+        fingerprint = (config["agent_type"], config.get("timestamp"))
+        with LiveAgentFactory.__lock:
+            cached = LiveAgentFactory.__agents.get(bot)
+        if cached and cached[0] == fingerprint:
+            return cached[1]
+        agent = LiveAgentFactory.get_agent(config["agent_type"], config["config"])
+        with LiveAgentFactory.__lock:
+            LiveAgentFactory.__agents[bot] = (fingerprint, agent)
+        return agent
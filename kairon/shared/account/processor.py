@@ -15,6 +15,7 @@ from kairon.exceptions import AppException
 from kairon.shared.account.activity_log import UserActivityLogger
 from kairon.shared.account.data_objects import Account, User, Bot, UserEmailConfirmation, Feedback, UiConfig, \
     MailTemplates, SystemProperties, BotAccess, UserActivityLog, BotMetaData, TrustedDevice
+from kairon.shared.authorization.cache import AuthCache
 from kairon.shared.actions.data_objects import FormValidationAction, SlotSetAction, EmailActionConfig
 from kairon.shared.constants import UserActivityType, PluginTypes
 from kairon.shared.data.base_data import AuditLogData
@@ -173,6 +174,21 @@ class AccountProcessor:
             logging.error(e)
             raise AppException('Access to bot is denied')
 
+    @staticmethod
+    def fetch_cached_role_for_user(email: Text, bot: Text):
+        """
+        fetches role of the user for the bot from auth cache,
+        which is invalidated when the role or bot access is modified
+
+        :param email: user login id
+        :param bot: bot id
+        :return: dict
+        """
+        return AuthCache.get(
+            ("role", email.lower(), bot), [AuthCache.user(email), AuthCache.bot(bot)],
+            lambda: AccountProcessor.fetch_role_for_user(email, bot)
+        )
+
     @staticmethod
     def get_accessible_bot_details(account_id: int, email: Text):
         shared_bots = []
@@ -272,6 +288,7 @@ class AccountProcessor:
             bot_access.status = status
             bot_access.timestamp = datetime.utcnow()
             bot_access.save()
+            AuthCache.invalidate(AuthCache.user(accessor_email))
         except DoesNotExist:
             raise AppException('User not yet invited to collaborate')
 
@@ -328,6 +345,7 @@ class AccountProcessor:
             bot_access.status = ACTIVITY_STATUS.ACTIVE.value
             bot_access.accept_timestamp = datetime.utcnow()
             bot_access.save()
+            AuthCache.invalidate(AuthCache.user(accessor_email))
             return bot_access.user, bot_details['name'], bot_access.accessor_email, bot_access.role
         except DoesNotExist:
             raise AppException('No pending invite found for this bot and user')
@@ -373,6 +391,7 @@ class AccountProcessor:
         else:
             active_bot_access = BotAccess.objects(bot=bot, status__ne=ACTIVITY_STATUS.DELETED.value)
         active_bot_access.update(set__status=ACTIVITY_STATUS.DELETED.value)
+        AuthCache.invalidate(AuthCache.bot(bot))
 
     @staticmethod
     def remove_member(bot: Text, accessor_email: Text, current_user: Text):
@@ -519,6 +538,37 @@ class AccountProcessor:
             raise ValidationError("Inactive Account Please contact system admin!")
         return user
 
+    @staticmethod
+    def get_cached_user_details(email: str):
+        """
+        fetches user details from auth cache, which is invalidated
+        when password is reset or user is deleted
+
+        :param email: login id
+        :return: dict
+        """
+        return AuthCache.get(
+            ("user", email.lower()), [AuthCache.user(email)], lambda: AccountProcessor.get_user_details(email)
+        )
+
+    @staticmethod
+    def is_session_expired(email: str, iat: float):
+        """
+        checks whether password was reset after the login token was issued
+
+        :param email: login id
+        :param iat: time at which token was issued
+        :return: True/False
+        """
+        issued_at = datetime.utcfromtimestamp(iat)
+        return AuthCache.get(
+            ("session", email.lower(), iat), [AuthCache.user(email)],
+            lambda: Utility.is_exist(
+                UserActivityLog, raise_error=False, user=email, type=UserActivityType.reset_password.value,
+                timestamp__gte=issued_at, check_base_fields=False
+            )
+        )
+
     @staticmethod
     def get_complete_user_details(email: str):
         """
@@ -774,6 +824,8 @@ class AccountProcessor:
         data = {"password": previous_passwrd}
         UserActivityLogger.add_log(account=user['account'], email=email, a_type=UserActivityType.reset_password.value,
                                    data=data)
+        # invalidated once the reset is logged, so that session checks made meanwhile are not cached
+        AuthCache.invalidate(AuthCache.user(email))
         if uuid_value is not None:
             UserActivityLog.objects(user=email, type=UserActivityType.link_usage.value,
                                       data={"status": "pending", "uuid":uuid_value})\
@@ -872,6 +924,7 @@ class AccountProcessor:
                 set__status=ACTIVITY_STATUS.DELETED.value)
             user.status = False
             user.save()
+            AuthCache.invalidate(AuthCache.user(user.email))
             UserActivityLogger.add_log(account=account_id, email=user.email, a_type=UserActivityType.delete_user.value)
 
         account_obj.status = False
@@ -0,0 +1,62 @@
+from threading import Lock
+from typing import Text, Dict, Any, List
+
+from loguru import logger
+
+from kairon.shared.buffer import BulkWriteBuffer
+from kairon.shared.utils import Utility
+
+
+class ActionServerLogsBuffer(BulkWriteBuffer):
+    """
+    Queues action server logs in memory and writes them with bulk inserts from
+    a background thread once the batch size is reached or the flush interval elapses.
+    At most max_size logs are queued. Once full, new logs are dropped
+    so that actions never wait on the database. Queued logs are written on shutdown.
+    """
+
+    name = "Action server logs buffer"
+    __instance = None
+    __instance_lock = Lock()
+
+    def __init__(self, batch_size: int = 100, flush_interval: float = 2.0, max_size: int = 10000):
+        """
+        :param batch_size: number of queued logs which triggers a flush
+        :param flush_interval: maximum seconds logs are kept in the queue
+        :param max_size: maximum number of logs kept in the queue
+        """
+        super().__init__(batch_size, flush_interval, max_size)
+
+    @staticmethod
+    def is_enabled():
+        return Utility.environment['action'].get('log_buffer', {}).get('enable', False)
+
+    @staticmethod
+    def get_instance():
+        """
+        Fetches action server logs buffer configured in system.yaml.
+
+        :return: ActionServerLogsBuffer
+        """
+        with ActionServerLogsBuffer.__instance_lock:
+            if not ActionServerLogsBuffer.__instance:
+                config = Utility.environment['action']['log_buffer']
+                ActionServerLogsBuffer.__instance = ActionServerLogsBuffer(
+                    config['batch_size'], config['flush_interval'], config['max_size']
+                )
+        return ActionServerLogsBuffer.__instance
+
+    def _write(self, records: List[Dict[Text, Any]]) -> List[Dict[Text, Any]]:
+        from kairon.shared.actions.data_objects import ActionServerLogs
+
+        return self._insert_many(ActionServerLogs._get_collection(), records)
+
+    def close(self):
+        """
+        Stops periodic flushing and writes queued logs.
+
+        :return: None
+        """
+        super().close()
+        if len(self):
+            logger.error(f"Dropped {len(self)} action server logs which could not be written on shutdown")
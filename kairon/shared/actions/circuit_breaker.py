@@ -0,0 +1,135 @@
+import time
+from threading import Lock
+from typing import Text, Callable, Any, Dict
+from urllib.parse import urlparse
+
+import requests
+from loguru import logger
+
+from kairon.shared.actions.exception import ActionFailure
+from kairon.shared.utils import Utility
+
+
+class CircuitBreaker:
+    """
+    Tracks failures of upstream hosts called by actions.
+
+    Once failure_threshold consecutive calls to a host fail, the circuit of the host opens
+    and calls to it fail immediately instead of waiting for the request timeout.
+    After recovery_timeout seconds, one trial call is let through which closes
+    the circuit on success or opens it again on failure.
+    Only timeouts, connection errors and 5xx responses are failures, so that a bot with
+    invalid credentials does not open the circuit for other bots calling the same host.
+    State is local to the process.
+    """
+
+    closed = "closed"
+    open = "open"
+    half_open = "half_open"
+    __hosts = {}
+    __lock = Lock()
+
+    @staticmethod
+    def is_enabled():
+        return Utility.environment['action'].get('circuit_breaker', {}).get('enable', False)
+
+    @staticmethod
+    def get_host(url: Text) -> Text:
+        return urlparse(url).netloc.lower()
+
+    @staticmethod
+    def is_upstream_failure(exception: BaseException) -> bool:
+        """
+        Checks whether the exception, or the one it was raised from, is caused by the upstream being unavailable.
+
+        :param exception: exception raised by the call
+        :return: boolean
+        """
+        while exception is not None:
+            if isinstance(exception, (requests.Timeout, requests.ConnectionError, TimeoutError, ConnectionError)):
+                return True
+            status_code = getattr(exception, "status_code", None)
+            if status_code is None:
+                status_code = getattr(getattr(exception, "response", None), "status_code", None)
+            if isinstance(status_code, int):
+                return status_code >= 500
+            exception = exception.__cause__ or exception.__context__
+        return False
+
+    @staticmethod
+    def __before_call(host: Text):
+        config = Utility.environment['action']['circuit_breaker']
+        with CircuitBreaker.__lock:
+            circuit = CircuitBreaker.__hosts.get(host)
+            if not circuit or circuit["state"] == CircuitBreaker.closed:
+                return
+            recovered = circuit["opened_at"] + config['recovery_timeout'] <= time.time()
+            if circuit["state"] == CircuitBreaker.open and recovered:
+                circuit["state"] = CircuitBreaker.half_open
+                logger.info(f"Circuit of {host} is half open, trying a request")
+                return
+            raise ActionFailure(f"Circuit open for {host}, request not sent")
+
+    @staticmethod
+    def __on_success(host: Text):
+        with CircuitBreaker.__lock:
+            circuit = CircuitBreaker.__hosts.pop(host, None)
+        if circuit and circuit["state"] != CircuitBreaker.closed:
+            logger.info(f"Circuit of {host} closed")
+
+    @staticmethod
+    def __on_failure(host: Text):
+        config = Utility.environment['action']['circuit_breaker']
+        with CircuitBreaker.__lock:
+            circuit = CircuitBreaker.__hosts.setdefault(
+                host, {"state": CircuitBreaker.closed, "failures": 0, "opened_at": None}
+            )
+            circuit["failures"] += 1
+            if circuit["state"] == CircuitBreaker.half_open or circuit["failures"] >= config['failure_threshold']:
+                if circuit["state"] != CircuitBreaker.open:
+                    logger.warning(f"Circuit of {host} opened after {circuit['failures']} failures")
+                circuit["state"] = CircuitBreaker.open
+                circuit["opened_at"] = time.time()
+
+    @staticmethod
+    def call(url: Text, func: Callable[[], Any], is_failure: Callable[[Any], bool] = None):
+        """
+        Calls the upstream through the circuit of its host.
+
+        :param url: url of the upstream
+        :param func: makes the call
+        :param is_failure: checks whether the value returned by func is a failure, eg: 5xx response
+        :return: value returned by func
+        """
+        if not CircuitBreaker.is_enabled():
+            return func()
+        host = CircuitBreaker.get_host(url)
+        CircuitBreaker.__before_call(host)
+        try:
+            result = func()
+        except Exception as e:
+            if CircuitBreaker.is_upstream_failure(e):
+                CircuitBreaker.__on_failure(host)
+            else:
+                CircuitBreaker.__on_success(host)
+            raise
+        if is_failure and is_failure(result):
+            CircuitBreaker.__on_failure(host)
+        else:
+            CircuitBreaker.__on_success(host)
+        return result
+
+    @staticmethod
+    def get_state() -> Dict:
+        """
+        Fetches state of hosts with failures. Hosts not listed are closed.
+
+        :return: dict of host and its state, consecutive failures and time when the circuit was opened
+        """
+        with CircuitBreaker.__lock:
+            return {host: dict(circuit) for host, circuit in CircuitBreaker.__hosts.items()}
+
+    @staticmethod
+    def reset():
+        with CircuitBreaker.__lock:
+            CircuitBreaker.__hosts.clear()
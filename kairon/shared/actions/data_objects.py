@@ -1,5 +1,6 @@
 from datetime import datetime
 
+from bson import ObjectId
 from mongoengine import (
     EmbeddedDocument,
     EmbeddedDocumentField,
@@ -8,7 +9,7 @@ from mongoengine import (
     DateTimeField,
     BooleanField,
     IntField,
-    ListField, DictField, DynamicField, DynamicDocument, FloatField
+    ListField, DictField, DynamicField, DynamicDocument, FloatField, Document
 )
 from mongoengine.errors import ValidationError
 from validators import ValidationFailure, url
@@ -19,7 +20,7 @@ from kairon.shared.actions.models import ActionType, ActionParameterType, HttpRe
 from kairon.shared.constants import SLOT_SET_TYPE, FORM_SLOT_SET_TYPE
 from kairon.shared.data.base_data import Auditlog
 from kairon.shared.data.constant import KAIRON_TWO_STAGE_FALLBACK, FALLBACK_MESSAGE, DEFAULT_NLU_FALLBACK_RESPONSE
-from kairon.shared.data.signals import push_notification, auditlogger
+from kairon.shared.data.signals import push_notification, auditlogger, update_actions_fingerprint
 from kairon.shared.models import LlmPromptType, LlmPromptSource
 from kairon.shared.utils import Utility
 
@@ -83,8 +84,20 @@ class HttpActionResponse(EmbeddedDocument):
             raise ValidationError("response is required for dispatch")
 
 
+class HttpActionCache(EmbeddedDocument):
+    enable = BooleanField(default=False)
+    ttl = IntField(default=300)
+    bypass_slot = StringField(default=None)
+
+    def validate(self, clean=True):
+        max_ttl = Utility.environment['action']['response_cache']['max_ttl']
+        if self.enable and not 0 < self.ttl <= max_ttl:
+            raise ValidationError(f"Cache ttl must be between 1 and {max_ttl} seconds")
+
+
 @auditlogger.log
 @push_notification.apply
+@update_actions_fingerprint.apply
 class HttpActionConfig(Auditlog):
     action_name = StringField(required=True)
     http_url = StringField(required=True)
@@ -96,6 +109,7 @@ class HttpActionConfig(Auditlog):
     headers = ListField(EmbeddedDocumentField(HttpActionRequestBody), required=False)
     response = EmbeddedDocumentField(HttpActionResponse, default=HttpActionResponse())
     set_slots = ListField(EmbeddedDocumentField(SetSlotsFromResponse))
+    cache = EmbeddedDocumentField(HttpActionCache, default=None)
     bot = StringField(required=True)
     user = StringField(required=True)
     timestamp = DateTimeField(default=datetime.utcnow)
@@ -122,6 +136,8 @@ class HttpActionConfig(Auditlog):
         for param in self.params_list:
             param.validate()
         self.response.validate()
+        if self.cache:
+            self.cache.validate()
 
     def clean(self):
         self.action_name = self.action_name.strip().lower()
@@ -165,6 +181,7 @@ class VectorDbPayload(EmbeddedDocument):
 
 @auditlogger.log
 @push_notification.apply
+@update_actions_fingerprint.apply
 class VectorEmbeddingDbAction(Auditlog):
     name = StringField(required=True)
     collection = StringField(required=True)
@@ -211,12 +228,36 @@ class ActionServerLogs(DynamicDocument):
     bot = StringField()
     timestamp = DateTimeField(default=datetime.utcnow)
     status = StringField(default="SUCCESS")
+    cache_hit = BooleanField(default=None)
 
     meta = {"indexes": [{"fields": ["bot", ("bot", "-timestamp")]}]}
 
+    def save(self, *args, **kwargs):
+        """
+        Queues the log in ActionServerLogsBuffer if it is enabled, otherwise saves it.
+        """
+        from kairon.shared.actions.buffer import ActionServerLogsBuffer
+
+        if not ActionServerLogsBuffer.is_enabled():
+            return super().save(*args, **kwargs)
+        self.validate()
+        if not self.id:
+            self.id = ObjectId()
+        ActionServerLogsBuffer.get_instance().add(self.to_mongo().to_dict())
+        return self
+
+
+class ActionsFingerprint(Document):
+    bot = StringField(required=True)
+    version = IntField(default=0)
+    timestamp = DateTimeField(default=datetime.utcnow)
+
+    meta = {"indexes": [{"fields": ["bot"]}]}
+
 
 @auditlogger.log
 @push_notification.apply
+@update_actions_fingerprint.apply
 class Actions(Auditlog):
     name = StringField(required=True)
     type = StringField(choices=[type.value for type in ActionType], default=None)
@@ -261,6 +302,7 @@ class SetSlots(EmbeddedDocument):
 
 @auditlogger.log
 @push_notification.apply
+@update_actions_fingerprint.apply
 class SlotSetAction(Auditlog):
     name = StringField(required=True)
     set_slots = ListField(EmbeddedDocumentField(SetSlots), required=True)
@@ -294,6 +336,7 @@ class FormSlotSet(EmbeddedDocument):
 
 @auditlogger.log
 @push_notification.apply
+@update_actions_fingerprint.apply
 class FormValidationAction(Auditlog):
     name = StringField(required=True)
     slot = StringField(required=True)
@@ -327,6 +370,7 @@ class CustomActionRequestParameters(HttpActionRequestBody):
 
 @auditlogger.log
 @push_notification.apply
+@update_actions_fingerprint.apply
 class EmailActionConfig(Auditlog):
     action_name = StringField(required=True)
     smtp_url = StringField(required=True)
@@ -375,6 +419,7 @@ class EmailActionConfig(Auditlog):
 
 @auditlogger.log
 @push_notification.apply
+@update_actions_fingerprint.apply
 class GoogleSearchAction(Auditlog):
     name = StringField(required=True)
     api_key = EmbeddedDocumentField(CustomActionRequestParameters, required=True)
@@ -407,6 +452,7 @@ class GoogleSearchAction(Auditlog):
 
 @auditlogger.log
 @push_notification.apply
+@update_actions_fingerprint.apply
 class JiraAction(Auditlog):
     name = StringField(required=True)
     url = StringField(required=True)
@@ -448,6 +494,7 @@ class JiraAction(Auditlog):
 
 @auditlogger.log
 @push_notification.apply
+@update_actions_fingerprint.apply
 class ZendeskAction(Auditlog):
     name = StringField(required=True)
     subdomain = StringField(required=True)
@@ -485,6 +532,7 @@ class ZendeskAction(Auditlog):
 
 @auditlogger.log
 @push_notification.apply
+@update_actions_fingerprint.apply
 class PipedriveLeadsAction(Auditlog):
     name = StringField(required=True)
     domain = StringField(required=True)
@@ -524,6 +572,7 @@ class PipedriveLeadsAction(Auditlog):
 
 @auditlogger.log
 @push_notification.apply
+@update_actions_fingerprint.apply
 class HubspotFormsAction(Auditlog):
     name = StringField(required=True)
     portal_id = StringField(required=True)
@@ -559,6 +608,7 @@ class TwoStageFallbackTextualRecommendations(EmbeddedDocument):
 
 @auditlogger.log
 @push_notification.apply
+@update_actions_fingerprint.apply
 class KaironTwoStageFallbackAction(Auditlog):
     name = StringField(default=KAIRON_TWO_STAGE_FALLBACK)
     text_recommendations = EmbeddedDocumentField(TwoStageFallbackTextualRecommendations, default=None)
@@ -599,6 +649,7 @@ class LlmPrompt(EmbeddedDocument):
 
 @auditlogger.log
 @push_notification.apply
+@update_actions_fingerprint.apply
 class PromptAction(Auditlog):
     name = StringField(required=True)
     num_bot_responses = IntField(default=5)
@@ -640,6 +691,7 @@ class PromptAction(Auditlog):
 
 @auditlogger.log
 @push_notification.apply
+@update_actions_fingerprint.apply
 class RazorpayAction(Auditlog):
     name = StringField(required=True)
     api_key = EmbeddedDocumentField(CustomActionRequestParameters, required=True)
@@ -0,0 +1,248 @@
+import atexit
+import hashlib
+import itertools
+import json
+import os
+import pwd
+import re
+import resource
+import select
+import shutil
+import subprocess
+import tempfile
+import time
+from queue import Queue
+from threading import Lock
+from typing import Text, Any, Dict
+from urllib.parse import urlparse
+
+from cachetools import LRUCache
+from loguru import logger
+
+from kairon.shared.actions.exception import ActionFailure
+from kairon.shared.utils import Utility
+
+
+class ScriptEvaluator:
+    """
+    Evaluates scripts in a pool of node worker processes instead of sending them to the evaluator service.
+    Used when the configured evaluator url is local, which saves a network round trip per expression.
+
+    Placeholders, eg: ${data.a.b.0}, are resolved against the data by dot separated path.
+    Within code they are replaced by the value, within quoted strings and template literals by its text.
+    Scripts are compiled once and cached by hash, both here and in every worker.
+    Workers run every script in a fresh context without access to require, process or code generation
+    from strings, with a time limit per script and a memory limit per worker.
+    Workers which crash or do not respond in time are replaced.
+    Responses have the shape of those of the evaluator service: success with the result as data,
+    or data as None along with the error message if the script failed.
+
+    The vm context of node is not a security boundary, so workers are also restricted by the OS:
+    they run in a new session with an empty environment and a read only working directory,
+    cannot write files, dump core or open more than a few descriptors, and drop to the
+    configured user if the server runs as root. The remote evaluator stays the default,
+    the embedded one is only used when enabled in system.yaml.
+    """
+
+    placeholder = re.compile(r"\$\{([\w\-]+(?:\.[\w\-]+)*)}")
+    local_hosts = {"localhost", "127.0.0.1", "::1"}
+    __worker_script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "evaluator_worker.js")
+    __instance = None
+    __instance_lock = Lock()
+
+    max_open_files = 32
+
+    def __init__(
+            self, workers: int = 2, timeout: float = 1.0, cache_size: int = 1000, max_memory: int = 64,
+            user: Text = None
+    ):
+        """
+        :param workers: number of worker processes
+        :param timeout: maximum seconds a script is allowed to run
+        :param cache_size: number of compiled scripts cached
+        :param max_memory: maximum heap size of a worker in MB
+        :param user: unprivileged user the workers run as, the worker script must be readable by it
+        """
+        self.timeout = timeout
+        self.__command = [
+            shutil.which("node") or "node", f"--max-old-space-size={max_memory}",
+            "--disallow-code-generation-from-strings", ScriptEvaluator.__worker_script, str(cache_size)
+        ]
+        self.__user = pwd.getpwnam(user) if user else None
+        self.__cwd = tempfile.mkdtemp(prefix="evaluator_")
+        os.chmod(self.__cwd, 0o555)
+        self.__sources = LRUCache(cache_size)
+        self.__lock = Lock()
+        self.__ids = itertools.count()
+        self.__workers = Queue()
+        for _ in range(workers):
+            self.__workers.put(None)
+        atexit.register(self.close)
+
+    @staticmethod
+    def is_enabled():
+        """
+        Checks whether scripts are to be evaluated in process,
+        which requires the embedded evaluator to be enabled and the evaluator url to be local.
+
+        :return: boolean
+        """
+        config = Utility.environment['evaluator']
+        if not config.get('embedded', {}).get('enable', False):
+            return False
+        return urlparse(config['url']).hostname in ScriptEvaluator.local_hosts
+
+    @staticmethod
+    def get_instance():
+        """
+        Fetches script evaluator configured in system.yaml.
+
+        :return: ScriptEvaluator
+        """
+        with ScriptEvaluator.__instance_lock:
+            if not ScriptEvaluator.__instance:
+                config = Utility.environment['evaluator']['embedded']
+                ScriptEvaluator.__instance = ScriptEvaluator(
+                    config['workers'], config['timeout'], config['cache_size'], config['max_memory'],
+                    config.get('user')
+                )
+        return ScriptEvaluator.__instance
+
+    @staticmethod
+    def compile(script: Text) -> Text:
+        """
+        Replaces placeholders in the script with lookups of their path in the data.
+
+        :param script: script with placeholders, eg: 'Hi ' + `${context.slot.name}`
+        :return: script which is evaluated by the workers
+        """
+        source = []
+        stack = [["code", 0]]
+        index = 0
+        while index < len(script):
+            frame = stack[-1]
+            char = script[index]
+            match = ScriptEvaluator.placeholder.match(script, index) if char == "$" else None
+            if match:
+                path = json.dumps(match.group(1))
+                if frame[0] == "code":
+                    source.append(f"__value({path})")
+                elif frame[0] == "`":
+                    source.append(f"${{__text({path})}}")
+                else:
+                    source.append(f"{frame[0]} + __text({path}) + {frame[0]}")
+                index = match.end()
+                continue
+            if frame[0] == "code":
+                if script.startswith("//", index) or script.startswith("/*", index):
+                    end = script.find("\n" if script[index + 1] == "/" else "*/", index + 2)
+                    end = len(script) if end == -1 else end + (0 if script[index + 1] == "/" else 2)
+                    source.append(script[index:end])
+                    index = end
+                    continue
+                if char in {"'", '"', "`"}:
+                    stack.append([char, 0])
+                elif char == "{":
+                    frame[1] += 1
+                elif char == "}":
+                    if frame[1] == 0 and len(stack) > 1:
+                        stack.pop()
+                    else:
+                        frame[1] -= 1
+            elif char == "\\":
+                source.append(script[index:index + 2])
+                index += 2
+                continue
+            elif char == frame[0]:
+                stack.pop()
+            elif frame[0] == "`" and script.startswith("${", index):
+                stack.append(["code", 0])
+                source.append("${")
+                index += 2
+                continue
+            source.append(char)
+            index += 1
+        return "".join(source)
+
+    def evaluate(self, script: Text, data: Any) -> Dict:
+        """
+        Evaluates script against the data.
+
+        :param script: script
+        :param data: data referred by the script
+        :return: dict with success and the result as data, data as None and message if the script failed
+        """
+        script_hash = hashlib.sha256(script.encode()).hexdigest()
+        with self.__lock:
+            source = self.__sources.get(script_hash)
+            if source is None:
+                source = self.__sources[script_hash] = ScriptEvaluator.compile(script)
+            request_id = next(self.__ids)
+        request = {"id": request_id, "hash": script_hash, "source": source, "data": data,
+                   "timeout": int(self.timeout * 1000)}
+        worker = self.__workers.get()
+        try:
+            if not worker or worker.poll() is not None:
+                worker = self.__start_worker()
+            worker.stdin.write(json.dumps(request).encode() + b"\n")
+            worker.stdin.flush()
+            response = self.__read(worker, request_id)
+        except Exception as e:
+            logger.exception(e)
+            ScriptEvaluator.__stop_worker(worker)
+            worker = None
+            raise ActionFailure(f"Failed to evaluate script: {e}")
+        finally:
+            self.__workers.put(worker)
+        response.pop("id")
+        return response
+
+    def __start_worker(self):
+        return subprocess.Popen(
+            self.__command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+            env={}, cwd=self.__cwd, start_new_session=True, preexec_fn=self.__restrict_worker
+        )
+
+    def __restrict_worker(self):
+        """
+        Runs in the forked worker before node is started.
+        Denies writing files, core dumps and opening many descriptors,
+        then drops to the configured user if running as root.
+        """
+        resource.setrlimit(resource.RLIMIT_CORE, (0, 0))
+        resource.setrlimit(resource.RLIMIT_FSIZE, (0, 0))
+        resource.setrlimit(resource.RLIMIT_NOFILE, (self.max_open_files, self.max_open_files))
+        if self.__user and os.geteuid() == 0:
+            os.setgroups([])
+            os.setgid(self.__user.pw_gid)
+            os.setuid(self.__user.pw_uid)
+
+    @staticmethod
+    def __stop_worker(worker):
+        if worker and worker.poll() is None:
+            worker.kill()
+            worker.wait()
+
+    def __read(self, worker, request_id: int) -> Dict:
+        deadline = time.monotonic() + self.timeout * 3 + 1
+        while True:
+            remaining = deadline - time.monotonic()
+            ready, _, _ = select.select([worker.stdout], [], [], max(remaining, 0))
+            if not ready:
+                raise TimeoutError("Evaluator worker did not respond in time")
+            line = worker.stdout.readline()
+            if not line:
+                raise ChildProcessError(f"Evaluator worker exited with code {worker.wait()}")
+            response = json.loads(line)
+            if response.get("id") == request_id:
+                return response
+
+    def close(self):
+        """
+        Stops the worker processes.
+
+        :return: None
+        """
+        while not self.__workers.empty():
+            ScriptEvaluator.__stop_worker(self.__workers.get())
+        shutil.rmtree(self.__cwd, ignore_errors=True)
@@ -0,0 +1,69 @@
+// Evaluates scripts for ScriptEvaluator.
+// Reads one JSON request per line from stdin: {"id", "hash", "source", "data", "timeout"}
+// and writes one JSON response per line to stdout: {"id", "success", "data"} or {"id", "success", "data", "message"},
+// the same shape as responses of the evaluator service.
+// Every script runs in a fresh context without access to require, process or code generation from strings.
+// Only strings cross the context boundary, data goes in and the result comes out as JSON.
+
+const vm = require("vm");
+const readline = require("readline");
+
+const cacheSize = parseInt(process.argv[2] || "1000", 10);
+const scripts = new Map();
+const output = new vm.Script(`typeof __output === "string" ? __output : null`);
+
+const bootstrap = new vm.Script(`
+    "use strict";
+    const data = JSON.parse(__input);
+    const __resolve = (path) => path.split(".").reduce(
+        (value, key) => (value === undefined || value === null) ? undefined : value[Array.isArray(value) ? parseInt(key, 10) : key],
+        data
+    );
+    const __value = (path) => __resolve(path);
+    const __text = (path) => {
+        const value = __resolve(path);
+        return typeof value === "string" ? value : JSON.stringify(value);
+    };
+`);
+
+function compile(hash, source) {
+    let script = scripts.get(hash);
+    if (script) {
+        scripts.delete(hash);
+    } else {
+        try {
+            script = new vm.Script(`__output = JSON.stringify((\n${source}\n));`);
+        } catch (e) {
+            if (!(e instanceof SyntaxError)) throw e;
+            script = new vm.Script(`__output = JSON.stringify((function () {\n${source}\n})());`);
+        }
+        if (scripts.size >= cacheSize) {
+            scripts.delete(scripts.keys().next().value);
+        }
+    }
+    scripts.set(hash, script);
+    return script;
+}
+
+function evaluate(request) {
+    const script = compile(request.hash, request.source);
+    const context = vm.createContext(Object.create(null), {codeGeneration: {strings: false, wasm: false}});
+    context.__input = JSON.stringify(request.data === undefined ? null : request.data);
+    bootstrap.runInContext(context, {timeout: request.timeout});
+    script.runInContext(context, {timeout: request.timeout});
+    const result = output.runInContext(context, {timeout: request.timeout});
+    return typeof result === "string" ? JSON.parse(result) : null;
+}
+
+readline.createInterface({input: process.stdin}).on("line", (line) => {
+    let response;
+    let id = null;
+    try {
+        const request = JSON.parse(line);
+        id = request.id;
+        response = {id: id, success: true, data: evaluate(request)};
+    } catch (e) {
+        response = {id: id, success: false, data: null, message: String(e && e.message !== undefined ? e.message : e)};
+    }
+    process.stdout.write(JSON.stringify(response) + "\n");
+});
@@ -1,16 +1,24 @@
+import asyncio
 import json
 import logging
 import re
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Any, List, Text
+from functools import partial
+from http.cookiejar import DefaultCookiePolicy
+from threading import Lock
+from typing import Any, List, Text, Callable
 
 import requests
+from requests.adapters import HTTPAdapter
 from loguru import logger
 from mongoengine import DoesNotExist
 from rasa.shared.constants import UTTER_PREFIX
 from rasa_sdk import Tracker
 
+from .circuit_breaker import CircuitBreaker
 from .data_objects import HttpActionRequestBody, Actions
+from .evaluator import ScriptEvaluator
 from .exception import ActionFailure
 from .models import ActionParameterType, HttpRequestContentType, EvaluationType, ActionType
 from ..admin.constants import BotSecretType
@@ -29,6 +37,78 @@ class ActionUtility:
     Utility class to assist executing actions
     """
 
+    __session = None
+    __executor = None
+    __lock = Lock()
+
+    @staticmethod
+    def get_http_session() -> requests.Session:
+        """
+        Fetches session shared by all actions, which keeps a pool of keep-alive
+        connections per host. Cookies are never stored so that they are not shared between bots.
+
+        :return: requests.Session
+        """
+        with ActionUtility.__lock:
+            if not ActionUtility.__session:
+                config = Utility.environment['action'].get('http_pool', {})
+                adapter = HTTPAdapter(
+                    pool_connections=config.get('pool_connections', 10), pool_maxsize=config.get('pool_maxsize', 10)
+                )
+                session = requests.Session()
+                session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                ActionUtility.__session = session
+        return ActionUtility.__session
+
+    @staticmethod
+    async def run_in_executor(func: Callable, *args, **kwargs):
+        """
+        Runs blocking call, eg: request to a third party service, on a thread pool
+        so that a slow upstream does not block other requests being served by the action server.
+
+        :param func: blocking function
+        :return: value returned by the function
+        """
+        with ActionUtility.__lock:
+            if not ActionUtility.__executor:
+                max_workers = Utility.environment['action'].get('http_pool', {}).get('max_workers', 32)
+                ActionUtility.__executor = ThreadPoolExecutor(max_workers, thread_name_prefix="action_http")
+        return await asyncio.get_event_loop().run_in_executor(ActionUtility.__executor, partial(func, *args, **kwargs))
+
+    @staticmethod
+    async def execute_http_request_async(*args, hedge: bool = False, **kwargs):
+        """
+        Executes http request without blocking the event loop.
+        Accepts the same arguments as execute_http_request.
+
+        :param hedge: whether a GET request is hedged, which sends a second request if no response is
+        received within the configured delay and returns whichever succeeds first. Applies only if hedging is enabled.
+        :return: JSON/string response
+        """
+        request = partial(ActionUtility.execute_http_request, *args, **kwargs)
+        request_method = kwargs.get('request_method') or args[1]
+        hedging = Utility.environment['action'].get('hedging', {})
+        if not hedge or not hedging.get('enable') or request_method.upper() != "GET":
+            return await ActionUtility.run_in_executor(request)
+
+        requests_sent = [asyncio.ensure_future(ActionUtility.run_in_executor(request))]
+        done, _ = await asyncio.wait(requests_sent, timeout=hedging['delay'])
+        if not done:
+            logger.debug(f"No response within {hedging['delay']}s, sending hedged request")
+            requests_sent.append(asyncio.ensure_future(ActionUtility.run_in_executor(request)))
+        pending = set(requests_sent)
+        while True:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for request_sent in done:
+                if request_sent.exception() is None:
+                    for request_pending in pending:
+                        request_pending.cancel()
+                    return request_sent.result()
+            if not pending:
+                raise request_sent.exception()
+
     @staticmethod
     def execute_http_request(http_url: str, request_method: str, request_body=None, headers=None,
                              content_type: str = HttpRequestContentType.json.value):
@@ -50,8 +130,13 @@ class ActionUtility:
 
         try:
             if request_method.lower() in {'get', 'post', 'put', 'delete'}:
-                response = requests.request(
-                    request_method.upper(), http_url, headers=headers, timeout=timeout, **{content_type: request_body}
+                response = CircuitBreaker.call(
+                    http_url,
+                    lambda: ActionUtility.get_http_session().request(
+                        request_method.upper(), http_url, headers=headers, timeout=timeout,
+                        **{content_type: request_body}
+                    ),
+                    lambda resp: resp.status_code >= 500
                 )
             else:
                 raise ActionFailure("Invalid request method!")
@@ -615,7 +700,7 @@ class ActionUtility:
             url: str, username: str, api_token: str, project_key: str, issue_type: str, summary: str,
             description, parent_key: str = None
     ):
-        try:
+        def create_issue():
             jira = ActionUtility.get_jira_client(url, username, api_token)
             fields = {
                 "project": {'key': project_key},
@@ -626,6 +711,9 @@ class ActionUtility:
             if parent_key:
                 fields.update({'parent': {'key': parent_key}})
             jira.create_issue(fields)
+
+        try:
+            CircuitBreaker.call(url, create_issue)
         except Exception as e:
             logger.exception(e)
             raise ActionFailure(e)
@@ -653,10 +741,14 @@ class ActionUtility:
         from zenpy.lib.api_objects import Comment
         from zenpy.lib.api_objects import Ticket
 
-        try:
+        def create_ticket():
             zendesk_client = Zenpy(subdomain=subdomain, email=user_name, token=api_token)
-            comment = Comment(html_body=comment)
-            zendesk_client.tickets.create(Ticket(subject=subject, description=description, tags=tags, comment=comment))
+            zendesk_client.tickets.create(
+                Ticket(subject=subject, description=description, tags=tags, comment=Comment(html_body=comment))
+            )
+
+        try:
+            CircuitBreaker.call(f"https://{subdomain}.zendesk.com", create_ticket)
         except APIException as e:
             raise ActionFailure(e)
 
@@ -754,7 +846,10 @@ class ActionUtility:
             "script": script,
             "data": data
         }
-        resp = ActionUtility.execute_http_request(endpoint, "POST", request_body)
+        if ScriptEvaluator.is_enabled():
+            resp = ScriptEvaluator.get_instance().evaluate(script, data)
+        else:
+            resp = ActionUtility.execute_http_request(endpoint, "POST", request_body)
         log.append(f"Evaluator response: {resp}")
         if not resp.get('success') and raise_err_on_failure:
             raise ActionFailure(f'Expression evaluation failed: {resp}')
@@ -12,6 +12,7 @@ from starlette.status import HTTP_401_UNAUTHORIZED
 
 from kairon.api.models import TokenData
 from kairon.shared.account.processor import AccountProcessor
+from kairon.shared.authorization.cache import AuthCache
 from kairon.shared.authorization.processor import IntegrationProcessor
 from kairon.shared.constants import PluginTypes
 from kairon.shared.data.constant import INTEGRATION_STATUS, TOKEN_TYPE, ACCESS_ROLES
@@ -22,7 +23,6 @@ from kairon.shared.models import User
 from kairon.shared.plugins.factory import PluginFactory
 from kairon.shared.sso.factory import LoginSSOFactory
 from kairon.shared.utils import Utility, MailUtility
-from kairon.shared.account.data_objects import UserActivityLog, UserActivityType
 
 Utility.load_environment()
 
@@ -49,13 +49,13 @@ class Authentication:
             headers={"WWW-Authenticate": "Bearer"},
         )
         try:
-            payload = Utility.decode_limited_access_token(token)
+            payload = AuthCache.decode_token(token)
             username: str = payload.get("sub")
             Authentication.validate_limited_access_token(request, payload.get("access-limit"))
             if username is None:
                 raise credentials_exception
             token_data = TokenData(username=username)
-            user = AccountProcessor.get_user_details(token_data.username)
+            user = AccountProcessor.get_cached_user_details(token_data.username)
             if user is None:
                 raise credentials_exception
             user_model = User(**user)
@@ -77,10 +77,7 @@ class Authentication:
             else:
                 iat_val = payload.get("iat")
                 if iat_val is not None:
-                    issued_at = datetime.utcfromtimestamp(iat_val)
-                    if Utility.is_exist(
-                            UserActivityLog, raise_error=False, user=username, type=UserActivityType.reset_password.value,
-                            timestamp__gte=issued_at, check_base_fields=False):
+                    if AccountProcessor.is_session_expired(username, iat_val):
                         raise HTTPException(
                             status_code=status.HTTP_401_UNAUTHORIZED,
                             detail='Session expired. Please login again.',
@@ -105,7 +102,7 @@ class Authentication:
         if user.is_integration_user:
             user_role = user.role
         else:
-            user_role = AccountProcessor.fetch_role_for_user(user.email, bot_id)
+            user_role = AccountProcessor.fetch_cached_role_for_user(user.email, bot_id)
             user_role = user_role['role']
         if security_scopes.scopes and user_role not in security_scopes.scopes:
             raise HTTPException(
@@ -343,7 +340,7 @@ class Authentication:
         iat = payload.get('iat')
         role = payload.get('role')
         try:
-            IntegrationProcessor.verify_integration_token(name, bot, user, iat, role)
+            IntegrationProcessor.verify_cached_integration_token(name, bot, user, iat, role)
         except Exception as e:
             logger.exception(str(e))
             raise exception
@@ -0,0 +1,113 @@
+import time
+from copy import deepcopy
+from threading import Lock
+from typing import Text, Callable, Any, Tuple, Iterable
+
+from cachetools import TTLCache
+from jwt import PyJWTError
+
+from kairon.shared.utils import Utility
+
+
+class AuthCache:
+    """
+    Keeps verified token claims, user details and outcome of session,
+    role and integration checks for a short duration so that
+    authenticating a request does not query the database every time.
+
+    Every entry is tied to subjects, eg: user or integration.
+    Invalidating a subject, which is done on password reset, role change
+    or token revocation, discards all entries tied to it.
+    Invalidation is local to the process, entries cached by
+    other processes expire within the configured ttl.
+    """
+
+    __cache = None
+    __generations = {}
+    __lock = Lock()
+
+    @staticmethod
+    def is_enabled():
+        return Utility.environment['security'].get('auth_cache', {}).get('enable', False)
+
+    @staticmethod
+    def user(email: Text) -> Tuple:
+        return "user", email.lower()
+
+    @staticmethod
+    def bot(bot: Text) -> Tuple:
+        return "bot", bot
+
+    @staticmethod
+    def integration(bot: Text, name: Text) -> Tuple:
+        return "integration", bot, name
+
+    @staticmethod
+    def __get_cache() -> TTLCache:
+        if AuthCache.__cache is None:
+            config = Utility.environment['security']['auth_cache']
+            AuthCache.__cache = TTLCache(config['max_size'], config['ttl'])
+        return AuthCache.__cache
+
+    @staticmethod
+    def __get_generations(subjects: Iterable[Tuple]) -> Tuple:
+        return tuple(AuthCache.__generations.get(subject, 0) for subject in subjects)
+
+    @staticmethod
+    def get(key: Tuple, subjects: Iterable[Tuple], loader: Callable[[], Any]):
+        """
+        Fetches value from cache, loading and caching it on a miss.
+        Errors raised by the loader are not cached.
+
+        :param key: cache key
+        :param subjects: subjects whose invalidation discards the entry
+        :param loader: fetches value from the database
+        :return: value
+        """
+        if not AuthCache.is_enabled():
+            return loader()
+        subjects = list(subjects)
+        with AuthCache.__lock:
+            cache = AuthCache.__get_cache()
+            generations = AuthCache.__get_generations(subjects)
+            entry = cache.get(key)
+            if entry and entry[1] == generations:
+                return deepcopy(entry[0])
+        value = loader()
+        with AuthCache.__lock:
+            if AuthCache.__get_generations(subjects) == generations:
+                cache[key] = (deepcopy(value), generations)
+        return value
+
+    @staticmethod
+    def decode_token(token: Text):
+        """
+        Fetches claims of the token, verifying its signature only when it is not cached.
+
+        :param token: jwt token
+        :return: dict of claims
+        """
+        claims = AuthCache.get(("claims", token), [], lambda: Utility.decode_limited_access_token(token))
+        if claims.get("exp") and claims["exp"] <= time.time():
+            raise PyJWTError("Invalid token")
+        return claims
+
+    @staticmethod
+    def invalidate(*subjects: Tuple):
+        """
+        Discards cached entries of the subjects.
+
+        :param subjects: eg: AuthCache.user(email)
+        :return: None
+        """
+        if not AuthCache.is_enabled():
+            return
+        with AuthCache.__lock:
+            for subject in subjects:
+                AuthCache.__generations[subject] = AuthCache.__generations.get(subject, 0) + 1
+
+    @staticmethod
+    def clear():
+        with AuthCache.__lock:
+            AuthCache.__cache = None
+            AuthCache.__generations.clear()
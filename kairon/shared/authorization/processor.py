@@ -3,6 +3,7 @@ from typing import Text
 
 from mongoengine.errors import DoesNotExist
 from kairon.exceptions import AppException
+from kairon.shared.authorization.cache import AuthCache
 from kairon.shared.authorization.data_objects import Integration
 from kairon.shared.data.constant import INTEGRATION_STATUS, ACCESS_ROLES
 from kairon.shared.utils import Utility
@@ -39,6 +40,23 @@ class IntegrationProcessor:
         ):
             raise AppException("Could not validate credentials")
 
+    @staticmethod
+    def verify_cached_integration_token(name: Text, bot: Text, user: Text, iat: datetime, role: Text):
+        """
+        verifies integration token, caching the outcome till the integration is updated
+
+        :param name: integration name
+        :param bot: bot id
+        :param user: user who generated the integration
+        :param iat: time at which token was issued
+        :param role: role of the integration
+        :return: None
+        """
+        AuthCache.get(
+            ("integration", bot, name, user, iat, role), [AuthCache.integration(bot, name)],
+            lambda: IntegrationProcessor.verify_integration_token(name, bot, user, iat, role)
+        )
+
     @staticmethod
     def get_integrations(bot: Text):
         for integration in Integration.objects(bot=bot, status__ne=INTEGRATION_STATUS.DELETED.value):
@@ -56,5 +74,6 @@ class IntegrationProcessor:
             integration.user = user
             integration.status = status
             integration.save()
+            AuthCache.invalidate(AuthCache.integration(bot, name))
         except DoesNotExist:
             raise AppException("Integration does not exists")
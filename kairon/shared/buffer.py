@@ -0,0 +1,151 @@
+import atexit
+from collections import deque
+from threading import Lock, Thread, Event
+from typing import Text, Dict, Any, List
+
+from loguru import logger
+from pymongo.collection import Collection
+from pymongo.errors import BulkWriteError
+
+
+class BulkWriteBuffer:
+    """
+    Base of buffers which queue records in memory and write them with bulk inserts from
+    a background thread once the batch size is reached or the flush interval elapses,
+    so that callers never wait on the database while there is space in the buffer.
+    At most max_size records are queued or being written. Once full, new records are dropped.
+    Records which could not be written are queued again ahead of newer ones.
+    Queued records are written on shutdown.
+
+    Subclasses implement _write.
+    """
+
+    name = "Bulk write buffer"
+
+    def __init__(self, batch_size: int, flush_interval: float, max_size: int = None):
+        """
+        :param batch_size: number of queued records which triggers a flush
+        :param flush_interval: maximum seconds records are kept in the queue
+        :param max_size: maximum number of records kept in the buffer, unbounded if not set
+        """
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_size = max_size
+        self.dropped = 0
+        self._records = deque()
+        self._lock = Lock()
+        self.__writing = 0
+        self.__flush_lock = Lock()
+        self.__wake = Event()
+        self.__stopped = Event()
+        self.__flusher = Thread(target=self.__flush_periodically, name=type(self).__name__, daemon=True)
+        self.__flusher.start()
+        atexit.register(self.close)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._records)
+
+    def __is_full(self):
+        return self.max_size and len(self._records) + self.__writing >= self.max_size
+
+    def is_full(self) -> bool:
+        """
+        Checks whether new records would be dropped.
+
+        :return: boolean
+        """
+        with self._lock:
+            return bool(self.__is_full())
+
+    def _drop(self, count: int):
+        if self.dropped % 1000 == 0:
+            logger.warning(f"{self.name} is full, {self.dropped + count} records dropped so far")
+        self.dropped += count
+
+    def add(self, record: Any):
+        """
+        Queues record to be written.
+
+        :param record: record
+        :return: True if the record is queued, False if it is dropped
+        """
+        with self._lock:
+            if self.__is_full():
+                self._drop(1)
+                return False
+            self._records.append(record)
+            if len(self._records) >= self.batch_size:
+                self.__wake.set()
+            return True
+
+    def flush(self):
+        """
+        Writes queued records.
+        Records which could not be written are queued again.
+
+        :return: number of records written
+        """
+        with self.__flush_lock:
+            with self._lock:
+                records = list(self._records)
+                self._records.clear()
+                self.__writing = len(records)
+            if not records:
+                return 0
+            try:
+                failed = self._write(records)
+            except Exception as e:
+                logger.exception(e)
+                failed = records
+            with self._lock:
+                self._records.extendleft(reversed(failed))
+                self.__writing = 0
+            return len(records) - len(failed)
+
+    def _write(self, records: List[Any]) -> List[Any]:
+        """
+        Writes records to the database.
+
+        :param records: records in the order they were queued
+        :return: records which could not be written
+        """
+        raise NotImplementedError
+
+    def _insert_many(self, collection: Collection, records: List[Any], docs: List[Dict[Text, Any]] = None) -> List[Any]:
+        """
+        Inserts documents without stopping at the first failure,
+        ignoring the ones already written by an earlier attempt.
+
+        :param collection: collection to which documents are written
+        :param records: records being written
+        :param docs: documents of the records, records are the documents if not set
+        :return: records whose documents could not be written
+        """
+        try:
+            collection.insert_many(records if docs is None else docs, ordered=False)
+            return []
+        except BulkWriteError as e:
+            failed = {error["index"] for error in e.details["writeErrors"] if error["code"] != 11000}
+            if failed:
+                logger.error(f"{self.name} failed to write {len(failed)} records: {e.details['writeErrors'][0]}")
+            return [record for index, record in enumerate(records) if index in failed]
+        except Exception as e:
+            logger.exception(e)
+            return list(records)
+
+    def __flush_periodically(self):
+        while not self.__stopped.is_set():
+            self.__wake.wait(self.flush_interval)
+            self.__wake.clear()
+            self.flush()
+
+    def close(self):
+        """
+        Stops periodic flushing and writes queued records.
+
+        :return: None
+        """
+        self.__stopped.set()
+        self.__wake.set()
+        self.flush()
@@ -30,7 +30,7 @@ from validators import domain
 from validators import url, ValidationFailure
 
 from kairon.exceptions import AppException
-from kairon.shared.data.signals import push_notification, auditlogger
+from kairon.shared.data.signals import push_notification, auditlogger, update_actions_fingerprint
 from kairon.shared.models import TemplateType, StoryStepType, StoryType
 from kairon.shared.utils import Utility
 from .base_data import Auditlog
@@ -837,6 +837,7 @@ class LLMSettings(EmbeddedDocument):
 
 @auditlogger.log
 @push_notification.apply
+@update_actions_fingerprint.apply
 class BotSettings(Auditlog):
     ignore_utterances = BooleanField(default=False)
     force_import = BooleanField(default=False)
@@ -43,7 +43,7 @@ from kairon.shared.actions.data_objects import HttpActionConfig, HttpActionReque
     SlotSetAction, FormValidationAction, EmailActionConfig, GoogleSearchAction, JiraAction, ZendeskAction, \
     PipedriveLeadsAction, SetSlots, HubspotFormsAction, HttpActionResponse, SetSlotsFromResponse, \
     CustomActionRequestParameters, KaironTwoStageFallbackAction, QuickReplies, RazorpayAction, PromptAction, \
-    LlmPrompt, FormSlotSet, VectorEmbeddingDbAction, VectorDbOperation, VectorDbPayload
+    LlmPrompt, FormSlotSet, VectorEmbeddingDbAction, VectorDbOperation, VectorDbPayload, HttpActionCache
 from kairon.shared.actions.models import ActionType, HttpRequestContentType, ActionParameterType, VectorDbValueType
 from kairon.shared.importer.processor import DataImporterLogProcessor
 from kairon.shared.models import StoryEventType, TemplateType, StoryStepType, HttpContentType, StoryType, \
@@ -2915,11 +2915,15 @@ class MongoProcessor:
             headers = Utility.build_http_request_data_object(request_data.get('headers', []))
             set_slots = [SetSlotsFromResponse(**slot).to_mongo().to_dict() for slot in
                          request_data.get('set_slots')]
+            cache = HttpActionCache(**request_data['cache']) if request_data.get('cache') else None
+            if cache:
+                cache.validate()
             http_action.update(
                 set__http_url=request_data['http_url'], set__request_method=request_data['request_method'],
                 set__dynamic_params=request_data.get('dynamic_params'),
                 set__content_type=content_type, set__params_list=params_list, set__headers=headers,
-                set__response=response, set__set_slots=set_slots, set__user=user, set__timestamp=datetime.utcnow()
+                set__response=response, set__set_slots=set_slots, set__cache=cache, set__user=user,
+                set__timestamp=datetime.utcnow()
             )
             return http_action.id.__str__()
 
@@ -2949,6 +2953,7 @@ class MongoProcessor:
             headers=headers,
             response=HttpActionResponse(**http_action_config.get('response', {})),
             set_slots=set_slots,
+            cache=HttpActionCache(**http_action_config['cache']) if http_action_config.get('cache') else None,
             bot=bot,
             user=user
         ).save().id.__str__()
@@ -3456,6 +3461,8 @@ class MongoProcessor:
                 config['params_list'] = action['params_list']
             if action.get('set_slots'):
                 config['set_slots'] = action['set_slots']
+            if action.get('cache'):
+                config['cache'] = action['cache']
             http_actions.append(config)
         return {ActionType.http_action.value: http_actions}
 
@@ -73,6 +73,19 @@ def push_bulk_update_notification(sender, documents, **kwargs):
             logger.exception(e)
 
 
+@handler(auditlog)
+def update_actions_fingerprint(sender, document, **kwargs):
+    """Updates fingerprint of the bot's actions so that action servers discard their cached configurations."""
+    from kairon.shared.actions.data_objects import ActionsFingerprint
+
+    try:
+        ActionsFingerprint.objects(bot=document.bot).update_one(
+            inc__version=1, set__timestamp=datetime.datetime.utcnow(), upsert=True
+        )
+    except Exception as e:
+        logger.exception(e)
+
+
 def auditlogger_handler(event1):
     """Signal decorator to allow use of callback functions as class decorators."""
     def decorator(fn):
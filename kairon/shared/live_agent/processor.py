@@ -1,6 +1,10 @@
+import time
+from copy import deepcopy
 from datetime import datetime
-from typing import Dict, Text
+from threading import Lock
+from typing import Dict, Text, Optional
 
+from cachetools import TTLCache
 from loguru import logger
 from mongoengine import DoesNotExist
 
@@ -10,6 +14,8 @@ from kairon.shared.live_agent.data_objects import LiveAgents, LiveAgentMetadata
 
 
 class LiveAgentsProcessor:
+    __config_cache = None
+    __cache_lock = Lock()
 
     @staticmethod
     def save_config(configuration: Dict, bot: Text, user: Text):
@@ -34,6 +40,7 @@ class LiveAgentsProcessor:
         agent.user = user
         agent.timestamp = datetime.utcnow()
         agent.save()
+        LiveAgentsProcessor.invalidate_cached_config(bot)
 
     @staticmethod
     def delete_config(bot: Text):
@@ -44,6 +51,7 @@ class LiveAgentsProcessor:
         :return: None
         """
         Utility.hard_delete_document([LiveAgents], bot=bot)
+        LiveAgentsProcessor.invalidate_cached_config(bot)
 
     @staticmethod
     def get_config(bot: Text, mask_characters=True, raise_error: bool = True):
@@ -69,6 +77,68 @@ class LiveAgentsProcessor:
             if raise_error:
                 raise AppException("Live agent config not found!")
 
+    @staticmethod
+    def __get_config_cache() -> Optional[TTLCache]:
+        with LiveAgentsProcessor.__cache_lock:
+            cache_config = Utility.environment['chat'].get('live_agent_cache', {})
+            if LiveAgentsProcessor.__config_cache is None and cache_config.get('enable'):
+                LiveAgentsProcessor.__config_cache = TTLCache(cache_config['max_size'], cache_config['ttl'])
+            return LiveAgentsProcessor.__config_cache
+
+    @staticmethod
+    def get_config_fingerprint(bot: Text):
+        """
+        Fetches id and timestamp of the live agent config of bot, which change whenever the config is saved or deleted.
+
+        :param bot: bot id
+        :return: tuple, None if live agent is not configured
+        """
+        config = LiveAgents.objects(bot=bot).only("timestamp").as_pymongo().first()
+        return (config["_id"], config.get("timestamp")) if config else None
+
+    @staticmethod
+    def get_cached_config(bot: Text):
+        """
+        Fetch live agent config for bot with security keys unmasked.
+        Config, or its absence, is cached if live agent cache is enabled.
+        Cache is invalidated when the config is saved or deleted in this process.
+        Changes saved by other processes, eg: the api, are picked up by comparing the fingerprint
+        of the stored config, which is checked at most once per check interval.
+
+        :param bot: bot id
+        :return: Dict, None if live agent is not configured
+        """
+        cache = LiveAgentsProcessor.__get_config_cache()
+        if cache is None:
+            return LiveAgentsProcessor.get_config(bot, mask_characters=False, raise_error=False)
+        check_interval = Utility.environment['chat']['live_agent_cache'].get('check_interval', 0)
+        with LiveAgentsProcessor.__cache_lock:
+            cached = cache.get(bot)
+            if cached and cached["checked_at"] + check_interval > time.time():
+                return deepcopy(cached["config"])
+        fingerprint = LiveAgentsProcessor.get_config_fingerprint(bot)
+        with LiveAgentsProcessor.__cache_lock:
+            cached = cache.get(bot)
+            if cached and cached["fingerprint"] == fingerprint:
+                cached["checked_at"] = time.time()
+                return deepcopy(cached["config"])
+        config = LiveAgentsProcessor.get_config(bot, mask_characters=False, raise_error=False)
+        with LiveAgentsProcessor.__cache_lock:
+            cache[bot] = {"fingerprint": fingerprint, "config": config, "checked_at": time.time()}
+        return deepcopy(config)
+
+    @staticmethod
+    def invalidate_cached_config(bot: Text):
+        """
+        Removes live agent config of bot from cache.
+
+        :param bot: bot id
+        :return: None
+        """
+        with LiveAgentsProcessor.__cache_lock:
+            if LiveAgentsProcessor.__config_cache is not None:
+                LiveAgentsProcessor.__config_cache.pop(bot, None)
+
     @staticmethod
     def get_contact(bot: Text, sender_id: Text, agent_type: Text):
         """
@@ -0,0 +1,158 @@
+import glob
+import os
+import re
+from threading import Lock
+from typing import Text, Dict, Any, List
+
+from bson import json_util
+from loguru import logger
+
+from kairon.shared.buffer import BulkWriteBuffer
+from kairon.shared.metering.data_object import Metering
+from kairon.shared.utils import Utility
+
+
+class MeteringBuffer(BulkWriteBuffer):
+    """
+    Buffers metering records in memory and writes them with bulk inserts
+    once the batch size is reached or the flush interval elapses.
+    Records which could not be written on shutdown are spilled to a local file of the process,
+    which is written to the database when a buffer is created next by any process.
+    """
+
+    name = "Metering buffer"
+    __instance = None
+    __instance_lock = Lock()
+
+    def __init__(self, batch_size: int = 100, flush_interval: float = 5.0, spill_file: Text = None):
+        """
+        :param batch_size: number of buffered records which triggers a flush
+        :param flush_interval: maximum seconds records are kept in the buffer
+        :param spill_file: file to which records are written if they cannot be flushed on shutdown,
+        suffixed with the process id as every process spills to its own file
+        """
+        super().__init__(batch_size, flush_interval)
+        self.spill_file = spill_file
+        self.recover()
+
+    @staticmethod
+    def is_enabled():
+        return Utility.environment.get('metering', {}).get('buffer', {}).get('enable', False)
+
+    @staticmethod
+    def is_buffered(metric_type: Text):
+        """
+        checks whether records of the metric type are to be buffered
+
+        :param metric_type: metric type
+        :return: True/False
+        """
+        if not MeteringBuffer.is_enabled():
+            return False
+        return metric_type in Utility.environment['metering']['buffer']['metric_types']
+
+    @staticmethod
+    def get_instance():
+        """
+        Fetches metering buffer configured in system.yaml.
+
+        :return: MeteringBuffer
+        """
+        with MeteringBuffer.__instance_lock:
+            if not MeteringBuffer.__instance:
+                config = Utility.environment['metering']['buffer']
+                MeteringBuffer.__instance = MeteringBuffer(
+                    config['batch_size'], config['flush_interval'], config.get('spill_file')
+                )
+        return MeteringBuffer.__instance
+
+    def _write(self, records: List[Dict[Text, Any]]) -> List[Dict[Text, Any]]:
+        return self._insert_many(Metering._get_collection(), records)
+
+    def __spill_file_of(self, pid: int) -> Text:
+        root, ext = os.path.splitext(self.spill_file)
+        return f"{root}.{pid}{ext}"
+
+    def __spilled_files(self) -> List[Text]:
+        """
+        Fetches spill files of processes which are no longer running,
+        along with the files of recoveries which were interrupted.
+        """
+        root, ext = os.path.splitext(self.spill_file)
+        pattern = re.compile(rf"{re.escape(root)}(?:\.(\d+))?{re.escape(ext)}(?:\.(\d+)\.recovering)?")
+        spilled = []
+        for path in sorted(glob.glob(f"{glob.escape(root)}*")):
+            match = pattern.fullmatch(path)
+            if not match:
+                continue
+            owner = match.group(2) or match.group(1)
+            if owner and int(owner) != os.getpid() and Utility.is_process_running(int(owner)):
+                continue
+            spilled.append(path)
+        return spilled
+
+    def spill(self):
+        """
+        Appends buffered records to the spill file of the process.
+
+        :return: number of records spilled
+        """
+        with self._lock:
+            records = list(self._records)
+            self._records.clear()
+        if not records:
+            return 0
+        if not self.spill_file:
+            logger.error(f"Dropped {len(records)} metering records as spill file is not configured")
+            return 0
+        spill_file_path = self.__spill_file_of(os.getpid())
+        os.makedirs(os.path.dirname(os.path.abspath(spill_file_path)), exist_ok=True)
+        with open(spill_file_path, "a") as spill_file:
+            for record in records:
+                spill_file.write(json_util.dumps(record) + "\n")
+            spill_file.flush()
+            os.fsync(spill_file.fileno())
+        logger.info(f"Spilled {len(records)} metering records to {spill_file_path}")
+        return len(records)
+
+    def recover(self):
+        """
+        Writes records spilled by processes which are no longer running to the database.
+        Every spill file is claimed by renaming it before it is read, so that it is recovered by one process only.
+        Records which could not be written are buffered again.
+
+        :return: number of records recovered
+        """
+        if not self.spill_file:
+            return 0
+        recovered = 0
+        for path in self.__spilled_files():
+            claimed = re.sub(r"(\.\d+\.recovering)?$", f".{os.getpid()}.recovering", path, count=1)
+            try:
+                os.rename(path, claimed)
+                with open(claimed) as spill_file:
+                    records = [json_util.loads(line) for line in spill_file if line.strip()]
+            except FileNotFoundError:
+                continue
+            failed = self._write(records) if records else []
+            if failed:
+                logger.error(f"Failed to recover {len(failed)} metering records from {path}, buffered them again")
+                with self._lock:
+                    self._records.extendleft(reversed(failed))
+            try:
+                os.remove(claimed)
+            except FileNotFoundError:
+                pass
+            recovered += len(records) - len(failed)
+            logger.info(f"Recovered {len(records) - len(failed)} metering records from {path}")
+        return recovered
+
+    def close(self):
+        """
+        Stops periodic flushing, writes buffered records and
+        spills the records which could not be written.
+
+        :return: None
+        """
+        super().close()
+        self.spill()
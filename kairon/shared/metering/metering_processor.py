@@ -3,10 +3,12 @@ import json
 from datetime import datetime, date
 from typing import Text
 
+from bson import ObjectId
 from starlette.requests import Request
 
 from kairon import Utility
 from kairon.shared.constants import PluginTypes
+from kairon.shared.metering.buffer import MeteringBuffer
 from kairon.shared.metering.constants import MetricType, UpdateMetricType
 from kairon.shared.metering.data_object import Metering
 from kairon.shared.plugins.factory import PluginFactory
@@ -21,6 +23,7 @@ class MeteringProcessor:
     def add_metrics(bot: Text, account: int, metric_type: Text, **kwargs):
         """
         Adds custom metrics for an end user.
+        Metric is written in batches if buffering is enabled for the metric type.
 
         :param bot: bot id
         :param account: account id
@@ -29,7 +32,12 @@ class MeteringProcessor:
         metric = Metering(bot=bot, metric_type=metric_type, account=account)
         for key, value in kwargs.items():
             setattr(metric, key, value)
-        metric.save()
+        if MeteringBuffer.is_buffered(metric_type):
+            metric.id = ObjectId()
+            metric.validate()
+            MeteringBuffer.get_instance().add(metric.to_mongo().to_dict())
+        else:
+            metric.save()
         return metric.id.__str__()
 
     @staticmethod
@@ -84,6 +92,23 @@ class MeteringProcessor:
         metric_count = Metering.objects(**kwargs).count()
         return metric_count
 
+    @staticmethod
+    def get_most_active_bots(metric_type: Text, start_date: datetime, limit: int = 10):
+        """
+        Retrieves bots having the most metrics of a type since the start date.
+
+        :param metric_type: metric_type
+        :param start_date: start date
+        :param limit: number of bots to retrieve
+        :return: list of bot ids ordered by activity
+        """
+        bots = Metering.objects(metric_type=metric_type, timestamp__gte=start_date, bot__ne=None).aggregate([
+            {"$group": {"_id": "$bot", "count": {"$sum": 1}}},
+            {"$sort": {"count": -1}},
+            {"$limit": limit}
+        ])
+        return [bot["_id"] for bot in bots]
+
     @staticmethod
     def add_log_with_geo_location(metric_type: MetricType, account_id: int, request: Request, bot: Text = None, **kwargs):
         ip = request.headers.get('X-Forwarded-For')
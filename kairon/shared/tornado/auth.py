@@ -4,14 +4,13 @@ from jwt import PyJWTError
 from tornado.httputil import HTTPServerRequest
 
 from kairon.shared.account.processor import AccountProcessor
+from kairon.shared.authorization.cache import AuthCache
 from kairon.shared.authorization.processor import IntegrationProcessor
 from kairon.shared.data.constant import TOKEN_TYPE
 from kairon.shared.models import User
 from kairon.shared.tornado.exception import ServiceHandlerException
 from kairon.shared.utils import Utility
 from typing import Text
-from datetime import datetime
-from kairon.shared.account.data_objects import UserActivityLog, UserActivityType
 from tornado.web import HTTPError
 
 Utility.load_environment()
@@ -40,14 +39,14 @@ class TornadoAuthenticate:
         """
         credentials_exception = ServiceHandlerException("Could not validate credentials", 401, {"WWW-Authenticate": "Bearer"})
         try:
-            payload = Utility.decode_limited_access_token(token)
+            payload = AuthCache.decode_token(token)
             username: str = payload.get("sub")
             TornadoAuthenticate.validate_limited_access_token(request, payload.get("access-limit"))
             if username is None:
                 raise credentials_exception
         except PyJWTError:
             raise credentials_exception
-        user = AccountProcessor.get_user_details(username)
+        user = AccountProcessor.get_cached_user_details(username)
         if user is None:
             raise credentials_exception
         user_model = User(**user)
@@ -65,10 +64,7 @@ class TornadoAuthenticate:
         else:
             iat_val = payload.get("iat")
             if iat_val is not None:
-                issued_at = datetime.utcfromtimestamp(iat_val)
-                if Utility.is_exist(
-                        UserActivityLog, raise_error=False, user=username, type=UserActivityType.reset_password.value,
-                        timestamp__gte=issued_at, check_base_fields=False):
+                if AccountProcessor.is_session_expired(username, iat_val):
                     raise HTTPError(
                         status_code=401,
                         reason='Session expired. Please login again.',
@@ -99,7 +95,7 @@ class TornadoAuthenticate:
         if Utility.check_empty_string(bot_id):
             raise ServiceHandlerException("Bot is required", 422, {"WWW-Authenticate": "Bearer"})
         if not user.is_integration_user:
-            AccountProcessor.fetch_role_for_user(user.email, bot_id)
+            AccountProcessor.fetch_cached_role_for_user(user.email, bot_id)
         bot = AccountProcessor.get_bot(bot_id)
         if not bot["status"]:
             raise ServiceHandlerException("Inactive Bot Please contact system admin!", 422, {"WWW-Authenticate": "Bearer"})
@@ -114,7 +110,7 @@ class TornadoAuthenticate:
         user = TornadoAuthenticate.get_user_from_token(token, request)
         if Utility.check_empty_string(bot):
             raise ServiceHandlerException("Bot is required", 422, {"WWW-Authenticate": "Bearer"})
-        AccountProcessor.fetch_role_for_user(user.email, bot)
+        AccountProcessor.fetch_cached_role_for_user(user.email, bot)
         bot = AccountProcessor.get_bot(bot)
         if not bot["status"]:
             raise ServiceHandlerException("Inactive Bot Please contact system admin!", 422, {"WWW-Authenticate": "Bearer"})
@@ -144,7 +140,7 @@ class TornadoAuthenticate:
         iat = payload.get('iat')
         role = payload.get('role')
         try:
-            IntegrationProcessor.verify_integration_token(name, bot, user, iat, role)
+            IntegrationProcessor.verify_cached_integration_token(name, bot, user, iat, role)
         except Exception:
             raise exception
 
@@ -1,6 +1,11 @@
+import asyncio
 import itertools
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
 from typing import (
     Any,
+    Callable,
     Dict,
     Iterable,
     List,
@@ -10,16 +15,144 @@ from typing import (
 )
 
 import pymongo
-from pymongo import IndexModel
+from cachetools import TTLCache
+from loguru import logger
+from pymongo import IndexModel, ReturnDocument
 from pymongo.collection import Collection
 from rasa.core.brokers.broker import EventBroker
 from rasa.core.tracker_store import TrackerStore
+from rasa.shared.core.constants import ACTION_LISTEN_NAME
 from rasa.shared.core.domain import Domain
+from rasa.shared.core.events import ActionExecuted
 from rasa.shared.core.trackers import (
     DialogueStateTracker,
 )
 from uuid6 import uuid7
 
+from kairon.shared.buffer import BulkWriteBuffer
+
+
+class TrackerWriteBuffer(BulkWriteBuffer):
+    """
+    Write-behind buffer for conversation documents.
+    Documents saved by tracker stores are queued in process and written
+    with bulk inserts once the batch size is reached or the flush interval elapses.
+    Events not yet written are kept per sender so that tracker stores can serve them on retrieval.
+    Once max_size documents are queued, saving never waits for the background thread,
+    the buffer is flushed by the caller instead so that no conversation is dropped.
+    """
+
+    name = "Tracker write buffer"
+    __instance = None
+    __instance_lock = Lock()
+
+    def __init__(self, batch_size: int = 500, flush_interval: float = 1.0, max_size: int = 10000):
+        """
+        :param batch_size: number of queued documents which triggers a flush
+        :param flush_interval: maximum seconds documents are kept in queue
+        :param max_size: maximum number of documents kept in queue
+        """
+        self.__pending_events = {}
+        self.__pending_lock = Lock()
+        self.__write_lock = Lock()
+        super().__init__(batch_size, flush_interval, max_size)
+
+    @staticmethod
+    def get_instance(batch_size: int = 500, flush_interval: float = 1.0, max_size: int = 10000):
+        """
+        Fetches write buffer shared by all tracker stores of the process.
+
+        :param batch_size: number of queued documents which triggers a flush
+        :param flush_interval: maximum seconds documents are kept in queue
+        :param max_size: maximum number of documents kept in queue
+        :return: TrackerWriteBuffer
+        """
+        with TrackerWriteBuffer.__instance_lock:
+            if not TrackerWriteBuffer.__instance:
+                TrackerWriteBuffer.__instance = TrackerWriteBuffer(batch_size, flush_interval, max_size)
+        return TrackerWriteBuffer.__instance
+
+    def add(self, collection: Collection, sender_id: Text, docs: List[Dict[Text, Any]], events: List[Dict[Text, Any]]):
+        """
+        Queues documents to be written to the collection.
+        Buffer is flushed by the caller if it is full.
+
+        :param collection: conversations collection
+        :param sender_id: sender whose documents are queued
+        :param docs: documents to be written
+        :param events: events of the sender contained in the documents
+        :return: None
+        """
+        key = (collection.full_name, sender_id)
+        if events:
+            with self.__pending_lock:
+                self.__pending_events[key] = self.__pending_events.get(key, []) + events
+        dropped = []
+        for doc in docs:
+            if self.is_full():
+                self.flush()
+            if not super().add((collection, sender_id, doc)):
+                dropped.append(doc)
+        if dropped:
+            logger.error(f"Dropped {len(dropped)} conversation documents of {sender_id}, buffer could not be written")
+            self.__remove_pending_events({key: {id(doc["event"]) for doc in dropped if "event" in doc}})
+
+    def get_pending_events(self, collection: Collection, sender_id: Text) -> List[Dict[Text, Any]]:
+        """
+        Fetches events of the sender which are queued but not yet written.
+
+        :param collection: conversations collection
+        :param sender_id: sender id
+        :return: list of events
+        """
+        with self.__pending_lock:
+            return list(self.__pending_events.get((collection.full_name, sender_id), []))
+
+    def call_with_pending_events(self, collection: Collection, sender_id: Text, func: Callable[[List[Dict[Text, Any]]], Any]):
+        """
+        Calls func with the pending events of the sender while no documents are being written,
+        so that every event of the sender is either stored or passed to func, but not both.
+
+        :param collection: conversations collection
+        :param sender_id: sender id
+        :param func: called with the list of pending events
+        :return: value returned by func
+        """
+        with self.__write_lock:
+            return func(self.get_pending_events(collection, sender_id))
+
+    def __remove_pending_events(self, written: Dict[tuple, set]):
+        with self.__pending_lock:
+            for key, event_ids in written.items():
+                pending = [event for event in self.__pending_events.get(key, []) if id(event) not in event_ids]
+                if pending:
+                    self.__pending_events[key] = pending
+                else:
+                    self.__pending_events.pop(key, None)
+
+    def _write(self, records: List[tuple]) -> List[tuple]:
+        """
+        Writes queued documents with one bulk insert per collection.
+
+        :param records: collection, sender id and document queued
+        :return: records whose documents could not be written
+        """
+        collections = OrderedDict()
+        for record in records:
+            collections.setdefault(record[0].full_name, []).append(record)
+        with self.__write_lock:
+            failed = []
+            for group in collections.values():
+                failed.extend(self._insert_many(group[0][0], group, [doc for _, _, doc in group]))
+            failed_ids = {id(record) for record in failed}
+            written = {}
+            for record in records:
+                collection, sender_id, doc = record
+                if id(record) not in failed_ids and "event" in doc:
+                    written.setdefault((collection.full_name, sender_id), set()).add(id(doc["event"]))
+            self.__remove_pending_events(written)
+        return failed
+
 
 class KMongoTrackerStore(TrackerStore):
 
@@ -33,9 +166,16 @@ class KMongoTrackerStore(TrackerStore):
             auth_source: Optional[Text] = "admin",
             collection: Optional[Text] = "conversations",
             event_broker: Optional[EventBroker] = None,
+            cache_size: Optional[int] = None,
+            cache_ttl: Optional[int] = None,
+            write_buffer: Optional[TrackerWriteBuffer] = None,
             **kwargs: Dict[Text, Any],
     ) -> None:
-        from pymongo.database import Database
+        """
+        :param cache_size: maximum number of senders whose current session is cached in memory
+        :param cache_ttl: seconds for which session of a sender is cached, cache is disabled if not set
+        :param write_buffer: buffer through which conversations are written, written synchronously if not set
+        """
         from pymongo import MongoClient
 
         self.client = MongoClient(
@@ -47,8 +187,11 @@ class KMongoTrackerStore(TrackerStore):
             connect=False,
         )
 
-        self.db = Database(self.client, db)
+        self.db = self.client.get_database(db)
         self.collection = collection
+        self.tracker_cache = TTLCache(cache_size, cache_ttl) if cache_size and cache_ttl else None
+        self.__cache_lock = Lock()
+        self.write_buffer = write_buffer
         super().__init__(domain, event_broker, **kwargs)
 
         self._ensure_indices()
@@ -58,6 +201,11 @@ class KMongoTrackerStore(TrackerStore):
         """Returns the current conversation."""
         return self.db[self.collection]
 
+    @property
+    def session_heads(self) -> Collection:
+        """Returns the collection holding the current session of each sender."""
+        return self.db[f"{self.collection}_session_heads"]
+
     def _ensure_indices(self) -> None:
         indexes = [
             IndexModel([("sender_id", pymongo.ASCENDING), ("event.event", pymongo.ASCENDING)]),
@@ -65,7 +213,8 @@ class KMongoTrackerStore(TrackerStore):
             IndexModel([("sender_id", pymongo.ASCENDING), ("conversation_id", pymongo.ASCENDING)]),
             IndexModel([("event.event", pymongo.ASCENDING), ("event.timestamp", pymongo.DESCENDING)]),
             IndexModel([("event.name", pymongo.ASCENDING), ("event.timestamp", pymongo.DESCENDING)]),
-            IndexModel([("event.timestamp", pymongo.DESCENDING)])
+            IndexModel([("event.timestamp", pymongo.DESCENDING)]),
+            IndexModel([("sender_id", pymongo.ASCENDING), ("event.timestamp", pymongo.ASCENDING)])
         ]
         self.conversations.create_indexes(indexes)
 
@@ -81,8 +230,10 @@ class KMongoTrackerStore(TrackerStore):
         actions_predicted = []
         bot_responses = []
         data = []
+        events = []
         for event in additional_events:
             event = event.as_dict()
+            events.append(event)
             data.append({"sender_id": sender_id, "conversation_id": conversation_id, "event": event})
             if event['event'] == 'user':
                 flattened_conversation['timestamp'] = event.get('timestamp')
@@ -96,8 +247,13 @@ class KMongoTrackerStore(TrackerStore):
         flattened_conversation["data"]['action'] = actions_predicted
         flattened_conversation["data"]['bot_response'] = bot_responses
         data.append(flattened_conversation)
-        if data:
+        if self.write_buffer:
+            self.write_buffer.add(self.conversations, sender_id, data, events)
+        elif data:
             self.conversations.insert_many(data)
+        session_head = self._update_session_head(sender_id, events)
+        self._update_cached_events(sender_id, session_head, events)
+        tracker.persisted_events_count = len(tracker.events)
 
     def _retrieve(
             self, sender_id: Text, fetch_events_from_all_sessions: bool
@@ -107,10 +263,13 @@ class KMongoTrackerStore(TrackerStore):
         # look for conversations which have used an `int` sender_id in the past
         # and update them.
         if not events and sender_id.isdigit():
-            self.conversations.update_many(
+            result = self.conversations.update_many(
                 {"sender_id": int(sender_id)},
                 {"$set": {"sender_id": str(sender_id)}}
             )
+            if result.modified_count:
+                self.session_heads.delete_one({"_id": sender_id})
+                self._invalidate_cached_events(sender_id)
 
         if not events:
             return None
@@ -128,7 +287,7 @@ class KMongoTrackerStore(TrackerStore):
         if not events:
             return None
 
-        return DialogueStateTracker.from_dict(sender_id, events, self.domain.slots)
+        return self._tracker_from_events(sender_id, events)
 
     def retrieve_full_tracker(
             self, conversation_id: Text
@@ -138,30 +297,73 @@ class KMongoTrackerStore(TrackerStore):
         if not events:
             return None
 
-        return DialogueStateTracker.from_dict(
-            conversation_id, events, self.domain.slots
-        )
+        return self._tracker_from_events(conversation_id, events)
+
+    def init_tracker(self, sender_id: Text) -> DialogueStateTracker:
+        """Creates a tracker for a sender without events in the current session, none of its events are persisted."""
+        tracker = super().init_tracker(sender_id)
+        tracker.persisted_events_count = 0
+        return tracker
+
+    def _tracker_from_events(self, sender_id: Text, events: List[Dict[Text, Any]]) -> DialogueStateTracker:
+        tracker = DialogueStateTracker.from_dict(sender_id, events, self.domain.slots)
+        tracker.persisted_events_count = len(events)
+        return tracker
 
     def keys(self) -> Iterable[Text]:
         """Returns sender_ids of the Mongo Tracker Store."""
         return [c["sender_id"] for c in self.conversations.distinct(key="sender_id")]
 
     def get_stored_events(self, sender_id: Text, fetch_events_from_all_sessions: bool):
-        filter_query = {"sender_id": sender_id}
+        if not self.write_buffer:
+            return self._get_stored_events(sender_id, fetch_events_from_all_sessions)
+
+        pending = self.write_buffer.get_pending_events(self.conversations, sender_id)
+        events = self._get_stored_events(sender_id, fetch_events_from_all_sessions) or []
+        if pending:
+            events = self._merge_pending_events(events, pending, fetch_events_from_all_sessions)
+        return events if events else None
 
+    @staticmethod
+    def _merge_pending_events(
+            events: List[Dict[Text, Any]], pending: List[Dict[Text, Any]], fetch_events_from_all_sessions: bool
+    ) -> List[Dict[Text, Any]]:
+        """
+        Appends events which are not yet written to the stored events.
+        Buffer is flushed in order, hence pending events are always the most recent ones.
+        Pending events which were written or cached after they were fetched from
+        the write buffer can only be among the last stored events and are not repeated.
+        """
+        recent_events = events[-len(pending):]
+        events = events[:-len(pending)] + [event for event in recent_events if event not in pending] + pending
         if not fetch_events_from_all_sessions:
-            last_session = list(self.conversations.aggregate([
-                {"$match": {"sender_id": sender_id, "event.event": "session_started"}},
-                {"$sort": {"event.timestamp": 1}},
-                {"$group": {"_id": "$sender_id", "event": {"$last": "$event"}}},
-            ]))
-            filter_query["event.event"] = {"$ne": "session_started"}
+            for index in range(len(events) - 1, -1, -1):
+                if events[index]["event"] == "session_started":
+                    events = events[index + 1:]
+                    break
+        return events
 
-            if last_session:
-                filter_query["event.timestamp"] = {"$gte": last_session[0]['event']['timestamp']}
+    def _get_stored_events(self, sender_id: Text, fetch_events_from_all_sessions: bool):
+        if not fetch_events_from_all_sessions:
+            session_head = self._get_session_head(sender_id)
+            events = self._get_cached_events(sender_id, session_head)
+            if events is not None:
+                return events if events else None
+            # events saved before the session head was read are either stored or still pending,
+            # session is cached only if none are pending as the cache must hold every event of its version
+            cacheable = not self.write_buffer or not self.write_buffer.get_pending_events(self.conversations, sender_id)
+            stored = self.conversations.find(
+                {"sender_id": sender_id, "event.event": {"$ne": "session_started"},
+                 "event.timestamp": {"$gte": session_head.get("session_start") or 0}},
+                {"event": 1, "_id": 0}
+            ).sort("event.timestamp", pymongo.ASCENDING)
+            events = [doc["event"] for doc in stored]
+            if cacheable:
+                self._cache_events(sender_id, session_head.get("version", 0), events)
+            return events if events else None
 
         stored = list(self.conversations.aggregate([
-            {"$match": filter_query},
+            {"$match": {"sender_id": sender_id}},
             {"$sort": {"event.timestamp": 1}},
             {"$group": {"_id": "$sender_id", "events": {"$push": "$event"}}},
             {"$project": {"sender_id": "$_id", "events": 1, "_id": 0}}
@@ -170,12 +372,184 @@ class KMongoTrackerStore(TrackerStore):
             return None
         return stored[0]['events']
 
-    def _additional_events(self, tracker: DialogueStateTracker) -> Iterator:
-        events = self.get_stored_events(tracker.sender_id, False)
-        if events:
-            number_events_since_last_session = len(events)
-            return itertools.islice(
-                tracker.events, number_events_since_last_session, len(tracker.events)
+    def _get_session_head(self, sender_id: Text) -> Dict[Text, Any]:
+        """
+        Fetches start timestamp of the current session of the sender
+        along with the number of events stored in it.
+        Session head is rebuilt if it is missing or was reset after conversations were deleted.
+        """
+        session_head = self.session_heads.find_one({"_id": sender_id})
+        if not session_head or "event_count" not in session_head:
+            session_head = self._backfill_session_head(sender_id)
+        return session_head
+
+    def _backfill_session_head(self, sender_id: Text) -> Dict[Text, Any]:
+        """
+        Builds the session head of the sender from stored events,
+        along with the events queued in the write buffer which are not yet written.
+        """
+        if self.write_buffer:
+            session_head = self.write_buffer.call_with_pending_events(
+                self.conversations, sender_id, lambda pending: self._build_session_head(sender_id, pending)
             )
         else:
-            return tracker.events
+            session_head = self._build_session_head(sender_id, [])
+        return self.session_heads.find_one_and_update(
+            {"_id": sender_id}, {"$set": session_head}, upsert=True, return_document=ReturnDocument.AFTER
+        )
+
+    def _build_session_head(self, sender_id: Text, pending: List[Dict[Text, Any]]) -> Dict[Text, Any]:
+        last_session = self.conversations.find_one(
+            {"sender_id": sender_id, "event.event": "session_started"},
+            sort=[("event.timestamp", pymongo.DESCENDING)]
+        )
+        session_start = last_session["event"]["timestamp"] if last_session else None
+        event_count = self.conversations.count_documents({
+            "sender_id": sender_id, "event.event": {"$ne": "session_started"},
+            "event.timestamp": {"$gte": session_start or 0}
+        })
+        for event in pending:
+            if event["event"] == "session_started":
+                session_start, event_count = event["timestamp"], 0
+            else:
+                event_count += 1
+        return {"session_start": session_start, "event_count": event_count}
+
+    def _update_session_head(self, sender_id: Text, events: List[Dict[Text, Any]]) -> Optional[Dict[Text, Any]]:
+        """
+        Moves the session head of the sender past the newly persisted events.
+        Version of the session head is incremented on every save so that
+        other processes can detect that their cached session is stale.
+        """
+        session_start = None
+        event_count = len(events)
+        for index, event in enumerate(events):
+            if event["event"] == "session_started":
+                session_start = event["timestamp"]
+                event_count = len(events) - index - 1
+
+        if session_start is not None:
+            return self.session_heads.find_one_and_update(
+                {"_id": sender_id},
+                {"$set": {"session_start": session_start, "event_count": event_count}, "$inc": {"version": 1}},
+                upsert=True, return_document=ReturnDocument.AFTER
+            )
+        elif events:
+            session_head = self.session_heads.find_one_and_update(
+                {"_id": sender_id, "event_count": {"$exists": True}},
+                {"$inc": {"event_count": event_count, "version": 1}},
+                return_document=ReturnDocument.AFTER
+            )
+            if not session_head:
+                self._backfill_session_head(sender_id)
+            return session_head
+
+    def _get_cached_events(self, sender_id: Text, session_head: Dict[Text, Any]) -> Optional[List[Dict[Text, Any]]]:
+        """Fetches events of the current session from cache if they are as recent as the session head."""
+        if self.tracker_cache is None:
+            return None
+        with self.__cache_lock:
+            cached = self.tracker_cache.get(sender_id)
+        if cached and cached["version"] == session_head.get("version", 0):
+            return list(cached["events"])
+        return None
+
+    def _cache_events(self, sender_id: Text, version: int, events: List[Dict[Text, Any]]):
+        if self.tracker_cache is None:
+            return
+        with self.__cache_lock:
+            self.tracker_cache[sender_id] = {"version": version, "events": list(events)}
+
+    def _update_cached_events(self, sender_id: Text, session_head: Optional[Dict[Text, Any]], events: List[Dict[Text, Any]]):
+        """
+        Appends newly persisted events to the cached session of the sender.
+        Cache is invalidated if events were persisted by another process since it was cached.
+        """
+        if self.tracker_cache is None:
+            return
+        with self.__cache_lock:
+            cached = self.tracker_cache.get(sender_id)
+            if not session_head or not cached or cached["version"] != session_head["version"] - 1:
+                self.tracker_cache.pop(sender_id, None)
+                return
+            session_events = cached["events"] + events
+            for index, event in enumerate(events):
+                if event["event"] == "session_started":
+                    session_events = events[index + 1:]
+            self.tracker_cache[sender_id] = {"version": session_head["version"], "events": session_events}
+
+    def _invalidate_cached_events(self, sender_id: Text):
+        if self.tracker_cache is None:
+            return
+        with self.__cache_lock:
+            self.tracker_cache.pop(sender_id, None)
+
+    def backfill_session_heads(self) -> int:
+        """
+        Builds session heads of all senders from stored events.
+        Used to migrate collections with conversations saved before session heads were maintained.
+
+        :return: number of senders migrated
+        """
+        if self.write_buffer:
+            self.write_buffer.flush()
+        senders = self.conversations.distinct("sender_id", {"event": {"$exists": True}})
+        for sender_id in senders:
+            self._backfill_session_head(sender_id)
+        return len(senders)
+
+    def _additional_events(self, tracker: DialogueStateTracker) -> Iterator:
+        """
+        Fetches events which are not yet persisted.
+        Trackers retrieved, created or saved by this store carry the number of events
+        already persisted, so that only the new tail has to be computed.
+        For trackers created elsewhere, events stored in the current session are counted.
+        """
+        number_events_persisted = getattr(tracker, "persisted_events_count", None)
+        if number_events_persisted is None:
+            number_events_persisted = self._get_session_head(tracker.sender_id)["event_count"]
+        return itertools.islice(
+            tracker.events, number_events_persisted, len(tracker.events)
+        )
+
+
+class AsyncKMongoTrackerStore(KMongoTrackerStore):
+    """
+    Tracker store with the same document layout and indexes as KMongoTrackerStore
+    which performs blocking database calls on a thread pool, so that the event loop
+    keeps serving other conversations while a tracker is being fetched or saved.
+    """
+
+    __executor = None
+    __executor_lock = Lock()
+
+    def __init__(self, domain: Domain, max_workers: Optional[int] = None, **kwargs: Dict[Text, Any]) -> None:
+        """
+        :param max_workers: number of threads performing database calls, shared by all async tracker stores
+        """
+        super().__init__(domain, **kwargs)
+        with AsyncKMongoTrackerStore.__executor_lock:
+            if not AsyncKMongoTrackerStore.__executor:
+                AsyncKMongoTrackerStore.__executor = ThreadPoolExecutor(max_workers, thread_name_prefix="tracker_store")
+
+    async def __run_in_executor(self, func, *args):
+        return await asyncio.get_event_loop().run_in_executor(AsyncKMongoTrackerStore.__executor, func, *args)
+
+    async def retrieve_async(self, sender_id: Text) -> Optional[DialogueStateTracker]:
+        return await self.__run_in_executor(self.retrieve, sender_id)
+
+    async def save_async(self, tracker: DialogueStateTracker):
+        await self.__run_in_executor(self.save, tracker)
+
+    async def get_or_create_tracker_async(
+            self, sender_id: Text, max_event_history: Optional[int] = None, append_action_listen: bool = True
+    ) -> DialogueStateTracker:
+        """Returns tracker or creates one if the retrieval returns None."""
+        tracker = await self.retrieve_async(sender_id)
+        self.max_event_history = max_event_history
+        if tracker is None:
+            tracker = self.init_tracker(sender_id)
+            if append_action_listen:
+                tracker.update(ActionExecuted(ACTION_LISTEN_NAME))
+            await self.save_async(tracker)
+        return tracker
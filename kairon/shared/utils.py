@@ -292,6 +292,22 @@ class Utility:
             if not raise_error:
                 return False
 
+    @staticmethod
+    def is_process_running(pid: int):
+        """
+        checks whether a process with the pid is running on this host
+
+        :param pid: process id
+        :return: boolean
+        """
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            pass
+        return True
+
     @staticmethod
     def get_latest_file(folder, extension_pattern="*"):
         """
@@ -545,16 +561,31 @@ class Utility:
         :param domain: domain data
         :return: mongo tracker
         """
-        from kairon.shared.trackers import KMongoTrackerStore
+        from kairon.shared.trackers import KMongoTrackerStore, AsyncKMongoTrackerStore, TrackerWriteBuffer
         config = Utility.get_local_db()
-        return KMongoTrackerStore(
+        cache_config = Utility.environment['chat']['tracker_cache']
+        store_config = Utility.environment['chat']['tracker_store']
+        write_behind_config = store_config['write_behind']
+        kwargs = {}
+        if write_behind_config['enable']:
+            kwargs['write_buffer'] = TrackerWriteBuffer.get_instance(
+                write_behind_config['batch_size'], write_behind_config['flush_interval'], write_behind_config['max_size']
+            )
+        tracker_store_class = KMongoTrackerStore
+        if store_config['type'] == "async":
+            tracker_store_class = AsyncKMongoTrackerStore
+            kwargs['max_workers'] = store_config['max_workers']
+        return tracker_store_class(
             domain=domain,
             host=config['host'],
             db=config['db'],
             collection=bot,
             username=config.get('username'),
             password=config.get('password'),
-            auth_source=config['options'].get("authSource") if config['options'].get("authSource") else "admin"
+            auth_source=config['options'].get("authSource") if config['options'].get("authSource") else "admin",
+            cache_size=cache_config['max_size'] if cache_config['enable'] else None,
+            cache_ttl=cache_config['ttl'] if cache_config['enable'] else None,
+            **kwargs
         )
 
     @staticmethod
@@ -0,0 +1,228 @@
+import argparse
+import asyncio
+import json
+import os
+import platform
+import sys
+import time
+from threading import Thread
+from typing import Text, Dict, List
+
+os.environ.setdefault("system_file", "./tests/testing_data/system.yaml")
+
+import mongomock
+from loguru import logger
+from mongoengine import connect
+from tornado.httpserver import HTTPServer
+from tornado.ioloop import IOLoop
+from tornado.netutil import bind_sockets
+from tornado.web import Application, RequestHandler
+
+from kairon.api.models import RegisterAccount
+from kairon.chat.latency import LatencyHistogram
+from kairon.chat.utils import ChatUtils
+from kairon.shared.account.processor import AccountProcessor
+from kairon.shared.data.processor import MongoProcessor
+from kairon.shared.utils import Utility
+from kairon.train import start_training
+
+BOT_PATH = os.path.join(os.path.dirname(__file__), "chat_benchmark_bot")
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "chat_benchmark_baseline.json")
+MESSAGES = ["hi", "where is my order", "when will my order arrive", "bye"]
+ACTION_RESPONSE = "Your order is on the way"
+
+
+class ActionServerStub(RequestHandler):
+    """
+    Responds to every action request with a fixed utterance after the configured delay.
+    """
+
+    def initialize(self, delay: float):
+        self.delay = delay
+
+    async def post(self):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.write({"events": [], "responses": [{"text": ACTION_RESPONSE}]})
+
+
+def start_action_server(delay: float) -> Text:
+    """
+    Starts stub action server on a free port in a background thread
+    so that it does not compete with the benchmark for the event loop.
+
+    :param delay: seconds taken by the stub to execute an action
+    :return: action server url
+    """
+    sockets = bind_sockets(0, "127.0.0.1")
+    port = sockets[0].getsockname()[1]
+
+    def serve():
+        asyncio.set_event_loop(asyncio.new_event_loop())
+        server = HTTPServer(Application([(r"/webhook", ActionServerStub, dict(delay=delay))]))
+        server.add_sockets(sockets)
+        IOLoop.current().start()
+
+    Thread(target=serve, name="action_server_stub", daemon=True).start()
+    return f"http://127.0.0.1:{port}/webhook"
+
+
+def setup_bot():
+    """
+    Creates an account with the benchmark bot and trains it.
+
+    :return: bot id, account id
+    """
+    email = "benchmark@chat.com"
+    connect(**Utility.mongoengine_connection())
+    asyncio.new_event_loop().run_until_complete(AccountProcessor.account_setup(RegisterAccount(**{
+        "email": email, "first_name": "Chat", "last_name": "Benchmark", "password": "Benchmark@12",
+        "confirm_password": "Benchmark@12", "account": "ChatBenchmark"
+    }).dict()))
+    user = AccountProcessor.get_complete_user_details(email)
+    bot = user['bots']['account_owned'][0]['_id']
+    asyncio.new_event_loop().run_until_complete(MongoProcessor().save_from_path(BOT_PATH, bot, user=email))
+    start_training(bot, email)
+    return bot, user['account']
+
+
+async def warm_up(bot: Text, account: int):
+    """
+    Loads the agent and verifies that the stub action server is reachable.
+
+    :param bot: bot id
+    :param account: account id
+    :return: None
+    """
+    for message in MESSAGES:
+        response = await ChatUtils.chat(message, account, bot, "benchmark_warm_up")
+        if message == "where is my order" and ACTION_RESPONSE not in json.dumps(response):
+            logger.warning(f"Action server stub was not called, response: {response}")
+
+
+async def run_level(bot: Text, account: int, concurrency: int, requests: int) -> Dict:
+    """
+    Sends requests to ChatUtils.chat from concurrent conversations.
+
+    :param bot: bot id
+    :param account: account id
+    :param concurrency: number of conversations sending messages concurrently
+    :param requests: total number of messages sent
+    :return: latency percentiles in seconds and throughput in requests per second
+    """
+    histogram = LatencyHistogram(requests)
+    messages = iter(range(requests))
+    errors = 0
+
+    async def converse(conversation: int):
+        nonlocal errors
+        sender_id = f"benchmark_{concurrency}_{conversation}"
+        for index in messages:
+            start_time = time.perf_counter()
+            try:
+                await ChatUtils.chat(MESSAGES[index % len(MESSAGES)], account, bot, sender_id)
+            except Exception as e:
+                logger.exception(e)
+                errors += 1
+            histogram.observe(time.perf_counter() - start_time)
+
+    start_time = time.perf_counter()
+    await asyncio.gather(*[converse(conversation) for conversation in range(concurrency)])
+    elapsed = time.perf_counter() - start_time
+    stats = histogram.stats()
+    return {
+        "requests": requests, "errors": errors, "mean": stats["mean"], "p50": stats["p50"],
+        "p95": stats["p95"], "p99": stats["p99"], "max": stats["max"], "throughput": requests / elapsed
+    }
+
+
+def compare(results: Dict, baseline: Dict, tolerance: float) -> List[Text]:
+    """
+    Compares results with the baseline.
+    Latency percentiles higher or throughput lower than the baseline by more than tolerance are regressions.
+
+    :param results: results per concurrency level
+    :param baseline: baseline results per concurrency level
+    :param tolerance: allowed deviation as fraction of baseline
+    :return: list of regressions
+    """
+    regressions = []
+    for level, result in results.items():
+        expected = baseline.get(level)
+        if not expected:
+            continue
+        for metric in ("p50", "p95", "p99"):
+            if result[metric] > expected[metric] * (1 + tolerance):
+                regressions.append(
+                    f"concurrency {level}: {metric} {result[metric] * 1000:.1f}ms, baseline {expected[metric] * 1000:.1f}ms"
+                )
+        if result["throughput"] < expected["throughput"] * (1 - tolerance):
+            regressions.append(
+                f"concurrency {level}: throughput {result['throughput']:.1f}/s, baseline {expected['throughput']:.1f}/s"
+            )
+    return regressions
+
+
+def report(results: Dict, baseline: Dict):
+    print(f"{'concurrency':>11} {'requests':>8} {'errors':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+          f"{'req/s':>8} {'p95 vs baseline':>15}")
+    for level, result in results.items():
+        delta = ""
+        if baseline.get(level):
+            delta = f"{(result['p95'] / baseline[level]['p95'] - 1) * 100:+.1f}%"
+        print(f"{level:>11} {result['requests']:>8} {result['errors']:>6} {result['p50'] * 1000:>8.1f} "
+              f"{result['p95'] * 1000:>8.1f} {result['p99'] * 1000:>8.1f} {result['throughput']:>8.1f} {delta:>15}")
+
+
+def main():
+    """
+    Benchmark for the chat hot path which runs without any external service.
+
+    A tiny bot is trained locally, conversations are stored in mongomock and custom actions
+    are executed by a stub action server. ChatUtils.chat is run at increasing concurrency
+    and latency percentiles and throughput of each level are compared with the stored baseline.
+
+    python -m stress_test.chat_benchmark --concurrency 1 4 16 32 --requests 200
+    python -m stress_test.chat_benchmark --save-baseline
+    """
+    parser = argparse.ArgumentParser(description="Chat hot path benchmark")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 32],
+                        help="number of concurrent conversations at each level")
+    parser.add_argument("--requests", type=int, default=200, help="messages sent at each level")
+    parser.add_argument("--action-delay", type=float, default=0.0, help="seconds taken by the stub action server")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="baseline results file")
+    parser.add_argument("--save-baseline", action="store_true", help="store results as the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed deviation from baseline")
+    args = parser.parse_args()
+
+    with mongomock.patch(servers=(("localhost", 27017),)):
+        Utility.load_environment()
+        Utility.environment['action']['url'] = start_action_server(args.action_delay)
+        bot, account = setup_bot()
+        loop = asyncio.new_event_loop()
+        loop.run_until_complete(warm_up(bot, account))
+        results = {}
+        for concurrency in args.concurrency:
+            results[str(concurrency)] = loop.run_until_complete(run_level(bot, account, concurrency, args.requests))
+
+    baseline = {}
+    if os.path.isfile(args.baseline):
+        baseline = Utility.load_json_file(args.baseline)["levels"]
+    report(results, baseline)
+    if args.save_baseline:
+        with open(args.baseline, "w") as baseline_file:
+            json.dump({"python": platform.python_version(), "machine": platform.machine(), "levels": results},
+                      baseline_file, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+    if not baseline:
+        print(f"No baseline found at {args.baseline}, run with --save-baseline to record one")
+        return 0
+    regressions = compare(results, baseline, args.tolerance)
+    for regression in regressions:
+        print(f"Regression: {regression}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -20,6 +20,7 @@ from kairon.shared.data.data_objects import Slots, KeyVault, BotSettings, LLMSet
 from kairon.shared.data.processor import MongoProcessor
 from kairon.shared.llm.clients.gpt3 import GPT3Resources
 from kairon.shared.utils import Utility
+from kairon.shared.actions.circuit_breaker import CircuitBreaker
 from kairon.shared.actions.utils import ActionUtility
 from mongoengine import connect
 import json
@@ -43,6 +44,60 @@ class TestActionServer(AsyncHTTPTestCase):
         self.assertEqual(response.code, 200)
         self.assertEqual(response.body.decode("utf8"), 'Kairon Server Running')
 
+    @responses.activate
+    def test_http_action_circuit_breaker(self):
+        action_name = "test_http_action_circuit_breaker"
+        bot = "5f50fd0a56b698ca10d35d2f"
+        Actions(name=action_name, type=ActionType.http_action.value, bot=bot, user="user").save()
+        HttpActionConfig(
+            action_name=action_name,
+            response=HttpActionResponse(value="${data.status}"),
+            http_url="http://localhost:8082/degraded",
+            request_method="GET",
+            bot=bot,
+            user="user"
+        ).save()
+        responses.add(method=responses.GET, url="http://localhost:8082/degraded", body="Service Unavailable", status=503)
+        request_object = {
+            "next_action": action_name,
+            "tracker": {
+                "sender_id": "default",
+                "conversation_id": "default",
+                "slots": {"bot": bot},
+                "latest_message": {'text': 'get status', 'intent_ranking': [{'name': 'test_run'}]},
+                "latest_event_time": 1537645578.314389,
+                "followup_action": "action_listen",
+                "paused": False,
+                "events": [],
+                "latest_input_channel": "rest",
+                "active_loop": {},
+                "latest_action": {},
+            },
+            "domain": {
+                "config": {}, "session_config": {}, "intents": [], "entities": [], "slots": {"bot": bot},
+                "responses": {}, "actions": [], "forms": {}, "e2e_actions": []
+            },
+            "version": "version"
+        }
+        with patch.dict(Utility.environment['action']['circuit_breaker'], {"enable": True, "failure_threshold": 2}):
+            CircuitBreaker.reset()
+            for _ in range(3):
+                response = self.fetch("/webhook", method="POST", body=json.dumps(request_object).encode('utf-8'))
+                response_json = json.loads(response.body.decode("utf8"))
+                self.assertEqual(response.code, 200)
+                self.assertEqual(response_json['responses'][0]['text'], "I have failed to process your request")
+            self.assertEqual(len(responses.calls), 2)
+            log = ActionServerLogs.objects(action=action_name).order_by("-id").first()
+            self.assertEqual(log.status, "FAILURE")
+            self.assertEqual(log.exception, "Failed to execute the url: Circuit open for localhost:8082, request not sent")
+
+            response = self.fetch("/metrics/circuit_breaker")
+            response_json = json.loads(response.body.decode("utf8"))
+            self.assertEqual(response.code, 200)
+            self.assertEqual(response_json['data']['localhost:8082']['state'], "open")
+            self.assertEqual(response_json['data']['localhost:8082']['failures'], 2)
+            CircuitBreaker.reset()
+
     @responses.activate
     def test_http_action_execution(self):
         action_name = "test_http_action_execution"
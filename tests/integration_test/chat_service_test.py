@@ -1,6 +1,7 @@
 import asyncio
 import json
 import os
+import time
 from unittest import mock
 from urllib.parse import urlencode, quote_plus
 
@@ -14,6 +15,8 @@ from tornado.test.testing_test import AsyncHTTPTestCase
 
 from kairon.api.models import RegisterAccount
 from kairon.chat.agent.agent import KaironAgent
+from kairon.chat.agent_processor import AgentProcessor
+from kairon.chat.dispatcher import BotAffinityDispatcher, ConsistentHashRing
 from kairon.chat.handlers.channels.messenger import MessengerHandler
 from kairon.chat.server import make_app
 from kairon.chat.utils import ChatUtils
@@ -196,6 +199,23 @@ class TestChatServer(AsyncHTTPTestCase):
         self.assertEqual(response.code, 200)
         self.assertEqual(response.body.decode("utf8"), 'Kairon Server Running')
 
+    def test_readiness(self):
+        response = self.fetch("/readiness")
+        actual = json.loads(response.body.decode("utf8"))
+        self.assertEqual(response.code, 200)
+        assert actual["success"]
+        assert actual["message"] == "Ready"
+
+    def test_readiness_warming_up(self):
+        with patch.dict(AgentProcessor.warm_up_status, {"ready": False, "bots": [bot, bot2], "loaded": [bot], "failed": []}):
+            response = self.fetch("/readiness")
+        actual = json.loads(response.body.decode("utf8"))
+        self.assertEqual(response.code, 503)
+        assert not actual["success"]
+        assert actual["error_code"] == 503
+        assert actual["data"] == {"loaded": 1, "failed": 0, "total": 2}
+        assert actual["message"] == "Warming up agents"
+
     def test_chat(self):
         with patch.object(Utility, "get_local_mongo_store") as mocked:
             mocked.side_effect = self.empty_store
@@ -234,6 +254,149 @@ class TestChatServer(AsyncHTTPTestCase):
             assert MeteringProcessor.get_metric_count(bot_account, metric_type=MetricType.test_chat,
                                                       channel_type="chat_client") > 0
 
+    def test_chat_with_latency_debug(self):
+        with patch.object(Utility, "get_local_mongo_store") as mocked:
+            mocked.side_effect = self.empty_store
+            response = self.fetch(
+                f"/api/bot/{bot}/chat",
+                method="POST",
+                body=json.dumps({"data": "Hi", "debug": True}).encode('utf-8'),
+                headers={"Authorization": token_type + " " + token},
+                connect_timeout=0,
+                request_timeout=0
+            )
+            actual = json.loads(response.body.decode("utf8"))
+            self.assertEqual(response.code, 200)
+            assert actual["success"]
+            stages = [span["stage"] for span in actual["data"]["latency"]]
+            assert stages[0] == "tracker_fetch"
+            assert "parse_message" in stages
+            assert "policy_prediction" in stages
+            assert "save_tracker" in stages
+            assert "metering" in stages
+            assert stages[-1] == "total"
+            assert all(span["duration"] >= 0 for span in actual["data"]["latency"])
+            assert {span["action"] for span in actual["data"]["latency"] if span["stage"] == "action"}
+
+        response = self.fetch(f"/metrics/latency?bot={bot}")
+        actual = json.loads(response.body.decode("utf8"))
+        self.assertEqual(response.code, 200)
+        assert actual["success"]
+        assert list(actual["data"].keys()) == [bot]
+        assert actual["data"][bot]["stages"]["total"]["count"] > 0
+        assert set(actual["data"][bot]["stages"]["total"].keys()) == {"count", "mean", "p50", "p90", "p95", "p99", "max"}
+        assert actual["data"][bot]["actions"]
+
+    def test_streaming_chat(self):
+        with patch.object(Utility, "get_local_mongo_store") as mocked:
+            mocked.side_effect = self.empty_store
+            response = self.fetch(
+                f"/api/bot/{bot}/chat/stream",
+                method="POST",
+                body=json.dumps({"data": "Hi"}).encode('utf-8'),
+                headers={"Authorization": token_type + " " + token},
+                connect_timeout=0,
+                request_timeout=0
+            )
+        self.assertEqual(response.code, 200)
+        assert response.headers["Content-Type"] == "text/event-stream"
+        events = []
+        for event in response.body.decode("utf8").strip().split("\n\n"):
+            name, data = event.split("\n")
+            events.append((name.replace("event: ", ""), json.loads(data.replace("data: ", ""))))
+        assert [name for name, _ in events[:-1]] == ["message"] * (len(events) - 1)
+        assert len(events) > 1
+        name, actual = events[-1]
+        assert name == "response"
+        assert actual["success"]
+        assert actual["data"]["nlu"]
+        assert actual["data"]["response"] == [data for _, data in events[:-1]]
+
+    def test_streaming_chat_invalid_request(self):
+        response = self.fetch(
+            f"/api/bot/{bot}/chat/stream",
+            method="POST",
+            body=json.dumps({"data": ""}).encode('utf-8'),
+            headers={"Authorization": token_type + " " + token},
+            connect_timeout=0,
+            request_timeout=0
+        )
+        actual = json.loads(response.body.decode("utf8"))
+        self.assertEqual(response.code, 200)
+        assert not actual["success"]
+        assert actual["error_code"] == 422
+        assert actual["message"] == "data is required!"
+
+    def test_batch_chat(self):
+        access_token, _ = Authentication.generate_integration_token(
+            bot, "test@chat.com", name='integration_token_for_batch_chat')
+        messages = [
+            {"sender_id": "batch_user_1", "data": "Hi"}, {"sender_id": "batch_user_2", "data": "Hi"},
+            {"sender_id": "batch_user_1", "data": "Hello"}, {"data": "Hi"}
+        ]
+        with patch.object(Utility, "get_local_mongo_store") as mocked:
+            mocked.side_effect = self.empty_store
+            response = self.fetch(
+                f"/api/bot/{bot}/chat/batch",
+                method="POST",
+                body=json.dumps({"messages": messages}).encode('utf-8'),
+                headers={"Authorization": f"{token_type} {access_token}", 'X-USER': 'batch_user'},
+                connect_timeout=0,
+                request_timeout=0
+            )
+        self.assertEqual(response.code, 200)
+        assert response.headers["Content-Type"] == "application/x-ndjson"
+        results = [json.loads(line) for line in response.body.decode("utf8").splitlines()]
+        assert len(results) == 4
+        assert all(result["success"] and result["error_code"] == 0 for result in results)
+        assert sorted(result["data"]["index"] for result in results) == [0, 1, 2, 3]
+        senders = {result["data"]["index"]: result["data"]["sender_id"] for result in results}
+        assert senders == {0: "batch_user_1", 1: "batch_user_2", 2: "batch_user_1", 3: "batch_user"}
+        batch_user_1 = [result["data"]["index"] for result in results if result["data"]["sender_id"] == "batch_user_1"]
+        assert batch_user_1 == [0, 2]
+        assert all(result["data"]["response"]["nlu"] for result in results)
+
+    def test_batch_chat_on_behalf_of_other_sender(self):
+        response = self.fetch(
+            f"/api/bot/{bot}/chat/batch",
+            method="POST",
+            body=json.dumps({"messages": [{"sender_id": "other_user", "data": "Hi"}]}).encode('utf-8'),
+            headers={"Authorization": token_type + " " + token},
+            connect_timeout=0,
+            request_timeout=0
+        )
+        actual = json.loads(response.body.decode("utf8"))
+        self.assertEqual(response.code, 200)
+        assert not actual["success"]
+        assert actual["error_code"] == 422
+        assert actual["message"] == "Only integration user can send messages on behalf of other senders!"
+
+    def test_batch_chat_invalid_request(self):
+        response = self.fetch(
+            f"/api/bot/{bot}/chat/batch",
+            method="POST",
+            body=json.dumps({"messages": [{"data": "Hi"}, {"data": " "}]}).encode('utf-8'),
+            headers={"Authorization": token_type + " " + token},
+            connect_timeout=0,
+            request_timeout=0
+        )
+        actual = json.loads(response.body.decode("utf8"))
+        self.assertEqual(response.code, 200)
+        assert not actual["success"]
+        assert actual["message"] == "data is required for message at index 1!"
+
+        response = self.fetch(
+            f"/api/bot/{bot}/chat/batch",
+            method="POST",
+            body=json.dumps({"data": "Hi"}).encode('utf-8'),
+            headers={"Authorization": token_type + " " + token},
+            connect_timeout=0,
+            request_timeout=0
+        )
+        actual = json.loads(response.body.decode("utf8"))
+        assert not actual["success"]
+        assert actual["message"] == "messages are required!"
+
     def test_chat_with_user(self):
         access_token = chat_client_config['config']['headers']['authorization']['access_token']
         token_type = chat_client_config['config']['headers']['authorization']['token_type']
@@ -2054,3 +2217,134 @@ class TestChatServer(AsyncHTTPTestCase):
                 responses.stop()
                 actual = json.loads(response.body.decode("utf8"))
                 assert actual["data"]["agent_handoff"]["businessworking"]=="We are unavailable at the moment. In case of any query related to Sales, gifting or enquiry of order, please connect over following whatsapp number +912929393 ."
+
+
+class TestBotAffinityDispatcher(AsyncHTTPTestCase):
+
+    def get_app(self):
+        from tornado.httpserver import HTTPServer
+        from tornado.testing import bind_unused_port
+        from tornado.web import Application, RequestHandler
+
+        class WorkerHandler(RequestHandler):
+
+            def initialize(self, worker):
+                self.worker = worker
+
+            def get(self, *args):
+                if self.request.path == "/readiness":
+                    ready = self.worker in ready_workers
+                    self.set_status(200 if ready else 503)
+                    self.write(json.dumps({"data": {"loaded": 1 if ready else 0, "failed": 0, "total": 1},
+                                           "success": ready}))
+                    return
+                if self.request.path == "/metrics/latency":
+                    bot = self.get_query_argument("bot", None)
+                    data = {f"bot_{self.worker}": {"stages": {"parse_message": {"count": 1}}, "actions": {}}}
+                    self.write(json.dumps({"data": {b: v for b, v in data.items() if not bot or b == bot},
+                                           "success": True}))
+                    return
+                self.set_header("X-Worker", self.worker)
+                self.write(json.dumps({"worker": self.worker, "uri": self.request.uri}))
+
+            def post(self, *args):
+                self.set_status(201)
+                self.write(json.dumps({"worker": self.worker, "body": self.request.body.decode("utf8"),
+                                       "forwarded_for": self.request.headers.get("X-Forwarded-For")}))
+
+        ready_workers = self.ready_workers = {"0", "1", "2"}
+        ports = []
+        for worker in range(3):
+            socket, port = bind_unused_port()
+            http_server = HTTPServer(Application([(r".*", WorkerHandler, dict(worker=str(worker)))]))
+            http_server.add_sockets([socket])
+            ports.append(port)
+        self.worker_ports = ports
+        self.dispatcher = BotAffinityDispatcher(ports)
+        return self.dispatcher.make_app()
+
+    def test_get_bot(self):
+        assert BotAffinityDispatcher.get_bot("/api/bot/5f9a/chat") == "5f9a"
+        assert BotAffinityDispatcher.get_bot("/api/bot/5f9a/chat/stream") == "5f9a"
+        assert BotAffinityDispatcher.get_bot("/api/bot/5f9a/reload") == "5f9a"
+        assert BotAffinityDispatcher.get_bot("/api/bot/slack/5f9a/token") == "5f9a"
+        assert BotAffinityDispatcher.get_bot("/api/bot/whatsapp/5f9a/token") == "5f9a"
+        assert BotAffinityDispatcher.get_bot("/readiness") is None
+        assert BotAffinityDispatcher.get_bot("/") is None
+
+    def test_consistent_hash_ring(self):
+        ring = ConsistentHashRing([5001, 5002, 5003])
+        bots = [f"bot_{i}" for i in range(300)]
+        assignment = {bot: ring.get_node(bot) for bot in bots}
+        assert set(assignment.values()) == {5001, 5002, 5003}
+        assert all(ring.get_node(bot) == node for bot, node in assignment.items())
+
+        ring = ConsistentHashRing([5001, 5002, 5003, 5004])
+        moved = [bot for bot in bots if ring.get_node(bot) != assignment[bot]]
+        assert all(ring.get_node(bot) == 5004 for bot in moved)
+
+    def test_dispatch_bot_to_same_worker(self):
+        workers = set()
+        for path in ["/api/bot/affinity_bot/chat", "/api/bot/affinity_bot/reload", "/api/bot/slack/affinity_bot/token"]:
+            response = self.fetch(path)
+            self.assertEqual(response.code, 200)
+            actual = json.loads(response.body.decode("utf8"))
+            assert actual["uri"] == path
+            assert response.headers["X-Worker"] == actual["worker"]
+            workers.add(actual["worker"])
+        assert workers == {str(self.worker_ports.index(self.dispatcher.ring.get_node("affinity_bot")))}
+
+    def test_dispatch_post(self):
+        response = self.fetch("/api/bot/affinity_bot/chat", method="POST", body=json.dumps({"data": "Hi"}))
+        self.assertEqual(response.code, 201)
+        actual = json.loads(response.body.decode("utf8"))
+        assert actual["body"] == json.dumps({"data": "Hi"})
+        assert actual["forwarded_for"] == "127.0.0.1"
+
+    def test_dispatch_request_without_bot(self):
+        response = self.fetch("/")
+        self.assertEqual(response.code, 200)
+        assert json.loads(response.body.decode("utf8"))["worker"] == "0"
+
+    def test_readiness_of_all_workers(self):
+        response = self.fetch("/readiness")
+        self.assertEqual(response.code, 200)
+        actual = json.loads(response.body.decode("utf8"))
+        assert actual["success"]
+        assert actual["data"]["loaded"] == actual["data"]["total"] == 3
+        assert set(actual["data"]["workers"].values()) == {True}
+
+        self.ready_workers.discard("2")
+        response = self.fetch("/readiness")
+        self.assertEqual(response.code, 503)
+        actual = json.loads(response.body.decode("utf8"))
+        assert not actual["success"]
+        assert actual["message"] == "Warming up agents"
+        assert actual["data"]["loaded"] == 2
+        assert actual["data"]["workers"][str(self.worker_ports[2])] is False
+
+    def test_latency_metrics_of_all_workers(self):
+        response = self.fetch("/metrics/latency")
+        self.assertEqual(response.code, 200)
+        actual = json.loads(response.body.decode("utf8"))
+        assert actual["success"]
+        assert set(actual["data"].keys()) == {"bot_0", "bot_1", "bot_2"}
+
+        response = self.fetch("/metrics/latency?bot=bot_1")
+        actual = json.loads(response.body.decode("utf8"))
+        assert list(actual["data"].keys()) == ["bot_1"]
+
+    def test_warm_up_only_bots_of_worker(self):
+        from kairon.chat.server import warm_up_agents
+
+        bots = [f"warm_up_bot_{i}" for i in range(20)]
+        port = self.worker_ports[0]
+        with patch.dict(Utility.environment["chat"]["warm_up"], {"enable": True}), \
+                patch.object(MeteringProcessor, "get_most_active_bots", return_value=bots), \
+                patch.dict(AgentProcessor.warm_up_status), \
+                patch.object(AgentProcessor, "warm_up_cache") as warm_up_cache:
+            warm_up_agents(port, self.dispatcher.ring)
+            time.sleep(0.1)
+        warmed_up = warm_up_cache.call_args[0][0]
+        assert warmed_up == [bot for bot in bots if self.dispatcher.ring.get_node(bot) == port]
+        assert 0 < len(warmed_up) < len(bots)
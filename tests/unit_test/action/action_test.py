@@ -1,10 +1,12 @@
 import json
 import os
+import time
 import urllib.parse
 
 from googleapiclient.http import HttpRequest
 from pipedrive.exceptions import UnauthorizedError, BadRequestError
 
+from kairon.actions.cache import ActionConfigCache, ActionResponseCache
 from kairon.actions.definitions.email import ActionEmail
 from kairon.actions.definitions.factory import ActionFactory
 from kairon.actions.definitions.form_validation import ActionFormValidation
@@ -25,6 +27,7 @@ os.environ["system_file"] = "./tests/testing_data/system.yaml"
 from typing import Dict, Text, Any, List
 
 import pytest
+import requests
 import responses
 from mongoengine import connect, QuerySet
 from rasa_sdk import Tracker
@@ -33,8 +36,11 @@ from kairon.shared.actions.models import ActionType, HttpRequestContentType
 from kairon.shared.actions.data_objects import HttpActionRequestBody, HttpActionConfig, ActionServerLogs, SlotSetAction, \
     Actions, FormValidationAction, EmailActionConfig, GoogleSearchAction, JiraAction, ZendeskAction, \
     PipedriveLeadsAction, SetSlots, HubspotFormsAction, HttpActionResponse, CustomActionRequestParameters, \
-    KaironTwoStageFallbackAction, SetSlotsFromResponse, PromptAction
+    KaironTwoStageFallbackAction, SetSlotsFromResponse, PromptAction, HttpActionCache
 from kairon.actions.handlers.processor import ActionProcessor
+from kairon.shared.actions.buffer import ActionServerLogsBuffer
+from kairon.shared.actions.circuit_breaker import CircuitBreaker
+from kairon.shared.actions.evaluator import ScriptEvaluator
 from kairon.shared.actions.utils import ActionUtility
 from kairon.shared.actions.exception import ActionFailure
 from kairon.shared.utils import Utility
@@ -125,6 +131,101 @@ class TestActions:
         assert response['test_class'][1]['key2'] == 'value2'
         assert 'Authorization' not in responses.calls[0].request.headers
 
+    @pytest.mark.asyncio
+    @responses.activate
+    async def test_execute_http_request_async(self):
+        http_url = 'http://localhost:8080/mock'
+        responses.add(
+            method=responses.GET,
+            url=http_url,
+            json={'data': 'test_data'},
+            status=200,
+            headers={"Set-Cookie": "session_id=1234567890"}
+        )
+
+        response = await ActionUtility.execute_http_request_async(http_url=http_url, request_method=responses.GET)
+        assert response == {'data': 'test_data'}
+        session = ActionUtility.get_http_session()
+        assert session is ActionUtility.get_http_session()
+        assert not session.cookies
+
+        response = await ActionUtility.execute_http_request_async(http_url=http_url, request_method=responses.GET)
+        assert response == {'data': 'test_data'}
+        assert len(responses.calls) == 2
+        assert 'Cookie' not in responses.calls[1].request.headers
+
+    @pytest.mark.asyncio
+    async def test_execute_http_request_async_hedged(self, monkeypatch):
+        calls = []
+
+        def _execute_http_request(*args, **kwargs):
+            calls.append(kwargs)
+            if len(calls) == 1:
+                time.sleep(0.5)
+                return "slow"
+            return "fast"
+
+        monkeypatch.setattr(ActionUtility, "execute_http_request", _execute_http_request)
+        response = await ActionUtility.execute_http_request_async(http_url="http://localhost:8080/mock",
+                                                                  request_method="GET", hedge=True)
+        assert response == "slow"
+        assert len(calls) == 1
+
+        calls.clear()
+        monkeypatch.setitem(Utility.environment['action'], 'hedging', {"enable": True, "delay": 0.05})
+        response = await ActionUtility.execute_http_request_async(http_url="http://localhost:8080/mock",
+                                                                  request_method="POST", hedge=True)
+        assert response == "slow"
+        assert len(calls) == 1
+
+        calls.clear()
+        response = await ActionUtility.execute_http_request_async(http_url="http://localhost:8080/mock",
+                                                                  request_method="GET", hedge=True)
+        assert response == "fast"
+        assert len(calls) == 2
+
+    def test_circuit_breaker(self, monkeypatch):
+        monkeypatch.setitem(Utility.environment['action'], 'circuit_breaker',
+                            {"enable": True, "failure_threshold": 2, "recovery_timeout": 30})
+        CircuitBreaker.reset()
+        url = "http://localhost:8083/orders"
+
+        def _raise_connection_error():
+            raise requests.exceptions.ConnectionError("Connection refused")
+
+        def _raise_unauthorized():
+            exception = ActionFailure("Unauthorized")
+            exception.status_code = 401
+            raise exception
+
+        for _ in range(3):
+            with pytest.raises(ActionFailure, match="Unauthorized"):
+                CircuitBreaker.call(url, _raise_unauthorized)
+        assert CircuitBreaker.get_state() == {}
+
+        with pytest.raises(requests.exceptions.ConnectionError):
+            CircuitBreaker.call(url, _raise_connection_error)
+        assert CircuitBreaker.call(url, lambda: 503, lambda status: status >= 500) == 503
+        state = CircuitBreaker.get_state()
+        assert state["localhost:8083"]["state"] == "open"
+        assert state["localhost:8083"]["failures"] == 2
+        with pytest.raises(ActionFailure, match="Circuit open for localhost:8083, request not sent"):
+            CircuitBreaker.call(url, lambda: 200)
+        assert CircuitBreaker.call("http://localhost:8084/orders", lambda: 200) == 200
+
+        opened_at = state["localhost:8083"]["opened_at"]
+        monkeypatch.setattr(time, "time", lambda: opened_at + 31)
+        with pytest.raises(requests.exceptions.ConnectionError):
+            CircuitBreaker.call(url, _raise_connection_error)
+        assert CircuitBreaker.get_state()["localhost:8083"]["state"] == "open"
+        with pytest.raises(ActionFailure, match="Circuit open for localhost:8083, request not sent"):
+            CircuitBreaker.call(url, lambda: 200)
+
+        monkeypatch.setattr(time, "time", lambda: opened_at + 62)
+        assert CircuitBreaker.call(url, lambda: 200) == 200
+        assert CircuitBreaker.get_state() == {}
+        CircuitBreaker.reset()
+
     @responses.activate
     def test_execute_http_request_get_with_params(self):
         http_url = 'http://localhost:8080/mock'
@@ -1393,6 +1494,67 @@ class TestActions:
         assert str(actual[0]['name']) == 'kairon_action_response'
         assert str(actual[0]['value']) == 'The value of 2 in red is [\'red\', \'buggy\', \'bumpers\']'
 
+    @pytest.mark.asyncio
+    async def test_run_with_get_cached_response(self, monkeypatch):
+        bot = "5f50fd0a56b698ca10d35d2f"
+        for action_bot in [bot, "5f50fd0a56b698ca10d35d30"]:
+            HttpActionConfig(
+                action_name="test_run_with_get_cached_response",
+                response=HttpActionResponse(value="The value of ${data.a.b.3} in ${data.a.b.d.0}"),
+                http_url="http://localhost:8081/cached", request_method="GET", params_list=None,
+                cache=HttpActionCache(enable=True, ttl=60, bypass_slot="refresh"), bot=action_bot, user="user"
+            ).save()
+
+        def _get_action(*args, **kwargs):
+            return {"type": ActionType.http_action.value}
+
+        monkeypatch.setattr(ActionUtility, "get_action", _get_action)
+        ActionResponseCache.clear()
+        responses.reset()
+        responses.start()
+        responses.add(
+            method=responses.GET, url="http://localhost:8081/cached",
+            json={"a": {"b": {"3": 2, "d": ['red', 'buggy', 'bumpers']}}}, status=200
+        )
+
+        async def run(action_bot, refresh=None):
+            tracker = Tracker(sender_id="sender1", slots={"bot": action_bot, "refresh": refresh}, events=[],
+                              paused=False, latest_message={'text': 'get intents', 'intent_ranking': [{'name': 'test_run'}]},
+                              followup_action=None, active_loop=None, latest_action_name=None)
+            actual = await ActionProcessor.process_action(CollectingDispatcher(), tracker, None,
+                                                          "test_run_with_get_cached_response")
+            assert actual[0]['value'] == 'The value of 2 in red'
+            return ActionServerLogs.objects(bot=action_bot, action="test_run_with_get_cached_response").order_by("-id").first()
+
+        log = await run(bot)
+        assert log.cache_hit is False
+        assert len(responses.calls) == 1
+        log = await run(bot)
+        assert log.cache_hit is True
+        assert "Response fetched from cache" in log.messages
+        assert len(responses.calls) == 1
+        log = await run(bot, refresh=True)
+        assert log.cache_hit is False
+        assert len(responses.calls) == 2
+        log = await run("5f50fd0a56b698ca10d35d30")
+        assert log.cache_hit is False
+        assert len(responses.calls) == 3
+        responses.stop()
+        responses.reset()
+        ActionResponseCache.clear()
+
+    def test_action_response_cache_expiry(self, monkeypatch):
+        ActionResponseCache.clear()
+        key = ActionResponseCache.get_key("action", "get", "http://kairon.ai", {"auth": "token"}, {"id": 1})
+        assert key == ActionResponseCache.get_key("action", "GET", "http://kairon.ai", {"auth": "token"}, {"id": 1})
+        assert key != ActionResponseCache.get_key("action", "GET", "http://kairon.ai", {"auth": "other"}, {"id": 1})
+        ActionResponseCache.set("test_bot", key, {"data": [1]}, 60)
+        assert ActionResponseCache.get("test_bot", key) == (True, {"data": [1]})
+        assert ActionResponseCache.get("other_bot", key) == (False, None)
+        monkeypatch.setattr(time, "time", lambda: 10 ** 10)
+        assert ActionResponseCache.get("test_bot", key) == (False, None)
+        ActionResponseCache.clear()
+
     @pytest.mark.asyncio
     async def test_run_with_get_dispatch_type_text_with_json_response(self, monkeypatch):
         action = HttpActionConfig(
@@ -1985,6 +2147,87 @@ class TestActions:
         with pytest.raises(ActionFailure, match='None type action is not supported with action server'):
             ActionFactory.get_instance(bot, 'test_get_action_config_custom_user_action')
 
+    def test_get_instance_from_action_config_cache(self, monkeypatch):
+        bot = 'test_action_config_cache'
+        user = 'test'
+        monkeypatch.setitem(Utility.environment['action']['cache'], 'enable', True)
+        ActionConfigCache.clear()
+        Actions(name='test_action_config_cache', type=ActionType.http_action.value, bot=bot, user=user).save()
+        HttpActionConfig(
+            action_name='test_action_config_cache', response=HttpActionResponse(value="json"),
+            http_url="http://kairon.ai/cached", request_method="GET", bot=bot, user=user
+        ).save()
+        assert ActionConfigCache.get_fingerprint(bot) == 2
+        action = ActionFactory.get_instance(bot, 'test_action_config_cache')
+        assert isinstance(action, ActionHTTP)
+        assert action.get_config()['http_url'] == "http://kairon.ai/cached"
+
+        def _raise_excep(*args, **kwargs):
+            raise ActionFailure("Database should not be queried")
+
+        with monkeypatch.context() as m:
+            m.setattr(ActionUtility, "get_action_type", _raise_excep)
+            m.setattr(ActionHTTP, "retrieve_config", _raise_excep)
+            action = ActionFactory.get_instance(bot, 'test_action_config_cache')
+            assert action.get_config()['http_url'] == "http://kairon.ai/cached"
+
+        config = HttpActionConfig.objects(bot=bot, action_name='test_action_config_cache').get()
+        config.http_url = "http://kairon.ai/updated"
+        config.save()
+        assert ActionConfigCache.get_fingerprint(bot) == 3
+        action = ActionFactory.get_instance(bot, 'test_action_config_cache')
+        assert action.get_config()['http_url'] == "http://kairon.ai/updated"
+        ActionConfigCache.clear()
+
+    def test_action_config_cache_not_validated(self, monkeypatch):
+        monkeypatch.setitem(Utility.environment['action']['cache'], 'enable', True)
+        ActionConfigCache.clear()
+        assert ActionConfigCache.get('test_action_config_cache', ("type", "action"), lambda: "http_action") == "http_action"
+        assert ActionConfigCache.get('test_action_config_cache', ("type", "action"), lambda: "jira_action") == "jira_action"
+
+    def test_action_server_logs_buffered(self, monkeypatch):
+        bot = 'test_action_server_logs_buffer'
+        buffer = ActionServerLogsBuffer(batch_size=100, flush_interval=3600)
+        monkeypatch.setitem(Utility.environment['action']['log_buffer'], 'enable', True)
+        monkeypatch.setattr(ActionServerLogsBuffer, "get_instance", lambda: buffer)
+        for i in range(5):
+            log = ActionServerLogs(type="http_action", intent="intent", action=f"action_{i}", sender="sender",
+                                   bot=bot, status="SUCCESS").save()
+            assert log.id
+        assert len(buffer) == 5
+        assert ActionServerLogs.objects(bot=bot).count() == 0
+        assert buffer.flush() == 5
+        assert len(buffer) == 0
+        logs = list(ActionServerLogs.objects(bot=bot).order_by("-timestamp").skip(1).limit(3))
+        assert [log.action for log in logs] == ["action_3", "action_2", "action_1"]
+        assert buffer.flush() == 0
+        buffer.close()
+
+    def test_action_server_logs_buffer_full(self, monkeypatch):
+        bot = 'test_action_server_logs_buffer_full'
+        buffer = ActionServerLogsBuffer(batch_size=100, flush_interval=3600, max_size=2)
+        monkeypatch.setitem(Utility.environment['action']['log_buffer'], 'enable', True)
+        monkeypatch.setattr(ActionServerLogsBuffer, "get_instance", lambda: buffer)
+        for i in range(3):
+            ActionServerLogs(type="http_action", action=f"action_{i}", sender="sender", bot=bot).save()
+        assert len(buffer) == 2
+        assert buffer.dropped == 1
+        buffer.close()
+        assert ActionServerLogs.objects(bot=bot).count() == 2
+
+        buffer = ActionServerLogsBuffer(batch_size=2, flush_interval=3600, max_size=2)
+        monkeypatch.setattr(ActionServerLogsBuffer, "get_instance", lambda: buffer)
+        for i in range(2):
+            ActionServerLogs(type="http_action", action=f"action_{i}", sender="sender", bot=bot).save()
+        time.sleep(0.5)
+        assert len(buffer) == 0
+        assert ActionServerLogs.objects(bot=bot).count() == 4
+        ActionServerLogs(type="http_action", action="action_2", sender="sender", bot=bot).save()
+        assert len(buffer) == 1
+        assert buffer.dropped == 0
+        buffer.close()
+        assert ActionServerLogs.objects(bot=bot).count() == 5
+
     def test_get_form_validation_config_single_validation(self):
         bot = 'test_actions'
         user = 'test'
@@ -2856,6 +3099,185 @@ class TestActions:
                        "data: {'a': {'b': {'3': 2, '43': 30, 'c': [], 'd': ['red', 'buggy', 'bumpers']}}}",
                        'raise_err_on_failure: False', "Evaluator response: {'success': False}"]
 
+    @responses.activate
+    def test_evaluate_script_embedded(self, monkeypatch):
+        script = "'The value of '+`${a.b.d.0}`+' is '+${a.b.3}"
+        data = {'a': {'b': {'3': 2, '43': 30, 'c': [], 'd': ['red', 'buggy', 'bumpers']}}}
+        evaluator = ScriptEvaluator(workers=1)
+        monkeypatch.setitem(Utility.environment['evaluator'], 'url', "http://localhost:8085/evaluate")
+        monkeypatch.setitem(Utility.environment['evaluator']['embedded'], 'enable', True)
+        monkeypatch.setattr(ScriptEvaluator, "get_instance", lambda: evaluator)
+        result, log = ActionUtility.evaluate_script(script, data)
+        assert result == "The value of red is 2"
+        assert log == ['evaluation_type: script', "script: 'The value of '+`${a.b.d.0}`+' is '+${a.b.3}",
+                       "data: {'a': {'b': {'3': 2, '43': 30, 'c': [], 'd': ['red', 'buggy', 'bumpers']}}}",
+                       'raise_err_on_failure: True', "Evaluator response: {'success': True, 'data': 'The value of red is 2'}"]
+        result, _ = ActionUtility.evaluate_script('return {"name": "${a.b.d.1}", "colors": ${a.b.d}}', data)
+        assert result == {"name": "buggy", "colors": ['red', 'buggy', 'bumpers']}
+        result, _ = ActionUtility.evaluate_script("${a.b.x}", data)
+        assert result is None
+        with pytest.raises(ActionFailure, match="Expression evaluation failed: "):
+            ActionUtility.evaluate_script("this.constructor.constructor('return process')().exit()", data)
+        result, log = ActionUtility.evaluate_script("while (true) {}", data, False)
+        assert result is None
+        assert log[-1] == "Evaluator response: {'success': False, 'data': None, 'message': 'Script execution timed out after 1000ms'}"
+        assert len(responses.calls) == 0
+        evaluator.close()
+
+    def test_script_evaluator_enabled(self, monkeypatch):
+        monkeypatch.setitem(Utility.environment['evaluator'], 'url', "http://localhost:8085/evaluate")
+        assert not ScriptEvaluator.is_enabled()
+        monkeypatch.setitem(Utility.environment['evaluator']['embedded'], 'enable', True)
+        assert ScriptEvaluator.is_enabled()
+        monkeypatch.setitem(Utility.environment['evaluator'], 'url', "http://192.168.100.109:8085/evaluate")
+        assert not ScriptEvaluator.is_enabled()
+
+    def test_script_evaluator_compile(self):
+        assert ScriptEvaluator.compile("${a.b.d}") == '__value("a.b.d")'
+        assert ScriptEvaluator.compile("`${a.b}` + `${ `${c}` }`") == '`${__text("a.b")}` + `${ `${__text("c")}` }`'
+        assert ScriptEvaluator.compile('{"sender_id": "${sender_id}"} // ${a}') == \
+               '{"sender_id": "" + __text("sender_id") + ""} // ${a}'
+        assert ScriptEvaluator.compile("'it\\'s ${name}'") == "'it\\'s ' + __text(\"name\") + ''"
+
+    def test_script_evaluator_worker_replaced(self):
+        evaluator = ScriptEvaluator(workers=1, max_memory=32)
+        with pytest.raises(ActionFailure, match="Failed to evaluate script: Evaluator worker exited with code"):
+            evaluator.evaluate("new Array(1e9).fill(1).length", None)
+        assert evaluator.evaluate("${a} + 1", {"a": 1}) == {"success": True, "data": 2}
+        evaluator.close()
+
+    @pytest.mark.parametrize("script, data, expected", [
+        ("${a.b.3} + ${a.b.43}", {'a': {'b': {'3': 2, '43': 30}}}, 32),
+        ("'The value of '+`${a.b.d.0}`+' is '+${a.b.3}", {'a': {'b': {'3': 2, 'd': ['red', 'buggy']}}},
+         "The value of red is 2"),
+        ("${a.b.d}", {'a': {'b': {'d': ['red', 'buggy', 'bumpers']}}}, ['red', 'buggy', 'bumpers']),
+        ('return {"name": "${a.b.d.1}", "count": ${a.b.d}.length}', {'a': {'b': {'d': ['red', 'buggy']}}},
+         {"name": "buggy", "count": 2}),
+        ("${slot.age} >= 18 && `${slot.name}`.length > 0", {'slot': {'age': 21, 'name': 'udit'}}, True),
+        ("${slot.age} >= 18", {'slot': {'age': 12}}, False),
+        ("${a.b.x}", {'a': {'b': {}}}, None),
+    ])
+    def test_evaluate_script_embedded_remote_parity(self, monkeypatch, script, data, expected):
+        remote_url = os.getenv("EVALUATOR_PARITY_URL")
+        evaluator = ScriptEvaluator(workers=1)
+        monkeypatch.setattr(ScriptEvaluator, "get_instance", lambda: evaluator)
+        monkeypatch.setitem(Utility.environment['evaluator'], 'url', "http://localhost:8085/evaluate")
+        monkeypatch.setitem(Utility.environment['evaluator']['embedded'], 'enable', True)
+        embedded_result, embedded_log = ActionUtility.evaluate_script(script, data)
+        evaluator.close()
+
+        monkeypatch.setitem(Utility.environment['evaluator']['embedded'], 'enable', False)
+        with responses.RequestsMock() as rsps:
+            if remote_url:
+                monkeypatch.setitem(Utility.environment['evaluator'], 'url', remote_url)
+                rsps.add_passthru(remote_url)
+            else:
+                rsps.add(
+                    method=responses.POST,
+                    url=Utility.environment['evaluator']['url'],
+                    json={"success": True, "data": expected},
+                    status=200,
+                    match=[responses.matchers.json_params_matcher({'script': script, 'data': data})],
+                )
+            remote_result, remote_log = ActionUtility.evaluate_script(script, data)
+        assert embedded_result == remote_result == expected
+        assert embedded_log == remote_log
+
+    @pytest.fixture
+    def embedded_evaluator(self, monkeypatch):
+        evaluator = ScriptEvaluator(workers=1)
+        monkeypatch.setitem(Utility.environment['evaluator'], 'url', "http://localhost:8085/evaluate")
+        monkeypatch.setitem(Utility.environment['evaluator']['embedded'], 'enable', True)
+        monkeypatch.setattr(ScriptEvaluator, "get_instance", lambda: evaluator)
+        yield evaluator
+        evaluator.close()
+
+    tracker_data = {'sender_id': 'default', 'user_message': 'I am 21 years old', 'intent': 'inform_age',
+                    'slot': {'age': 21, 'name': 'udit', 'location': None, 'colors': ['red', 'buggy']},
+                    'key_vault': {'API_KEY': '1234567890'}}
+
+    @pytest.mark.parametrize("script, expected", [
+        ("${slot.age} >= 18 && `${slot.name}`.length > 0", True),
+        ("if (${slot.age} > 60) { return 'senior'; } return 'Hi ' + `${slot.name}` + ', you are ' + ${slot.age};",
+         "Hi udit, you are 21"),
+        ('{"sender_id": "${sender_id}", "user_message": "${user_message}", "intent": "${intent}"}',
+         {"sender_id": "default", "user_message": "I am 21 years old", "intent": "inform_age"}),
+        ("`Bearer ${key_vault.API_KEY}`", "Bearer 1234567890"),
+        ("${slot.colors.1}", "buggy"),
+        ("${slot.name}.toUpperCase()", "UDIT"),
+        ("${slot.location}", None),
+        ("${slot.missing.value}", None),
+    ])
+    @responses.activate
+    def test_embedded_evaluator_contract(self, embedded_evaluator, script, expected):
+        result, log = ActionUtility.evaluate_script(script, self.tracker_data)
+        assert result == expected
+        assert log == ['evaluation_type: script', f'script: {script}', f'data: {self.tracker_data}',
+                       'raise_err_on_failure: True', f"Evaluator response: {{'success': True, 'data': {expected!r}}}"]
+        assert len(responses.calls) == 0
+
+    @pytest.mark.parametrize("script, message", [
+        ("${slot.age} +", None),
+        ("${slot.location}.length", "Cannot read properties of null (reading 'length')"),
+        ("throw 'invalid age'", "invalid age"),
+        ("this.constructor.constructor('return process')()", "Code generation from strings disallowed for this context"),
+        ("while (true) {}", "Script execution timed out after 1000ms"),
+    ])
+    @responses.activate
+    def test_embedded_evaluator_contract_failure(self, embedded_evaluator, script, message):
+        with pytest.raises(ActionFailure, match=r"^Expression evaluation failed: \{'success': False, 'data': None, 'message': "):
+            ActionUtility.evaluate_script(script, self.tracker_data)
+        result, log = ActionUtility.evaluate_script(script, self.tracker_data, False)
+        assert result is None
+        response = eval(log[-1].replace("Evaluator response: ", "", 1))
+        assert list(response.keys()) == ["success", "data", "message"]
+        assert not response["success"] and response["data"] is None
+        if message:
+            assert response["message"] == message
+        assert len(responses.calls) == 0
+
+    @responses.activate
+    def test_embedded_evaluator_fill_slots_from_response(self, embedded_evaluator):
+        set_slots = [{"name": "experience", "value": "${data.a.b.d}.length", "evaluation_type": "script"},
+                     {"name": "score", "value": "${data.a.b.3} * 10", "evaluation_type": "script"},
+                     {"name": "location", "value": "${data.a.b.c}.city.name", "evaluation_type": "script"},
+                     {"name": "percentage", "value": "${data.a.b.43}"}]
+        http_response = {"data": {'a': {'b': {'3': 2, '43': 30, 'c': None, 'd': ['red', 'buggy', 'bumpers']}}},
+                         "context": {}}
+        evaluated_slot_values, response_log = ActionUtility.fill_slots_from_response(set_slots, http_response)
+        assert evaluated_slot_values == {'experience': 3, 'score': 20, 'location': None, 'percentage': '30'}
+        assert response_log == [
+            'initiating slot evaluation', 'Slot: experience', 'evaluation_type: script', 'script: ${data.a.b.d}.length',
+            f'data: {http_response}', 'raise_err_on_failure: True', "Evaluator response: {'success': True, 'data': 3}",
+            'Slot: score', 'evaluation_type: script', 'script: ${data.a.b.3} * 10', f'data: {http_response}',
+            'raise_err_on_failure: True', "Evaluator response: {'success': True, 'data': 20}",
+            'Slot: location',
+            "Evaluation error for location: Expression evaluation failed: {'success': False, 'data': None, "
+            "'message': \"Cannot read properties of null (reading 'city')\"}",
+            'Slot location eventually set to None.', 'Slot: percentage', 'evaluation_type: expression',
+            'expression: ${data.a.b.43}', f'data: {http_response}', 'response: 30'
+        ]
+        assert len(responses.calls) == 0
+
+    @responses.activate
+    def test_embedded_evaluator_compose_response(self, embedded_evaluator):
+        response_config = {"value": "'Hi ' + `${context.slot.name}` + ', the colors are ' + ${data.colors}.join(', ')",
+                           "evaluation_type": "script"}
+        http_response = {"data": {"colors": ["red", "buggy"]}, "context": {"slot": {"name": "udit"}}}
+        result, log = ActionUtility.compose_response(response_config, http_response)
+        assert result == "Hi udit, the colors are red, buggy"
+        assert log[-1] == "Evaluator response: {'success': True, 'data': 'Hi udit, the colors are red, buggy'}"
+        assert len(responses.calls) == 0
+
+    def test_script_evaluator_worker_restricted(self):
+        evaluator = ScriptEvaluator(workers=1)
+        response = evaluator.evaluate("this.constructor.constructor('return process')()", None)
+        assert not response["success"]
+        response = evaluator.evaluate("eval('1 + 1')", None)
+        assert not response["success"]
+        assert evaluator.evaluate("${a} * 2", {"a": 2}) == {"success": True, "data": 4}
+        evaluator.close()
+
     @responses.activate
     def test_prepare_email_text(self):
         custom_text = "The user with ${sender_id} has message ${user_message}."
@@ -24,6 +24,7 @@ from kairon.idp.processor import IDPProcessor
 from kairon.shared.auth import Authentication, LoginSSOFactory
 from kairon.shared.account.data_objects import Feedback, BotAccess, User, Bot, Account, Organization, TrustedDevice
 from kairon.shared.account.processor import AccountProcessor
+from kairon.shared.authorization.cache import AuthCache
 from kairon.shared.authorization.processor import IntegrationProcessor
 from kairon.shared.data.constant import ACTIVITY_STATUS, ACCESS_ROLES, TOKEN_TYPE, INTEGRATION_STATUS, \
     ORG_SETTINGS_MESSAGES, FeatureMappings
@@ -1665,6 +1666,29 @@ class TestAccountProcessor:
                                                         int_status=INTEGRATION_STATUS.DELETED.value)
         assert not token
 
+    def test_validate_integration_token_cached_till_disabled(self, monkeypatch):
+        bot = 'test1'
+        user = 'test_user'
+        name = 'integration_token_with_access_limit'
+        payload = {'name': name, 'bot': bot, 'sub': user, 'iat': pytest.integration_iat,
+                   'access_limit': ['/api/bot/endpoint'], 'role': 'admin'}
+        monkeypatch.setitem(Utility.environment['security']['auth_cache'], 'enable', True)
+        AuthCache.clear()
+        assert not Authentication.validate_integration_token(payload)
+
+        def _verify_integration_token(*args, **kwargs):
+            raise AppException("Database should not be queried")
+
+        with monkeypatch.context() as m:
+            m.setattr(IntegrationProcessor, 'verify_integration_token', _verify_integration_token)
+            assert not Authentication.validate_integration_token(payload)
+
+        Authentication.update_integration_token(name, bot, user, int_status=INTEGRATION_STATUS.INACTIVE.value)
+        with pytest.raises(HTTPException):
+            Authentication.validate_integration_token(payload)
+        Authentication.update_integration_token(name, bot, user, int_status=INTEGRATION_STATUS.ACTIVE.value)
+        AuthCache.clear()
+
     def test_update_integration_disable_integration_token(self):
         bot = 'test1'
         user = 'test_user'
@@ -2236,6 +2260,33 @@ class TestAccountProcessor:
         with pytest.raises(AppException, match='Link is already being used, Please raise new request'):
             loop.run_until_complete(AccountProcessor.overwrite_password(token, "Welcome@4"))
 
+    def test_auth_cache_invalidated_on_password_reset(self, monkeypatch):
+        email = 'resuselink@gmail.com'
+        monkeypatch.setitem(Utility.environment['security']['auth_cache'], 'enable', True)
+        monkeypatch.setattr(MailUtility, 'trigger_smtp', self.mock_smtp)
+        Utility.environment['user']['reset_password_cooldown_period'] = 0
+        AuthCache.clear()
+        iat = time.time()
+        user = AccountProcessor.get_cached_user_details(email)
+        assert user['email'] == email
+        assert not AccountProcessor.is_session_expired(email, iat)
+
+        def _get_user_details(*args, **kwargs):
+            raise AppException("Database should not be queried")
+
+        with monkeypatch.context() as m:
+            m.setattr(AccountProcessor, 'get_user_details', _get_user_details)
+            assert AccountProcessor.get_cached_user_details(email) == user
+            AuthCache.invalidate(AuthCache.user(email))
+            with pytest.raises(AppException, match="Database should not be queried"):
+                AccountProcessor.get_cached_user_details(email)
+
+        loop = asyncio.new_event_loop()
+        token = Utility.generate_token(email)
+        loop.run_until_complete(AccountProcessor.overwrite_password(token, "Welcome@5"))
+        assert AccountProcessor.is_session_expired(email, iat)
+        AuthCache.clear()
+
     def test_valid_token_with_payload(self):
         uuid_value = str(uuid.uuid1())
         token = Utility.generate_token_payload(payload={"mail_id": "account_reuse_link@gmail.com",
@@ -11,6 +11,7 @@ from mongoengine import connect, ValidationError
 from pymongo.collection import Collection
 from slack.web.slack_response import SlackResponse
 
+from kairon.chat.latency import LatencyHistogram, LatencyRecorder, TurnLatency
 from kairon.chat.utils import ChatUtils
 from kairon.exceptions import AppException
 from kairon.shared.account.processor import AccountProcessor
@@ -536,3 +537,37 @@ class TestChat:
             response = DataUtility.get_channel_endpoint(channel)
             last_urlpart = response.split("/", -1)[-1]
             assert last_urlpart == "testtoken"
+
+    def test_latency_histogram_percentiles(self):
+        histogram = LatencyHistogram(window=100)
+        for duration in range(1, 201):
+            histogram.observe(duration / 1000)
+        stats = histogram.stats()
+        assert stats["count"] == 200
+        assert stats["mean"] == pytest.approx(0.1005)
+        assert stats["p50"] == 0.15
+        assert stats["p90"] == 0.19
+        assert stats["p95"] == 0.195
+        assert stats["p99"] == 0.199
+        assert stats["max"] == 0.2
+        assert LatencyHistogram().stats() == {"count": 0, "mean": 0.0, "p50": 0.0, "p90": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+
+    def test_turn_latency_recorded_per_bot_and_action(self):
+        LatencyRecorder.reset()
+        latency = TurnLatency()
+        with latency.span("parse_message"):
+            pass
+        with latency.span("action", action="utter_greet"):
+            pass
+        spans = latency.finish("latency_bot")
+        assert [span["stage"] for span in spans] == ["parse_message", "action", "total"]
+        assert spans[1]["action"] == "utter_greet"
+        TurnLatency().finish("other_bot")
+
+        stats = LatencyRecorder.get_stats("latency_bot")
+        assert list(stats.keys()) == ["latency_bot"]
+        assert set(stats["latency_bot"]["stages"].keys()) == {"parse_message", "action", "total"}
+        assert stats["latency_bot"]["actions"]["utter_greet"]["count"] == 1
+        assert set(LatencyRecorder.get_stats().keys()) == {"latency_bot", "other_bot"}
+        LatencyRecorder.reset()
+        assert LatencyRecorder.get_stats() == {}
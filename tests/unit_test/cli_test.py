@@ -12,6 +12,7 @@ from kairon.cli.message_broadcast import send_notifications
 from kairon.cli.training import train
 from kairon.cli.testing import run_tests_on_model
 from kairon.cli.translator import translate_multilingual_bot
+from kairon.cli.tracker_migration import backfill_session_heads
 from kairon.events.definitions.data_generator import DataGenerationEvent
 from kairon.events.definitions.data_importer import TrainingDataImporterEvent
 from kairon.events.definitions.history_delete import DeleteHistoryEvent
@@ -360,6 +361,32 @@ class TestDeleteLogsCli:
         cli()
 
 
+
+class TestTrackerMigrationCli:
+
+    @pytest.fixture(autouse=True, scope='class')
+    def init_connection(self):
+        os.environ["system_file"] = "./tests/testing_data/system.yaml"
+        Utility.load_environment()
+        connect(**Utility.mongoengine_connection(Utility.environment['database']["url"]))
+
+    @mock.patch('argparse.ArgumentParser.parse_args',
+                return_value=argparse.Namespace(func=backfill_session_heads, bots=["test_cli_1", "test_cli_2"]))
+    def test_backfill_session_heads(self, mock_args, monkeypatch):
+        migrated = []
+
+        class MockTrackerStore:
+            def __init__(self, bot):
+                self.bot = bot
+
+            def backfill_session_heads(self):
+                migrated.append(self.bot)
+                return 1
+
+        monkeypatch.setattr(Utility, "get_local_mongo_store", lambda bot, domain: MockTrackerStore(bot))
+        cli()
+        assert migrated == ["test_cli_1", "test_cli_2"]
+
 class TestMessageBroadcastCli:
 
     @pytest.fixture(autouse=True, scope="class")
@@ -1,10 +1,17 @@
+import asyncio
+import io
 import os
 import shutil
+import tarfile
+import time
 
 import pytest
 
 from kairon.shared.utils import Utility
+from kairon.chat.agent.agent import KaironAgent
 from kairon.chat.agent_processor import AgentProcessor
+from kairon.chat.cache import AgentCacheFactory, InMemoryAgentCache, MemoryAwareAgentCache, ParseCache
+from kairon.chat.model_store import SharedModelStore
 from kairon.shared.data.processor import MongoProcessor
 from kairon.exceptions import AppException
 from elasticmock import elasticmock
@@ -83,3 +90,405 @@ class TestAgentProcessor:
 
         assert AgentProcessor.get_agent(pytest.bot)
         assert AgentProcessor.cache_provider.len() >= 1
+
+    def test_reload_hot_swap(self, mock_agent_properties):
+        old_agent = AgentProcessor.get_agent(pytest.bot)
+        AgentProcessor.reload(pytest.bot)
+        new_agent = AgentProcessor.cache_provider.get(pytest.bot)
+        assert new_agent is not old_agent
+        assert old_agent.retired
+        assert not new_agent.retired
+        stats = AgentProcessor.get_reload_stats(pytest.bot)
+        assert stats["status"] == "success"
+        assert stats["load_time"] > 0
+        assert stats["warm_up_time"] > 0
+        assert stats["timestamp"]
+
+    def test_reload_rollback_on_warm_up_failure(self, mock_agent_properties, monkeypatch):
+        async def _raise_exception(*args, **kwargs):
+            raise Exception("Failed to parse message")
+
+        old_agent = AgentProcessor.get_agent(pytest.bot)
+        monkeypatch.setattr(KaironAgent, "warm_up", _raise_exception)
+        with pytest.raises(AppException, match="Bot has not been trained yet!"):
+            AgentProcessor.reload(pytest.bot)
+        assert AgentProcessor.cache_provider.get(pytest.bot) is old_agent
+        assert not old_agent.retired
+        stats = AgentProcessor.get_reload_stats(pytest.bot)
+        assert stats["status"] == "failed"
+        assert stats["error"] == "Failed to parse message"
+
+    @pytest.mark.asyncio
+    async def test_retired_agent_released_after_in_flight_requests(self, monkeypatch):
+        from rasa.core.agent import Agent
+        from rasa.core.channels import UserMessage
+
+        agent = AgentProcessor.get_agent(pytest.bot)
+        released = []
+
+        async def _handle_message(*args, **kwargs):
+            agent.retire()
+            assert not released
+            return {}
+
+        monkeypatch.setattr(Agent, "handle_message", _handle_message)
+        monkeypatch.setattr(agent, "close", lambda: released.append(True))
+        await agent.handle_message(UserMessage("hi", sender_id="test"))
+        assert released == [True]
+        assert agent.in_flight == 0
+
+    @pytest.mark.asyncio
+    async def test_acquire_agent_swapped_before_acquired(self, mock_agent_properties, monkeypatch):
+        old_agent = AgentProcessor.get_agent(pytest.bot)
+        closed = []
+        monkeypatch.setattr(old_agent, "close", lambda: closed.append(True))
+        get_agent_async = AgentProcessor.get_agent_async
+        fetched = []
+
+        async def _get_agent_async(bot, timeout=None):
+            agent = await get_agent_async(bot, timeout)
+            if not fetched:
+                AgentProcessor.reload(bot)
+            fetched.append(agent)
+            return agent
+
+        monkeypatch.setattr(AgentProcessor, "get_agent_async", _get_agent_async)
+        async with AgentProcessor.acquire_agent(pytest.bot) as agent:
+            assert agent is not old_agent
+            assert agent is AgentProcessor.cache_provider.get(pytest.bot)
+            assert agent.in_flight == 1
+            assert closed == [True]
+        assert fetched[0] is old_agent
+        assert agent.in_flight == 0
+
+    @pytest.mark.asyncio
+    async def test_acquired_agent_closed_after_release(self, mock_agent_properties, monkeypatch):
+        closed = []
+        async with AgentProcessor.acquire_agent(pytest.bot) as agent:
+            monkeypatch.setattr(agent, "close", lambda: closed.append(True))
+            AgentProcessor.reload(pytest.bot)
+            assert agent.retired
+            assert not closed
+            assert not agent.acquire()
+        assert closed == [True]
+        assert agent.in_flight == 0
+
+    @pytest.mark.asyncio
+    async def test_parse_cache(self, mock_agent_properties, monkeypatch):
+        from rasa.core.channels import UserMessage
+
+        monkeypatch.setitem(Utility.environment["chat"]["parse_cache"], "enable", True)
+        AgentProcessor.reload(pytest.bot)
+        agent = AgentProcessor.get_agent(pytest.bot)
+        parse_cache = agent.parse_cache
+        assert parse_cache
+        assert parse_cache.stats()["hits"] == 0
+
+        parse_data = await agent.create_processor().parse_message(UserMessage("hi there", sender_id="test"))
+        parse_data["intent"]["name"] = "modified"
+        cached = await agent.create_processor().parse_message(UserMessage("hi there", sender_id="test"))
+        assert cached["intent"]["name"] != "modified"
+        assert cached["text"] == "hi there"
+        assert parse_cache.stats() == {"size": 1, "max_size": 1000, "hits": 1, "misses": 1}
+
+        AgentProcessor.reload(pytest.bot)
+        new_agent = AgentProcessor.get_agent(pytest.bot)
+        assert new_agent.parse_cache is not parse_cache
+        assert new_agent.parse_cache.stats()["size"] == 0
+
+    def test_parse_cache_disabled(self, mock_agent_properties):
+        AgentProcessor.reload(pytest.bot)
+        agent = AgentProcessor.get_agent(pytest.bot)
+        assert agent.parse_cache is None
+        assert agent.create_processor().parse_cache is None
+
+    def test_parse_cache_non_deterministic_pipeline(self):
+        class WhitespaceTokenizer:
+            pass
+
+        class DucklingEntityExtractor:
+            pass
+
+        assert ParseCache.is_cacheable([WhitespaceTokenizer()])
+        assert not ParseCache.is_cacheable([WhitespaceTokenizer(), DucklingEntityExtractor()])
+        assert not ParseCache.is_cacheable(None)
+
+    def test_warm_up_cache(self, mock_agent_properties):
+        AgentProcessor.warm_up_cache([pytest.bot, 'test_user'])
+        assert AgentProcessor.warm_up_status == {
+            "ready": True, "bots": [pytest.bot, 'test_user'], "loaded": [pytest.bot], "failed": ['test_user']
+        }
+        assert AgentProcessor.cache_provider.is_exists(pytest.bot)
+
+    def test_reload_with_shared_model_store(self, mock_agent_properties, monkeypatch, tmp_path):
+        monkeypatch.setitem(Utility.environment["chat"]["model_store"], "enable", True)
+        monkeypatch.setitem(Utility.environment["chat"]["model_store"], "path", str(tmp_path))
+        model_path = Utility.get_latest_model(pytest.bot)
+        model_dir = os.path.join(str(tmp_path), pytest.bot, SharedModelStore.get_model_hash(model_path))
+
+        AgentProcessor.reload(pytest.bot)
+        assert os.path.isdir(os.path.join(model_dir, "core"))
+        assert os.path.isdir(os.path.join(model_dir, "nlu"))
+        assert AgentProcessor.cache_provider.get(pytest.bot).model_directory == model_dir
+        extracted_at = os.path.getmtime(model_dir)
+
+        AgentProcessor.reload(pytest.bot)
+        assert os.path.getmtime(model_dir) == extracted_at
+        bot_dir = os.path.join(str(tmp_path), pytest.bot)
+        assert [path for path in os.listdir(bot_dir) if not path.startswith(".")] == [os.path.basename(model_dir)]
+        assert os.path.isfile(os.path.join(bot_dir, f".{os.path.basename(model_dir)}.{os.getpid()}.ref"))
+
+    def test_shared_model_store_delete_old_models(self, tmp_path):
+        for model in ["model_1", "model_2", "model_3"]:
+            os.mkdir(os.path.join(str(tmp_path), model))
+            time.sleep(0.01)
+        SharedModelStore.delete_old_models(str(tmp_path))
+        assert sorted(path for path in os.listdir(str(tmp_path)) if not path.startswith(".")) == ["model_2", "model_3"]
+
+    def test_shared_model_store_retains_referenced_models(self, tmp_path):
+        import subprocess
+
+        process = subprocess.Popen(["sleep", "30"])
+        stopped = subprocess.Popen(["true"])
+        stopped.wait()
+        for model in ["model_1", "model_2", "model_3", "model_4"]:
+            os.mkdir(os.path.join(str(tmp_path), model))
+            time.sleep(0.01)
+        open(os.path.join(str(tmp_path), f".model_1.{process.pid}.ref"), "w").close()
+        open(os.path.join(str(tmp_path), f".model_2.{stopped.pid}.ref"), "w").close()
+        SharedModelStore.delete_old_models(str(tmp_path))
+        assert sorted(path for path in os.listdir(str(tmp_path)) if not path.startswith(".")) == [
+            "model_1", "model_3", "model_4"
+        ]
+        assert not os.path.isfile(os.path.join(str(tmp_path), f".model_2.{stopped.pid}.ref"))
+        process.kill()
+        process.wait()
+
+    def test_shared_model_store_release_models(self, monkeypatch, tmp_path):
+        monkeypatch.setitem(Utility.environment["chat"]["model_store"], "path", str(tmp_path))
+        bot_dir = os.path.join(str(tmp_path), "release_bot")
+        os.mkdir(bot_dir)
+        for model in ["model_1", "model_2"]:
+            open(os.path.join(bot_dir, f".{model}.{os.getpid()}.ref"), "w").close()
+        SharedModelStore.release_models("release_bot", os.path.join(bot_dir, "model_2"))
+        assert os.listdir(bot_dir) == [f".model_2.{os.getpid()}.ref"]
+        open(os.path.join(bot_dir, f".model_3.{os.getpid()}.ref"), "w").close()
+        SharedModelStore.release_models("release_bot")
+        assert os.listdir(bot_dir) == [f".model_2.{os.getpid()}.ref"]
+
+    @pytest.mark.parametrize("name, link_type, link_name", [
+        ("../outside.txt", tarfile.REGTYPE, ""), ("/tmp/outside.txt", tarfile.REGTYPE, ""),
+        ("core/link", tarfile.SYMTYPE, "../../outside.txt"), ("core/link", tarfile.LNKTYPE, "/etc/passwd"),
+    ])
+    def test_shared_model_store_unsafe_archive(self, monkeypatch, tmp_path, name, link_type, link_name):
+        monkeypatch.setitem(Utility.environment["chat"]["model_store"], "path", str(tmp_path / "models"))
+        model_path = str(tmp_path / "model.tar.gz")
+        with tarfile.open(model_path, mode="w:gz") as archive:
+            member = tarfile.TarInfo(name)
+            member.type = link_type
+            member.linkname = link_name
+            archive.addfile(member, io.BytesIO(b"") if link_type == tarfile.REGTYPE else None)
+        with pytest.raises(AppException, match="Model archive contains unsafe path"):
+            SharedModelStore.get_model_directory("unsafe_bot", model_path)
+        assert not os.path.exists(str(tmp_path / "outside.txt"))
+        assert [path for path in os.listdir(str(tmp_path / "models" / "unsafe_bot")) if not path.startswith(".")] == []
+
+    def test_get_cache_stats(self):
+        stats = AgentProcessor.get_cache_stats()
+        assert stats["type"] == "lru"
+        assert stats["hits"] >= 1
+        assert stats["misses"] >= 1
+        assert stats["loads"] >= 1
+        assert stats["load_failures"] >= 1
+        assert stats["load_time"] > 0
+        assert stats["size"] >= 1
+        assert stats["evictions"] == 0
+
+    def test_cache_metrics_counted_across_threads(self):
+        from concurrent.futures import ThreadPoolExecutor
+
+        bot = "cache_metrics_bot"
+        AgentProcessor.cache_provider.set(bot, "agent")
+        hits = AgentProcessor.get_cache_stats()["hits"]
+        with ThreadPoolExecutor(8) as executor:
+            list(executor.map(AgentProcessor.get_agent, [bot] * 2000))
+        assert AgentProcessor.get_cache_stats()["hits"] == hits + 2000
+        AgentProcessor.cache_provider.cache.pop(bot)
+
+    def test_memory_aware_cache_evicts_least_recently_used(self):
+        cache = MemoryAwareAgentCache(memory_budget=100)
+        cache.set("bot_1", "agent_1", footprint=40)
+        cache.set("bot_2", "agent_2", footprint=40)
+        assert cache.get("bot_1") == "agent_1"
+        cache.set("bot_3", "agent_3", footprint=40)
+        assert cache.is_exists("bot_1")
+        assert not cache.is_exists("bot_2")
+        assert cache.is_exists("bot_3")
+        assert cache.len() == 2
+        stats = cache.stats()
+        assert stats["memory_used"] == 80
+        assert stats["evictions"] == 1
+        assert stats["footprints"] == {"bot_1": 40, "bot_3": 40}
+
+    def test_memory_aware_cache_pinned_bots_not_evicted(self):
+        cache = MemoryAwareAgentCache(memory_budget=100, pinned_bots=["vip_bot"])
+        cache.set("vip_bot", "agent_1", footprint=60)
+        cache.set("bot_2", "agent_2", footprint=30)
+        cache.set("bot_3", "agent_3", footprint=30)
+        assert cache.is_exists("vip_bot")
+        assert not cache.is_exists("bot_2")
+        assert cache.is_exists("bot_3")
+
+        cache.set("bot_4", "agent_4", footprint=120)
+        assert cache.is_exists("vip_bot")
+        assert cache.is_exists("bot_4")
+        assert not cache.is_exists("bot_3")
+        assert cache.stats()["memory_used"] == 180
+
+    def test_memory_aware_cache_reload_same_bot(self):
+        cache = MemoryAwareAgentCache(memory_budget=100)
+        cache.set("bot_1", "agent_1", footprint=40)
+        cache.set("bot_1", "agent_2", footprint=50)
+        assert cache.get("bot_1") == "agent_2"
+        assert cache.stats()["memory_used"] == 50
+        assert cache.stats()["evictions"] == 0
+
+    def test_resident_memory(self):
+        assert MemoryAwareAgentCache.resident_memory() > 0
+
+    def test_agent_cache_factory(self, monkeypatch):
+        assert isinstance(AgentCacheFactory.get_instance(), InMemoryAgentCache)
+
+        monkeypatch.setitem(Utility.environment["chat"]["cache"], "type", "memory")
+        monkeypatch.setitem(Utility.environment["chat"]["cache"], "memory_budget", 10)
+        monkeypatch.setitem(Utility.environment["chat"]["cache"], "pinned_bots", ["vip_bot"])
+        cache = AgentCacheFactory.get_instance()
+        assert isinstance(cache, MemoryAwareAgentCache)
+        assert cache.memory_budget == 10 * 1024 * 1024
+        assert cache.pinned_bots == {"vip_bot"}
+
+        monkeypatch.setitem(Utility.environment["chat"]["cache"], "type", "redis")
+        with pytest.raises(AppException, match="redis type agent cache is not supported"):
+            AgentCacheFactory.get_instance()
+
+    def test_get_agent_single_flight(self, monkeypatch):
+        from concurrent.futures import ThreadPoolExecutor
+
+        bot = "single_flight_bot"
+        loads = []
+
+        def _reload(bot_id):
+            loads.append(bot_id)
+            time.sleep(0.5)
+            AgentProcessor.cache_provider.set(bot_id, "agent")
+            return "agent"
+
+        monkeypatch.setattr(AgentProcessor, "reload", _reload)
+        with ThreadPoolExecutor(5) as executor:
+            agents = list(executor.map(AgentProcessor.get_agent, [bot] * 5))
+        assert agents == ["agent"] * 5
+        assert loads == [bot]
+        AgentProcessor.cache_provider.cache.pop(bot)
+
+    def test_get_agent_single_flight_timeout(self, monkeypatch):
+        from concurrent.futures import ThreadPoolExecutor
+
+        bot = "single_flight_timeout_bot"
+
+        def _reload(bot_id):
+            time.sleep(1)
+            AgentProcessor.cache_provider.set(bot_id, "agent")
+            return "agent"
+
+        monkeypatch.setattr(AgentProcessor, "reload", _reload)
+        with ThreadPoolExecutor(1) as executor:
+            loader = executor.submit(AgentProcessor.get_agent, bot)
+            time.sleep(0.1)
+            with pytest.raises(AppException, match="Timed out waiting for bot to load!"):
+                AgentProcessor.get_agent(bot, timeout=0.1)
+            assert loader.result() == "agent"
+        AgentProcessor.cache_provider.cache.pop(bot)
+
+    def test_get_agent_single_flight_failure(self, monkeypatch):
+        from concurrent.futures import ThreadPoolExecutor
+
+        loads = []
+
+        def _reload(bot_id):
+            loads.append(bot_id)
+            time.sleep(0.5)
+            raise AppException("Bot has not been trained yet!")
+
+        monkeypatch.setattr(AgentProcessor, "reload", _reload)
+        with ThreadPoolExecutor(3) as executor:
+            futures = [executor.submit(AgentProcessor.get_agent, "untrained_bot") for _ in range(3)]
+            for future in futures:
+                with pytest.raises(AppException, match="Bot has not been trained yet!"):
+                    future.result()
+        assert loads == ["untrained_bot"]
+
+    def test_get_agent_loaded_after_cache_miss(self, monkeypatch):
+        bot = "loaded_after_miss_bot"
+        loads = []
+        get = AgentProcessor.cache_provider.get
+        checks = []
+
+        def _get(bot_id):
+            checks.append(bot_id)
+            if len(checks) == 1:
+                AgentProcessor.cache_provider.set(bot_id, "agent")
+                return None
+            return get(bot_id)
+
+        monkeypatch.setattr(AgentProcessor.cache_provider, "get", _get)
+        monkeypatch.setattr(AgentProcessor, "reload", lambda bot_id: loads.append(bot_id))
+        assert AgentProcessor.get_agent(bot) == "agent"
+        assert not loads
+        AgentProcessor.cache_provider.cache.pop(bot)
+
+    def test_get_agent_evicted_after_load(self, monkeypatch):
+        from concurrent.futures import ThreadPoolExecutor
+
+        bot = "evicted_after_load_bot"
+
+        def _reload(bot_id):
+            time.sleep(0.5)
+            return "agent"
+
+        monkeypatch.setattr(AgentProcessor, "reload", _reload)
+        with ThreadPoolExecutor(3) as executor:
+            agents = list(executor.map(AgentProcessor.get_agent, [bot] * 3))
+        assert agents == ["agent"] * 3
+        assert not AgentProcessor.cache_provider.is_exists(bot)
+
+    @pytest.mark.asyncio
+    async def test_get_agent_async_single_flight(self, monkeypatch):
+        bot = "single_flight_async_bot"
+        loads = []
+
+        def _reload(bot_id):
+            loads.append(bot_id)
+            time.sleep(0.5)
+            AgentProcessor.cache_provider.set(bot_id, "agent")
+            return "agent"
+
+        monkeypatch.setattr(AgentProcessor, "reload", _reload)
+        agents = await asyncio.gather(*[AgentProcessor.get_agent_async(bot) for _ in range(5)])
+        assert agents == ["agent"] * 5
+        assert loads == [bot]
+        AgentProcessor.cache_provider.cache.pop(bot)
+
+    @pytest.mark.asyncio
+    async def test_get_agent_async_timeout(self, monkeypatch):
+        bot = "single_flight_async_timeout_bot"
+
+        def _reload(bot_id):
+            time.sleep(0.5)
+            AgentProcessor.cache_provider.set(bot_id, "agent")
+            return "agent"
+
+        monkeypatch.setattr(AgentProcessor, "reload", _reload)
+        with pytest.raises(AppException, match="Timed out waiting for bot to load!"):
+            await AgentProcessor.get_agent_async(bot, timeout=0.1)
+        assert await AgentProcessor.get_agent_async(bot) == "agent"
+        AgentProcessor.cache_provider.cache.pop(bot)
@@ -35,8 +35,9 @@ from starlette.datastructures import Headers
 from starlette.requests import Request
 
 from kairon.api import models
-from kairon.api.models import HttpActionParameters, HttpActionConfigRequest, ActionResponseEvaluation, \
-    SetSlotsUsingActionResponse, PromptActionConfigRequest, VectorEmbeddingActionRequest, OperationConfig, PayloadConfig
+from kairon.api.models import HttpActionParameters, HttpActionConfigRequest, HttpActionCacheConfig, \
+    ActionResponseEvaluation, SetSlotsUsingActionResponse, PromptActionConfigRequest, VectorEmbeddingActionRequest, \
+    OperationConfig, PayloadConfig
 from kairon.chat.agent_processor import AgentProcessor
 from kairon.exceptions import AppException
 from kairon.shared.account.processor import AccountProcessor
@@ -9989,6 +9990,34 @@ class TestMongoProcessor:
                           'set_slots': [{'name': 'bot', 'value': '${data.key}', 'evaluation_type': 'script'}],
                           'bot': 'test_bot', 'user': 'test_user', 'status': True}
 
+    def test_add_and_update_http_config_with_cache(self):
+        processor = MongoProcessor()
+        bot = 'test_bot'
+        user = 'test_user'
+        action = 'test_http_config_with_cache'
+        http_action_config = HttpActionConfigRequest(
+            action_name=action,
+            response=ActionResponseEvaluation(value="json"),
+            http_url="http://www.alphabet.com/catalog",
+            request_method="GET",
+            cache=HttpActionCacheConfig(enable=True, ttl=120, bypass_slot="refresh_catalog")
+        )
+        processor.add_http_action_config(http_action_config.dict(), user, bot)
+        config = processor.get_http_action_config(bot, action)
+        assert config['cache'] == {'enable': True, 'ttl': 120, 'bypass_slot': 'refresh_catalog'}
+        assert processor.load_http_action(bot)['http_action'][-1]['cache'] == config['cache']
+
+        http_action_config.cache = None
+        processor.update_http_config(http_action_config.dict(), user, bot)
+        config = processor.get_http_action_config(bot, action)
+        assert not config.get('cache')
+
+    def test_http_config_with_invalid_cache_ttl(self):
+        with pytest.raises(ValueError, match="ttl must be between 1 and 3600 seconds"):
+            HttpActionCacheConfig(enable=True, ttl=0)
+        with pytest.raises(ValueError, match="ttl must be between 1 and 3600 seconds"):
+            HttpActionCacheConfig(enable=True, ttl=3601)
+
     def test_update_http_config_invalid_action(self):
         processor = MongoProcessor()
         bot = 'test_bot'
@@ -1,4 +1,5 @@
 import os
+from copy import deepcopy
 
 import pytest
 import responses
@@ -679,4 +680,58 @@ class TestLiveAgentProcessor:
         businessdata = live_agent.getBusinesshours(config, "25226")
         current_utcnow = datetime(2023, 2, 14, 5, 15, 00, tzinfo=timezone.utc)
         workingstatus = live_agent.validate_businessworkinghours(businessdata, current_utcnow)
-        assert workingstatus == False
\ No newline at end of file
+        assert workingstatus == False
+
+    @responses.activate
+    def test_get_cached_config(self, monkeypatch):
+        monkeypatch.setitem(Utility.environment['chat']['live_agent_cache'], 'enable', True)
+        monkeypatch.setitem(Utility.environment['chat']['live_agent_cache'], 'check_interval', 60)
+        monkeypatch.setattr(LiveAgentsProcessor, "_LiveAgentsProcessor__config_cache", None)
+        bot = str(Bot(name="cached_live_agent", account=1, user="test_user").save().id)
+        config = {"agent_type": "chatwoot", "config": {"account_id": "12", "api_access_token": "asdfghjklty67",
+                                                       "inbox_identifier": "tSaxZWrxyFowmFHzWwhMwadsday"},
+                  "override_bot": True}
+        responses.add(
+            "GET", "https://app.chatwoot.com/api/v1/accounts/12/inboxes",
+            json={"payload": [{"inbox_identifier": "tSaxZWrxyFowmFHzWwhMwadsday"}]}
+        )
+
+        assert LiveAgentsProcessor.get_cached_config(bot) is None
+        LiveAgentsProcessor.save_config(deepcopy(config), bot, "test_user")
+        cached = LiveAgentsProcessor.get_cached_config(bot)
+        assert cached["config"] == config["config"]
+        cached["config"]["api_access_token"] = "modified"
+        assert LiveAgentsProcessor.get_cached_config(bot)["config"] == config["config"]
+
+        with monkeypatch.context() as m:
+            m.setattr(LiveAgentsProcessor, "get_config", lambda *args, **kwargs: pytest.fail("config is cached"))
+            m.setattr(LiveAgentsProcessor, "get_config_fingerprint",
+                      lambda *args, **kwargs: pytest.fail("fingerprint is checked once per interval"))
+            assert LiveAgentsProcessor.get_cached_config(bot)["config"] == config["config"]
+
+        monkeypatch.setitem(Utility.environment['chat']['live_agent_cache'], 'check_interval', 0)
+        with monkeypatch.context() as m:
+            m.setattr(LiveAgentsProcessor, "get_config", lambda *args, **kwargs: pytest.fail("config is cached"))
+            assert LiveAgentsProcessor.get_cached_config(bot)["config"] == config["config"]
+
+        config["config"]["api_access_token"] = "updated_by_api"
+        with monkeypatch.context() as m:
+            m.setattr(LiveAgentsProcessor, "invalidate_cached_config", lambda *args, **kwargs: None)
+            LiveAgentsProcessor.save_config(deepcopy(config), bot, "test_user")
+        assert LiveAgentsProcessor.get_cached_config(bot)["config"]["api_access_token"] == "updated_by_api"
+
+        LiveAgentsProcessor.delete_config(bot)
+        assert LiveAgentsProcessor.get_cached_config(bot) is None
+
+    def test_get_cached_agent(self):
+        config = {"agent_type": "chatwoot", "config": {"account_id": "12", "api_access_token": "asdfghjklty67"},
+                  "timestamp": datetime(2023, 2, 13, 5, 15, 00)}
+        agent = LiveAgentFactory.get_cached_agent("cached_agent_bot", config)
+        assert agent.api_access_token == "asdfghjklty67"
+        assert LiveAgentFactory.get_cached_agent("cached_agent_bot", config) is agent
+
+        config = {"agent_type": "chatwoot", "config": {"account_id": "12", "api_access_token": "hgj657890"},
+                  "timestamp": datetime(2023, 2, 14, 5, 15, 00)}
+        updated_agent = LiveAgentFactory.get_cached_agent("cached_agent_bot", config)
+        assert updated_agent is not agent
+        assert updated_agent.api_access_token == "hgj657890"
@@ -1,9 +1,14 @@
 import os
+import subprocess
+import time
+from datetime import datetime, timedelta
 
 import pytest
+from bson import ObjectId, json_util
 from mongoengine import connect
 
 from kairon import Utility
+from kairon.shared.metering.buffer import MeteringBuffer
 from kairon.shared.metering.constants import MetricType
 from kairon.shared.metering.metering_processor import MeteringProcessor
 from kairon.shared.metering.data_object import Metering
@@ -61,6 +66,18 @@ class TestMetering:
         assert prod_chat_count[0]['account'] == account
         assert prod_chat_count[0]['metric_type'] == MetricType.prod_chat
 
+    def test_get_most_active_bots(self):
+        account = 12345
+        start_date = datetime.utcnow() - timedelta(days=1)
+        for _ in range(3):
+            MeteringProcessor.add_metrics('most_active_bot_1', account, MetricType.prod_chat)
+        for _ in range(2):
+            MeteringProcessor.add_metrics('most_active_bot_2', account, MetricType.prod_chat)
+        MeteringProcessor.add_metrics('most_active_bot_3', account, MetricType.test_chat)
+        bots = MeteringProcessor.get_most_active_bots(MetricType.prod_chat, start_date, 2)
+        assert bots == ['most_active_bot_1', 'most_active_bot_2']
+        assert MeteringProcessor.get_most_active_bots(MetricType.prod_chat, datetime.utcnow() + timedelta(days=1)) == []
+
     def test_update_metrics_conversation_feedback(self):
         bot = 'test_update_metrics_conversation_feedback'
         account = 12345
@@ -103,3 +120,90 @@ class TestMetering:
         with pytest.raises(ValueError, match="Invalid metric type"):
             MeteringProcessor.update_metrics("test", bot, "test", **{"feedback": "test"})
 
+    def test_add_metrics_buffered(self, monkeypatch, tmp_path):
+        buffer = MeteringBuffer(batch_size=3, flush_interval=3600, spill_file=str(tmp_path / "spill.jsonl"))
+        monkeypatch.setitem(Utility.environment['metering']['buffer'], 'enable', True)
+        monkeypatch.setattr(MeteringBuffer, "get_instance", lambda: buffer)
+        bot = 'buffered_bot'
+        account = 12345
+
+        first_id = MeteringProcessor.add_metrics(bot, account, MetricType.test_chat, user_id="user")
+        MeteringProcessor.add_metrics(bot, account, MetricType.prod_chat)
+        assert Metering.objects(bot=bot).count() == 0
+        assert MeteringProcessor.add_metrics(None, account, MetricType.invalid_login.value)
+        assert Metering.objects(bot=bot).count() == 0
+
+        MeteringProcessor.add_metrics(bot, account, MetricType.agent_handoff)
+        time.sleep(0.5)
+        assert Metering.objects(bot=bot).count() == 3
+        metric = Metering.objects(id=first_id).get()
+        assert metric.bot == bot
+        assert metric.user_id == "user"
+        assert metric.timestamp
+        buffer.close()
+
+    def test_metering_buffer_flush_on_interval(self, tmp_path):
+        buffer = MeteringBuffer(batch_size=100, flush_interval=0.1, spill_file=str(tmp_path / "spill.jsonl"))
+        buffer.add({"bot": "interval_bot", "account": 12345, "metric_type": "test_chat", "timestamp": datetime.utcnow()})
+        time.sleep(0.5)
+        assert Metering.objects(bot="interval_bot").count() == 1
+        buffer.close()
+
+    def test_metering_buffer_spill_and_recover(self, monkeypatch, tmp_path):
+        spill_file = str(tmp_path / "spill.jsonl")
+        buffer = MeteringBuffer(batch_size=100, flush_interval=3600, spill_file=spill_file)
+        buffer.add({"bot": "spilled_bot", "account": 12345, "metric_type": "test_chat", "timestamp": datetime.utcnow()})
+        buffer.add({"bot": "spilled_bot", "account": 12345, "metric_type": "prod_chat", "timestamp": datetime.utcnow()})
+
+        def _raise_exception(*args, **kwargs):
+            raise Exception("Server not available")
+
+        with monkeypatch.context() as m:
+            m.setattr(Metering._get_collection().__class__, "insert_many", _raise_exception)
+            buffer.close()
+        assert Metering.objects(bot="spilled_bot").count() == 0
+        process_spill_file = str(tmp_path / f"spill.{os.getpid()}.jsonl")
+        assert os.path.isfile(process_spill_file)
+        assert not os.path.isfile(spill_file)
+
+        buffer = MeteringBuffer(batch_size=100, flush_interval=3600, spill_file=spill_file)
+        assert Metering.objects(bot="spilled_bot").count() == 2
+        assert Metering.objects(bot="spilled_bot", metric_type="test_chat").get().timestamp
+        assert not os.listdir(tmp_path)
+        buffer.close()
+
+    def test_metering_buffer_recover_spill_files_of_stopped_processes(self, tmp_path):
+        spill_file = str(tmp_path / "spill.jsonl")
+        process = subprocess.Popen(["sleep", "30"])
+        stopped = subprocess.Popen(["true"])
+        stopped.wait()
+        files = {
+            spill_file: "shared_file_bot", str(tmp_path / f"spill.{stopped.pid}.jsonl"): "stopped_process_bot",
+            str(tmp_path / f"spill.jsonl.{stopped.pid}.recovering"): "interrupted_recovery_bot",
+            str(tmp_path / f"spill.{process.pid}.jsonl"): "running_process_bot"
+        }
+        for path, bot in files.items():
+            with open(path, "w") as file:
+                file.write(json_util.dumps({"_id": ObjectId(), "bot": bot, "account": 12345, "metric_type": "test_chat"}) + "\n")
+
+        buffer = MeteringBuffer(batch_size=100, flush_interval=3600, spill_file=spill_file)
+        assert Metering.objects(bot="shared_file_bot").count() == 1
+        assert Metering.objects(bot="stopped_process_bot").count() == 1
+        assert Metering.objects(bot="interrupted_recovery_bot").count() == 1
+        assert Metering.objects(bot="running_process_bot").count() == 0
+        assert os.listdir(tmp_path) == [f"spill.{process.pid}.jsonl"]
+        buffer.close()
+        process.kill()
+        process.wait()
+
+    def test_metering_buffer_ignores_records_already_written(self, tmp_path):
+        buffer = MeteringBuffer(batch_size=100, flush_interval=3600, spill_file=str(tmp_path / "spill.jsonl"))
+        record = {"_id": ObjectId(), "bot": "duplicate_bot", "account": 12345, "metric_type": "test_chat"}
+        buffer.add(record)
+        assert buffer.flush() == 1
+        buffer.add(dict(record))
+        buffer.add({"bot": "duplicate_bot", "account": 12345, "metric_type": "prod_chat"})
+        assert buffer.flush() == 2
+        assert not buffer.flush()
+        assert Metering.objects(bot="duplicate_bot").count() == 2
+        buffer.close()
@@ -0,0 +1,461 @@
+import os
+import time
+
+import mongomock
+import pytest
+from rasa.shared.core.domain import Domain
+from rasa.shared.core.events import SessionStarted, ActionExecuted, UserUttered, BotUttered
+from rasa.shared.core.trackers import DialogueStateTracker
+
+from kairon.history.processor import HistoryProcessor
+from kairon.shared.trackers import KMongoTrackerStore, AsyncKMongoTrackerStore, TrackerWriteBuffer
+from kairon.shared.utils import Utility
+
+
+class TestKMongoTrackerStore:
+
+    @pytest.fixture(autouse=True, scope='class')
+    def init(self):
+        os.environ["system_file"] = "./tests/testing_data/system.yaml"
+        Utility.load_environment()
+
+    @pytest.fixture()
+    def tracker_store(self):
+        with mongomock.patch(servers=(("localhost", 27017),)):
+            tracker_store = KMongoTrackerStore(Domain.empty(), host="mongodb://localhost:27017", db="tracker_test",
+                                               collection="test_bot")
+            yield tracker_store
+            tracker_store.conversations.drop()
+            tracker_store.session_heads.drop()
+
+    @staticmethod
+    def user_turn(text: str, timestamp: float):
+        parse_data = {"text": text, "intent": {"name": "greet", "confidence": 1.0}, "entities": []}
+        return [
+            UserUttered(text, parse_data["intent"], [], parse_data, timestamp=timestamp),
+            ActionExecuted("utter_greet", timestamp=timestamp + 0.1),
+            BotUttered("Hello", timestamp=timestamp + 0.2),
+            ActionExecuted("action_listen", timestamp=timestamp + 0.3),
+        ]
+
+    def new_session(self, sender_id: str, timestamp: float):
+        return DialogueStateTracker.from_events(sender_id, [
+            ActionExecuted("action_session_start", timestamp=timestamp),
+            SessionStarted(timestamp=timestamp + 0.01),
+            ActionExecuted("action_listen", timestamp=timestamp + 0.02),
+        ])
+
+    def test_save_and_retrieve(self, tracker_store):
+        timestamp = time.time()
+        tracker = self.new_session("user_1", timestamp)
+        for event in self.user_turn("hi", timestamp + 1):
+            tracker.update(event)
+        tracker_store.save(tracker)
+        assert tracker.persisted_events_count == 7
+
+        retrieved = tracker_store.retrieve("user_1")
+        assert retrieved.persisted_events_count == len(retrieved.events) == 5
+        assert retrieved.latest_message.text == "hi"
+        flattened = tracker_store.conversations.find_one({"type": "flattened", "sender_id": "user_1"})
+        assert flattened["data"]["user_input"] == "hi"
+        assert flattened["data"]["action"] == ["utter_greet", "action_listen"]
+
+    def test_save_persists_new_events_only(self, tracker_store, monkeypatch):
+        timestamp = time.time()
+        tracker = self.new_session("user_2", timestamp)
+        tracker_store.save(tracker)
+
+        def _raise_exception(*args, **kwargs):
+            raise AssertionError("stored events should not be queried")
+
+        tracker = tracker_store.retrieve("user_2")
+        monkeypatch.setattr(tracker_store, "get_stored_events", _raise_exception)
+        for turn in range(3):
+            for event in self.user_turn(f"message {turn}", timestamp + turn + 1):
+                tracker.update(event)
+            tracker_store.save(tracker)
+            assert tracker.persisted_events_count == len(tracker.events)
+        assert tracker_store.conversations.count_documents({"sender_id": "user_2", "event": {"$exists": True}}) == 15
+
+    def test_save_tracker_created_elsewhere(self, tracker_store):
+        timestamp = time.time()
+        tracker_store.save(self.new_session("user_3", timestamp))
+
+        tracker = DialogueStateTracker.from_dict("user_3", [
+            event.as_dict() for event in tracker_store.retrieve("user_3").events
+        ])
+        for event in self.user_turn("hello", timestamp + 1):
+            tracker.update(event)
+        tracker_store.save(tracker)
+        assert tracker_store.conversations.count_documents({"sender_id": "user_3", "event": {"$exists": True}}) == 7
+        assert tracker_store.retrieve("user_3").latest_message.text == "hello"
+
+    def test_session_head_maintained_on_save(self, tracker_store):
+        timestamp = time.time()
+        tracker = self.new_session("user_4", timestamp)
+        tracker_store.save(tracker)
+        session_head = tracker_store.session_heads.find_one({"_id": "user_4"})
+        assert session_head["session_start"] == timestamp + 0.01
+        assert session_head["event_count"] == 1
+
+        for event in self.user_turn("hi", timestamp + 1):
+            tracker.update(event)
+        tracker_store.save(tracker)
+        assert tracker_store.session_heads.find_one({"_id": "user_4"})["event_count"] == 5
+
+        for event in self.new_session("user_4", timestamp + 2).events:
+            tracker.update(event)
+        tracker_store.save(tracker)
+        session_head = tracker_store.session_heads.find_one({"_id": "user_4"})
+        assert session_head["session_start"] == (timestamp + 2) + 0.01
+        assert session_head["event_count"] == 1
+
+    def test_retrieve_without_aggregation(self, tracker_store, monkeypatch):
+        timestamp = time.time()
+        tracker = self.new_session("user_5", timestamp)
+        for event in self.user_turn("hi", timestamp + 1):
+            tracker.update(event)
+        for event in self.new_session("user_5", timestamp + 2).events:
+            tracker.update(event)
+        for event in self.user_turn("hello", timestamp + 3):
+            tracker.update(event)
+        tracker_store.save(tracker)
+
+        def _raise_exception(*args, **kwargs):
+            raise AssertionError("conversations should not be aggregated")
+
+        monkeypatch.setattr(tracker_store.conversations.__class__, "aggregate", _raise_exception)
+        retrieved = tracker_store.retrieve("user_5")
+        assert len(retrieved.events) == 5
+        assert retrieved.latest_message.text == "hello"
+
+    def test_backfill_session_heads(self, tracker_store):
+        timestamp = time.time()
+        tracker = self.new_session("user_6", timestamp)
+        for event in self.user_turn("hi", timestamp + 1):
+            tracker.update(event)
+        tracker_store.save(tracker)
+        tracker_store.session_heads.delete_many({})
+
+        assert tracker_store.backfill_session_heads() == 1
+        session_head = tracker_store.session_heads.find_one({"_id": "user_6"})
+        assert session_head["session_start"] == timestamp + 0.01
+        assert session_head["event_count"] == 5
+
+    def test_retrieve_backfills_missing_session_head(self, tracker_store):
+        timestamp = time.time()
+        tracker_store.save(self.new_session("user_7", timestamp))
+        tracker_store.session_heads.delete_many({})
+
+        assert len(tracker_store.retrieve("user_7").events) == 1
+        assert tracker_store.session_heads.find_one({"_id": "user_7"})["event_count"] == 1
+        assert not tracker_store.retrieve("unknown_user")
+        assert tracker_store.session_heads.find_one({"_id": "unknown_user"}) == {
+            "_id": "unknown_user", "session_start": None, "event_count": 0
+        }
+
+    @pytest.fixture()
+    def cached_tracker_stores(self):
+        with mongomock.patch(servers=(("localhost", 27017),)):
+            worker_1 = KMongoTrackerStore(Domain.empty(), host="mongodb://localhost:27017", db="tracker_test",
+                                          collection="test_bot", cache_size=10, cache_ttl=60)
+            worker_2 = KMongoTrackerStore(Domain.empty(), host="mongodb://localhost:27017", db="tracker_test",
+                                          collection="test_bot", cache_size=10, cache_ttl=60)
+            yield worker_1, worker_2
+            worker_1.conversations.drop()
+            worker_1.session_heads.drop()
+
+    def test_tracker_cache_write_through(self, cached_tracker_stores, monkeypatch):
+        tracker_store, _ = cached_tracker_stores
+        timestamp = time.time()
+        tracker_store.save(self.new_session("user_8", timestamp))
+        tracker = tracker_store.retrieve("user_8")
+        for event in self.user_turn("hi", timestamp + 1):
+            tracker.update(event)
+        tracker_store.save(tracker)
+        assert tracker_store.tracker_cache["user_8"]["version"] == 2
+        assert len(tracker_store.tracker_cache["user_8"]["events"]) == 5
+
+        find = tracker_store.conversations.__class__.find
+
+        def _find(collection, query=None, *args, **kwargs):
+            if query and "event.timestamp" in query:
+                raise AssertionError("events should be served from cache")
+            return find(collection, query, *args, **kwargs)
+
+        monkeypatch.setattr(tracker_store.conversations.__class__, "find", _find)
+        retrieved = tracker_store.retrieve("user_8")
+        assert len(retrieved.events) == 5
+        assert retrieved.latest_message.text == "hi"
+
+    def test_tracker_cache_invalidated_by_other_worker(self, cached_tracker_stores):
+        worker_1, worker_2 = cached_tracker_stores
+        timestamp = time.time()
+        worker_1.save(self.new_session("user_9", timestamp))
+        assert len(worker_1.retrieve("user_9").events) == 1
+
+        tracker = worker_2.retrieve("user_9")
+        for event in self.user_turn("hello", timestamp + 1):
+            tracker.update(event)
+        worker_2.save(tracker)
+
+        retrieved = worker_1.retrieve("user_9")
+        assert len(retrieved.events) == 5
+        assert retrieved.latest_message.text == "hello"
+        assert worker_1.tracker_cache["user_9"]["version"] == 2
+
+    def test_tracker_cache_new_session(self, cached_tracker_stores):
+        tracker_store, _ = cached_tracker_stores
+        timestamp = time.time()
+        tracker = self.new_session("user_10", timestamp)
+        for event in self.user_turn("hi", timestamp + 1):
+            tracker.update(event)
+        tracker_store.save(tracker)
+        tracker = tracker_store.retrieve("user_10")
+        for event in self.new_session("user_10", timestamp + 2).events:
+            tracker.update(event)
+        tracker_store.save(tracker)
+        assert len(tracker_store.tracker_cache["user_10"]["events"]) == 1
+        assert len(tracker_store.retrieve("user_10").events) == 1
+
+    def test_session_head_reset_on_history_deletion(self, cached_tracker_stores, monkeypatch):
+        tracker_store, _ = cached_tracker_stores
+        timestamp = time.time()
+        tracker = self.new_session("user_22", timestamp)
+        for event in self.user_turn("hi", timestamp + 1):
+            tracker.update(event)
+        tracker_store.save(tracker)
+        assert len(tracker_store.retrieve("user_22").events) == 5
+
+        monkeypatch.setitem(Utility.environment['tracker'], 'url', "mongodb://localhost:27017/tracker_test")
+        HistoryProcessor.delete_user_conversations("test_bot", "user_22", timestamp + 10)
+        assert "event_count" not in tracker_store.session_heads.find_one({"_id": "user_22"})
+        assert not tracker_store.retrieve("user_22")
+
+        tracker = tracker_store.init_tracker("user_22")
+        assert tracker.persisted_events_count == 0
+        for event in self.new_session("user_22", timestamp + 20).events + self.user_turn("hello", timestamp + 21):
+            tracker.update(event)
+        tracker_store.save(tracker)
+        assert tracker_store.conversations.count_documents({"sender_id": "user_22", "event": {"$exists": True}}) == 7
+        assert tracker_store.session_heads.find_one({"_id": "user_22"})["event_count"] == 5
+        retrieved = tracker_store.retrieve("user_22")
+        assert len(retrieved.events) == 5
+        assert retrieved.latest_message.text == "hello"
+
+    @pytest.fixture()
+    def async_tracker_store(self):
+        with mongomock.patch(servers=(("localhost", 27017),)):
+            tracker_store = AsyncKMongoTrackerStore(Domain.empty(), max_workers=2, host="mongodb://localhost:27017",
+                                                    db="tracker_test", collection="test_bot")
+            yield tracker_store
+            tracker_store.conversations.drop()
+            tracker_store.session_heads.drop()
+
+    @pytest.mark.asyncio
+    async def test_async_tracker_store_save_and_retrieve(self, async_tracker_store):
+        timestamp = time.time()
+        tracker = self.new_session("user_11", timestamp)
+        for event in self.user_turn("hi", timestamp + 1):
+            tracker.update(event)
+        await async_tracker_store.save_async(tracker)
+
+        retrieved = await async_tracker_store.retrieve_async("user_11")
+        assert len(retrieved.events) == 5
+        assert retrieved.latest_message.text == "hi"
+        assert async_tracker_store.retrieve("user_11").latest_message.text == "hi"
+        assert not await async_tracker_store.retrieve_async("unknown_user")
+
+    @pytest.mark.asyncio
+    async def test_async_tracker_store_get_or_create_tracker(self, async_tracker_store):
+        tracker = await async_tracker_store.get_or_create_tracker_async("user_12")
+        assert len(tracker.events) == 1
+        assert tracker.latest_action_name == "action_listen"
+        assert async_tracker_store.conversations.count_documents({"sender_id": "user_12"}) == 1
+
+        tracker = await async_tracker_store.get_or_create_tracker_async("user_13", append_action_listen=False)
+        assert not tracker.events
+
+    def test_get_local_mongo_store(self, monkeypatch):
+        monkeypatch.setitem(Utility.environment['chat']['tracker_store'], 'type', 'async')
+        with mongomock.patch(servers=(("localhost", 27017),)):
+            monkeypatch.setitem(Utility.environment['database'], 'url', "mongodb://localhost:27017/conversations")
+            tracker_store = Utility.get_local_mongo_store("test_bot", Domain.empty())
+            assert isinstance(tracker_store, AsyncKMongoTrackerStore)
+
+    @pytest.fixture()
+    def write_behind_tracker_store(self):
+        with mongomock.patch(servers=(("localhost", 27017),)):
+            write_buffer = TrackerWriteBuffer(batch_size=20, flush_interval=3600)
+            tracker_store = KMongoTrackerStore(Domain.empty(), host="mongodb://localhost:27017", db="tracker_test",
+                                               collection="test_bot", write_buffer=write_buffer)
+            yield tracker_store
+            write_buffer.close()
+            tracker_store.conversations.drop()
+            tracker_store.session_heads.drop()
+
+    def test_write_behind_reads_unflushed_events(self, write_behind_tracker_store):
+        tracker_store = write_behind_tracker_store
+        timestamp = time.time()
+        tracker = self.new_session("user_14", timestamp)
+        tracker_store.save(tracker)
+        for event in self.user_turn("hi", timestamp + 1):
+            tracker.update(event)
+        tracker_store.save(tracker)
+        assert tracker_store.conversations.count_documents({"sender_id": "user_14"}) == 0
+
+        retrieved = tracker_store.retrieve("user_14")
+        assert len(retrieved.events) == 5
+        assert retrieved.latest_message.text == "hi"
+
+        tracker_store.write_buffer.flush()
+        assert tracker_store.conversations.count_documents({"sender_id": "user_14", "event": {"$exists": True}}) == 7
+        assert tracker_store.conversations.count_documents({"sender_id": "user_14", "type": "flattened"}) == 2
+        assert not tracker_store.write_buffer.get_pending_events(tracker_store.conversations, "user_14")
+        retrieved = tracker_store.retrieve("user_14")
+        assert len(retrieved.events) == 5
+        assert retrieved.latest_message.text == "hi"
+
+    def test_write_behind_flush_on_batch_size(self, write_behind_tracker_store):
+        tracker_store = write_behind_tracker_store
+        timestamp = time.time()
+        tracker = self.new_session("user_15", timestamp)
+        tracker_store.save(tracker)
+        for turn in range(4):
+            for event in self.user_turn(f"message {turn}", timestamp + turn + 1):
+                tracker.update(event)
+            tracker_store.save(tracker)
+        time.sleep(0.5)
+        assert tracker_store.conversations.count_documents({"sender_id": "user_15"}) >= 20
+        tracker_store.write_buffer.flush()
+        assert tracker_store.conversations.count_documents({"sender_id": "user_15"}) == 24
+        assert not tracker_store.write_buffer.get_pending_events(tracker_store.conversations, "user_15")
+
+        stored = tracker_store.conversations.find({"sender_id": "user_15", "event": {"$exists": True}})
+        assert [doc["event"]["timestamp"] for doc in stored] == [event.timestamp for event in tracker.events]
+
+    def test_write_behind_merges_partially_flushed_events(self, write_behind_tracker_store):
+        tracker_store = write_behind_tracker_store
+        timestamp = time.time()
+        tracker = self.new_session("user_16", timestamp)
+        tracker_store.save(tracker)
+        tracker_store.write_buffer.flush()
+        for event in self.user_turn("hi", timestamp + 1):
+            tracker.update(event)
+        tracker_store.save(tracker)
+
+        pending = tracker_store.write_buffer.get_pending_events(tracker_store.conversations, "user_16")
+        stored = tracker_store._get_stored_events("user_16", False) + pending[:2]
+        events = KMongoTrackerStore._merge_pending_events(stored, pending, False)
+        assert len(events) == 5
+        assert [event["timestamp"] for event in events] == sorted(event["timestamp"] for event in events)
+
+    def test_write_behind_new_session_in_pending_events(self, write_behind_tracker_store):
+        tracker_store = write_behind_tracker_store
+        timestamp = time.time()
+        tracker = self.new_session("user_17", timestamp)
+        for event in self.user_turn("hi", timestamp + 1):
+            tracker.update(event)
+        tracker_store.save(tracker)
+        tracker_store.write_buffer.flush()
+        for event in self.new_session("user_17", timestamp + 2).events:
+            tracker.update(event)
+        tracker_store.save(tracker)
+
+        assert len(tracker_store.retrieve("user_17").events) == 1
+        assert len(tracker_store.retrieve_full_tracker("user_17").events) == 10
+
+    def test_write_behind_ignores_documents_already_written(self, write_behind_tracker_store):
+        tracker_store = write_behind_tracker_store
+        timestamp = time.time()
+        tracker = self.new_session("user_18", timestamp)
+        tracker_store.save(tracker)
+        written = list(tracker_store.conversations.find({"sender_id": "user_18"}))
+        assert not written
+        tracker_store.write_buffer.flush()
+        written = list(tracker_store.conversations.find({"sender_id": "user_18"}))
+        assert len(written) == 4
+
+        for event in self.user_turn("hi", timestamp + 1):
+            tracker.update(event)
+        tracker_store.save(tracker)
+        tracker_store.write_buffer.add(tracker_store.conversations, "user_18", written[:2], [])
+        assert tracker_store.write_buffer.flush() == 7
+        assert not tracker_store.write_buffer.flush()
+        assert tracker_store.conversations.count_documents({"sender_id": "user_18"}) == 9
+        assert not tracker_store.write_buffer.get_pending_events(tracker_store.conversations, "user_18")
+
+    def test_write_behind_requeue_failed_documents(self, write_behind_tracker_store, monkeypatch):
+        tracker_store = write_behind_tracker_store
+        timestamp = time.time()
+        tracker = self.new_session("user_19", timestamp)
+        for event in self.user_turn("hi", timestamp + 1):
+            tracker.update(event)
+        tracker_store.save(tracker)
+
+        def _raise_exception(*args, **kwargs):
+            raise Exception("Server not available")
+
+        with monkeypatch.context() as m:
+            m.setattr(tracker_store.conversations.__class__, "insert_many", _raise_exception)
+            assert tracker_store.write_buffer.flush() == 0
+        assert len(tracker_store.write_buffer) == 8
+        assert len(tracker_store.write_buffer.get_pending_events(tracker_store.conversations, "user_19")) == 7
+        assert tracker_store.write_buffer.flush() == 8
+        assert tracker_store.conversations.count_documents({"sender_id": "user_19"}) == 8
+        assert not tracker_store.write_buffer.get_pending_events(tracker_store.conversations, "user_19")
+
+    def test_write_behind_backfill_session_head_with_pending_events(self, write_behind_tracker_store):
+        tracker_store = write_behind_tracker_store
+        timestamp = time.time()
+        tracker = self.new_session("user_20", timestamp)
+        tracker_store.save(tracker)
+        tracker_store.write_buffer.flush()
+        for event in self.user_turn("hi", timestamp + 1):
+            tracker.update(event)
+        tracker_store.save(tracker)
+        tracker_store.session_heads.delete_one({"_id": "user_20"})
+
+        session_head = tracker_store._get_session_head("user_20")
+        assert session_head == {"_id": "user_20", "session_start": timestamp + 0.01, "event_count": 5}
+        assert tracker_store.session_heads.find_one({"_id": "user_20"})["event_count"] == 5
+
+    def test_write_behind_caches_session_without_pending_events(self):
+        with mongomock.patch(servers=(("localhost", 27017),)):
+            write_buffer = TrackerWriteBuffer(batch_size=20, flush_interval=3600)
+            tracker_store = KMongoTrackerStore(Domain.empty(), host="mongodb://localhost:27017", db="tracker_test",
+                                               collection="test_bot", cache_size=10, cache_ttl=60,
+                                               write_buffer=write_buffer)
+            timestamp = time.time()
+            tracker = self.new_session("user_23", timestamp)
+            for event in self.user_turn("hi", timestamp + 1):
+                tracker.update(event)
+            tracker_store.save(tracker)
+            assert len(tracker_store.retrieve("user_23").events) == 5
+            assert "user_23" not in tracker_store.tracker_cache
+
+            write_buffer.flush()
+            assert len(tracker_store.retrieve("user_23").events) == 5
+            assert len(tracker_store.tracker_cache["user_23"]["events"]) == 5
+            write_buffer.close()
+            tracker_store.conversations.drop()
+            tracker_store.session_heads.drop()
+
+    def test_write_behind_flushes_inline_once_full(self):
+        with mongomock.patch(servers=(("localhost", 27017),)):
+            write_buffer = TrackerWriteBuffer(batch_size=100, flush_interval=3600, max_size=3)
+            tracker_store = KMongoTrackerStore(Domain.empty(), host="mongodb://localhost:27017", db="tracker_test",
+                                               collection="test_bot", write_buffer=write_buffer)
+            timestamp = time.time()
+            tracker = self.new_session("user_21", timestamp)
+            for event in self.user_turn("hi", timestamp + 1):
+                tracker.update(event)
+            tracker_store.save(tracker)
+            assert write_buffer.dropped == 0
+            assert len(write_buffer) <= 3
+            assert tracker_store.conversations.count_documents({"sender_id": "user_21"}) >= 5
+            assert len(tracker_store.retrieve("user_21").events) == 5
+            write_buffer.close()
+            assert tracker_store.conversations.count_documents({"sender_id": "user_21"}) == 8
+            tracker_store.conversations.drop()
+            tracker_store.session_heads.drop()